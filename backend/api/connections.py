@@ -13,6 +13,7 @@ async def find_connections(request: ConnectionRequest):
             current_doc_id=request.current_document_id,
             context_before=request.context_before,
             context_after=request.context_after,
+            include_summary=request.summary,
         )
         return response
     except Exception as e:
@@ -2,14 +2,15 @@
 from fastapi import APIRouter, HTTPException
 from models.individual_insights_model import (
     IndividualInsightRequest, KeyTakeawayResponse, DidYouKnowResponse,
-    ContradictionsResponse, ExamplesResponse, CrossReferencesResponse
+    ContradictionsResponse, ExamplesResponse, CrossReferencesResponse,
+    BatchInsightRequest, BatchInsightResponse
 )
 from services.individual_insights_service import individual_insights_service
 
 router = APIRouter()
 
 @router.post("/key-takeaway", response_model=KeyTakeawayResponse)
-async def generate_key_takeaway(request: IndividualInsightRequest):
+def generate_key_takeaway(request: IndividualInsightRequest):
     """Generate structured key takeaway analysis"""
     try:
         if request.insight_type != "key_takeaway":
@@ -28,7 +29,7 @@ async def generate_key_takeaway(request: IndividualInsightRequest):
         raise HTTPException(status_code=500, detail=f"Error generating key takeaway: {str(e)}")
 
 @router.post("/did-you-know", response_model=DidYouKnowResponse)
-async def generate_did_you_know(request: IndividualInsightRequest):
+def generate_did_you_know(request: IndividualInsightRequest):
     """Generate structured did you know analysis"""
     try:
         if request.insight_type != "did_you_know":
@@ -47,7 +48,7 @@ async def generate_did_you_know(request: IndividualInsightRequest):
         raise HTTPException(status_code=500, detail=f"Error generating did you know: {str(e)}")
 
 @router.post("/contradictions", response_model=ContradictionsResponse)
-async def generate_contradictions(request: IndividualInsightRequest):
+def generate_contradictions(request: IndividualInsightRequest):
     """Generate structured contradictions analysis"""
     try:
         if request.insight_type != "contradictions":
@@ -66,7 +67,7 @@ async def generate_contradictions(request: IndividualInsightRequest):
         raise HTTPException(status_code=500, detail=f"Error generating contradictions: {str(e)}")
 
 @router.post("/examples", response_model=ExamplesResponse)
-async def generate_examples(request: IndividualInsightRequest):
+def generate_examples(request: IndividualInsightRequest):
     """Generate structured examples analysis"""
     try:
         if request.insight_type != "examples":
@@ -85,7 +86,7 @@ async def generate_examples(request: IndividualInsightRequest):
         raise HTTPException(status_code=500, detail=f"Error generating examples: {str(e)}")
 
 @router.post("/cross-references", response_model=CrossReferencesResponse)
-async def generate_cross_references(request: IndividualInsightRequest):
+def generate_cross_references(request: IndividualInsightRequest):
     """Generate structured cross references analysis"""
     try:
         if request.insight_type != "cross_references":
@@ -102,3 +103,23 @@ async def generate_cross_references(request: IndividualInsightRequest):
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating cross references: {str(e)}")
+
+@router.post("/batch", response_model=BatchInsightResponse)
+def generate_batch(request: BatchInsightRequest):
+    """Generate all requested insight types for one selection in a single LLM call"""
+    try:
+        if not request.insight_types:
+            raise HTTPException(status_code=400, detail="insight_types must not be empty")
+        
+        response = individual_insights_service.generate_batch(
+            selected_text=request.selected_text,
+            document_id=request.document_id,
+            page_no=request.page_no,
+            original_insight=request.respond,
+            insight_types=request.insight_types
+        )
+        return response
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error generating batch insights: {str(e)}")
@@ -6,7 +6,7 @@ from services import insights_service
 router = APIRouter()
 
 @router.post("/generate", response_model=InsightResponse)
-async def generate_insights(request: InsightRequest):
+def generate_insights(request: InsightRequest):
     """Generate insights for selected text"""
     try:
         response = insights_service.generate_insights(
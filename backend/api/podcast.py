@@ -1,12 +1,29 @@
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, StreamingResponse
 from models import PodcastRequest, PodcastResponse
 from services import podcast_service
+from utils.tts_client import AUDIO_FORMATS, negotiate_audio_format, transcode_audio
 import os
 from config import settings
 
 router = APIRouter()
 
+
+def _transcript_preview(transcript) -> str:
+    """Safe transcript preview for headers (HTTP headers are latin-1 only)"""
+    transcript_text = " | ".join(
+        [f"{script.speaker}: {script.text[:50]}..." for script in transcript[:3]]
+    )
+    # Make header-safe by stripping characters not representable in latin-1 (avoid Unicode errors)
+    try:
+        transcript_text.encode('latin-1')
+        transcript_preview = transcript_text
+    except Exception:
+        transcript_preview = transcript_text.encode('latin-1', 'ignore').decode('latin-1')
+    return (transcript_preview or "")[:200]
+
+
 # @router.post("/generate", response_model=PodcastResponse)
 # async def generate_podcast_json(request: PodcastRequest):
 #     """Generate podcast and return JSON response with audio URL (legacy endpoint)"""
@@ -31,8 +48,8 @@ router = APIRouter()
 #         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/generate-audio")
-async def generate_podcast_audio(request: PodcastRequest):
-    """Generate podcast and return audio file directly as binary response"""
+async def generate_podcast_audio(request: PodcastRequest, http_request: Request):
+    """Generate podcast and return audio file directly as binary response (WAV, MP3 or Opus)"""
     try:
         print(f"🎵 Generating audio for request: {request.format} format, {request.duration} duration")
 
@@ -57,39 +74,79 @@ async def generate_podcast_audio(request: PodcastRequest):
         if not os.path.exists(audio_path):
             raise HTTPException(status_code=404, detail=f"Audio file not found: {audio_filename}")
 
+        # Output format: explicit request option, else Accept negotiation; encodes are cached beside the WAV
+        output_format = "wav"
+        if audio_filename.endswith('.wav'):
+            output_format = negotiate_audio_format(request.output_format, http_request.headers.get("accept"))
+            if output_format != "wav":
+                encoded_filename = await run_in_threadpool(transcode_audio, audio_filename, output_format)
+                if encoded_filename:
+                    audio_filename = encoded_filename
+                    audio_path = os.path.join(settings.audio_folder, audio_filename)
+                else:
+                    output_format = "wav"  # Encoding unavailable: fall back to the original
+        media_type, extension = AUDIO_FORMATS[output_format]
+
         file_size = os.path.getsize(audio_path)
         print(f"✅ Audio file found: {file_size:,} bytes")
 
-        # Prepare a safe transcript preview for headers (HTTP headers are latin-1 only)
-        transcript_text = " | ".join(
-            [f"{script.speaker}: {script.text[:50]}..." for script in response.transcript[:3]]
-        )
-        # Make header-safe by stripping characters not representable in latin-1 (avoid Unicode errors)
-        try:
-            transcript_text.encode('latin-1')
-            transcript_preview = transcript_text
-        except Exception:
-            transcript_preview = transcript_text.encode('latin-1', 'ignore').decode('latin-1')
-        transcript_preview = (transcript_preview or "")[:200]
+        # Prepare a safe transcript preview for headers
+        transcript_preview = _transcript_preview(response.transcript)
 
         headers = {
             "X-Transcript-Preview": transcript_preview,
             "X-Duration": str(response.duration),
             "X-Format": response.format,
             "X-Language": request.language or "en",
-            "X-Audio-Type": "audio/wav",
+            "X-Audio-Type": media_type,
             "X-File-Size": str(file_size),
-            "Content-Disposition": f"attachment; filename=podcast_{request.format}_{request.duration}.wav",
+            "Content-Disposition": f"attachment; filename=podcast_{request.format}_{request.duration}{extension}",
+            "Vary": "Accept",
         }
 
         return FileResponse(
             path=audio_path,
-            media_type='audio/wav',
-            filename=f"podcast_{request.format}_{request.duration}.wav",
+            media_type=media_type,
+            filename=f"podcast_{request.format}_{request.duration}{extension}",
             headers=headers,
         )
     except HTTPException as e:
         raise e
     except Exception as e:
         print(f"❌ Error in generate_podcast_audio: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/stream-audio")
+async def stream_podcast_audio(request: PodcastRequest):
+    """Generate podcast and stream WAV audio (chunked) while later segments are still being synthesized"""
+    try:
+        print(f"🎵 Streaming audio for request: {request.format} format, {request.duration} duration")
+
+        # Script generation is a blocking LLM call; keep it off the event loop
+        transcript, duration, audio_stream = await run_in_threadpool(
+            podcast_service.stream_podcast,
+            selected_text=request.selected_text,
+            insights=request.insights,
+            format=request.format,
+            duration=request.duration,
+            language=request.language or "en"
+        )
+
+        headers = {
+            "X-Transcript-Preview": _transcript_preview(transcript),
+            "X-Duration": str(duration),
+            "X-Format": request.format,
+            "X-Language": request.language or "en",
+            "X-Audio-Type": "audio/wav",
+            "Cache-Control": "no-store",
+            "Content-Disposition": f"inline; filename=podcast_{request.format}_{request.duration}.wav",
+        }
+
+        # No Content-Length: sent with chunked transfer encoding, header first, then PCM per segment
+        return StreamingResponse(audio_stream, media_type='audio/wav', headers=headers)
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        print(f"❌ Error in stream_podcast_audio: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
@@ -22,6 +22,9 @@ class Settings(BaseSettings):
     index_path: str = "./storage/search_index.json"
     document_index_path: str = "./storage/document_index.json"
     max_file_size: int = 50 * 1024 * 1024  # 50MB
+    # Upload-time outline budget: a partial outline is saved when it runs out and the rest
+    # finishes in the background (0 extracts every page before the upload returns)
+    outline_time_budget_seconds: float = float(os.getenv("OUTLINE_TIME_BUDGET_SECONDS", "10"))
     
     # LLM settings (Gemini only)
     google_api_key: Optional[str] = os.getenv("GOOGLE_API_KEY")
@@ -31,9 +34,14 @@ class Settings(BaseSettings):
     google_api_key_podcast: Optional[str] = os.getenv("GOOGLE_API_KEY_PODCAST")
     # Support service account path if provided by jury via -e GOOGLE_APPLICATION_CREDENTIALS
     google_application_credentials: Optional[str] = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
-    # Allow provider selection (default gemini per jury docs); currently only gemini used.
+    # Allow provider selection (default gemini per jury docs); "local" uses the offline deterministic stub
     llm_provider: str = os.getenv("LLM_PROVIDER", "gemini")
     gemini_model: str = os.getenv("GEMINI_MODEL", "gemini-1.5-flash")
+    # Local stub backend (LLM_PROVIDER=local) for offline benchmarks and load tests
+    llm_stub_latency_mean_ms: float = float(os.getenv("LLM_STUB_LATENCY_MEAN_MS", "400"))
+    llm_stub_latency_stddev_ms: float = float(os.getenv("LLM_STUB_LATENCY_STDDEV_MS", "100"))
+    llm_stub_failure_rate: float = float(os.getenv("LLM_STUB_FAILURE_RATE", "0.0"))
+    llm_stub_seed: int = int(os.getenv("LLM_STUB_SEED", "42"))
     
     # Insights Configuration
     default_insight_types: str = os.getenv("DEFAULT_INSIGHT_TYPES", "key_takeaways,contradictions,examples,cross_references,did_you_know")
@@ -41,7 +49,15 @@ class Settings(BaseSettings):
     temperature: float = float(os.getenv("TEMPERATURE", "0.7"))
     top_p: float = float(os.getenv("TOP_P", "0.9"))
     llm_request_timeout: int = int(os.getenv("LLM_REQUEST_TIMEOUT", "60"))
-    
+    # LLM resilience: retries with exponential backoff + jitter, circuit breaker per API key
+    llm_max_retries: int = int(os.getenv("LLM_MAX_RETRIES", "3"))
+    llm_backoff_base_seconds: float = float(os.getenv("LLM_BACKOFF_BASE_SECONDS", "1.0"))
+    llm_backoff_max_seconds: float = float(os.getenv("LLM_BACKOFF_MAX_SECONDS", "20"))
+    llm_circuit_failure_threshold: int = int(os.getenv("LLM_CIRCUIT_FAILURE_THRESHOLD", "5"))
+    llm_circuit_reset_seconds: float = float(os.getenv("LLM_CIRCUIT_RESET_SECONDS", "60"))
+    # Token budget for library outline context; headings ranked by relevance to the selection
+    llm_context_token_budget: int = int(os.getenv("LLM_CONTEXT_TOKEN_BUDGET", "1500"))
+
     @property
     def default_insight_types_list(self) -> List[str]:
         """Convert comma-separated insight types to list"""
@@ -54,6 +70,13 @@ class Settings(BaseSettings):
     # Performance settings
     connection_limit: int = 5  # Max connections to return
     snippet_length: int = 300  # Characters per snippet
+    # Connection retrieval: only the top-k ranked sections are sent to the LLM
+    connection_retrieval_top_k: int = int(os.getenv("CONNECTION_RETRIEVAL_TOP_K", "12"))
+    connection_retrieval_per_doc: int = int(os.getenv("CONNECTION_RETRIEVAL_PER_DOC", "3"))
+    # Optional local sentence-transformers model (e.g. all-MiniLM-L6-v2); empty uses hashed TF-IDF
+    connection_embedding_model: str = os.getenv("CONNECTION_EMBEDDING_MODEL", "")
+    # Connection results cached per (normalized selection, source document, library version)
+    connection_cache_max_entries: int = int(os.getenv("CONNECTION_CACHE_MAX_ENTRIES", "256"))
     enable_timing_measurements: bool = os.getenv("ENABLE_TIMING_MEASUREMENTS", "true").lower() == "true"
     log_level: str = os.getenv("LOG_LEVEL", "INFO")
     
@@ -62,6 +85,24 @@ class Settings(BaseSettings):
     azure_tts_key: Optional[str] = os.getenv("AZURE_TTS_KEY")
     azure_tts_endpoint: Optional[str] = os.getenv("AZURE_TTS_ENDPOINT")
     azure_tts_region: Optional[str] = os.getenv("AZURE_TTS_REGION")
+    # Podcast segments are synthesized concurrently: threads for Azure, processes for local engines
+    tts_max_workers: int = int(os.getenv("TTS_MAX_WORKERS", "6"))
+    tts_local_max_workers: int = int(os.getenv("TTS_LOCAL_MAX_WORKERS", str(min(4, os.cpu_count() or 1))))
+    # Podcast responses persisted per content hash; LRU podcasts are evicted past the audio folder budget
+    podcast_cache_dir: str = os.getenv("PODCAST_CACHE_DIR", "./storage/podcast_cache")
+    podcast_cache_max_mb: int = int(os.getenv("PODCAST_CACHE_MAX_MB", "1024"))
+    # Background cleanup of unreferenced audio and orphaned outlines (0 minutes disables);
+    # PODCAST_CACHE_MAX_MB is the storage/audio quota it enforces
+    storage_janitor_interval_minutes: int = int(os.getenv("STORAGE_JANITOR_INTERVAL_MINUTES", "30"))
+    storage_janitor_max_age_hours: float = float(os.getenv("STORAGE_JANITOR_MAX_AGE_HOURS", "24"))
+    storage_janitor_grace_minutes: float = float(os.getenv("STORAGE_JANITOR_GRACE_MINUTES", "15"))
+    # Content-addressed cache of synthesized segments (text, voice, locale, provider); 0 disables
+    tts_cache_dir: str = os.getenv("TTS_CACHE_DIR", "./storage/tts_cache")
+    tts_cache_max_mb: int = int(os.getenv("TTS_CACHE_MAX_MB", "512"))
+    # Compressed podcast output (ffmpeg), cached next to the WAV; speech-oriented mono bitrates
+    podcast_mp3_bitrate: str = os.getenv("PODCAST_MP3_BITRATE", "64k")
+    podcast_opus_bitrate: str = os.getenv("PODCAST_OPUS_BITRATE", "32k")
+    podcast_transcode_timeout: int = int(os.getenv("PODCAST_TRANSCODE_TIMEOUT", "120"))
     
     # YouTube API (used by /api/youtube)
     # Prefer env var; optionally support file-based secret via YOUTUBE_API_KEY_FILE
@@ -82,6 +123,11 @@ settings = Settings()
 class Config:
     # Performance limits
     MAX_PROCESSING_TIME = 10
+    # Budgeted outline extraction scans every page for the font hierarchy when the document
+    # has at most this many pages per second of budget (full extraction runs at ~140 pages/s);
+    # longer documents estimate it from HIERARCHY_SAMPLE_PAGES pages
+    HIERARCHY_FULL_SCAN_PAGES_PER_SECOND = 50
+    HIERARCHY_SAMPLE_PAGES = 40
     MAX_MODEL_SIZE = 200
 
     # Detection thresholds
@@ -1,3 +1,4 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
@@ -7,17 +8,26 @@ import uvicorn
 
 from api import documents, connections, insights, podcast, search, individual_insights, youtube
 from config import settings
+from services import storage_janitor
 
 # Create necessary directories
 os.makedirs('storage/pdfs', exist_ok=True)
 os.makedirs('storage/outlines', exist_ok=True)
 os.makedirs('storage/audio', exist_ok=True)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Garbage-collect generated audio and orphaned outlines in the background
+    storage_janitor.start()
+    yield
+    storage_janitor.stop()
+
 # Create FastAPI app
 app = FastAPI(
     title="Document Insight & Engagement System",
     description="Adobe Hackathon 2025 - Grand Finale",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -72,6 +82,10 @@ async def root():
 async def health_check():
     return {"status": "healthy", "version": "1.0.0", "frontend": os.path.exists("../frontend/dist/index.html")}
 
+@app.get("/metrics")
+async def metrics():
+    return {"storage_janitor": storage_janitor.get_metrics()}
+
 if __name__ == "__main__":
     uvicorn.run(
         "main:app",
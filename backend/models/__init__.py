@@ -5,7 +5,12 @@ from .podcast_model import PodcastRequest, PodcastScript, PodcastResponse
 from .individual_insights_model import (
     IndividualInsightRequest, KeyTakeawayResponse, DidYouKnowResponse,
     ContradictionsResponse, ExamplesResponse, CrossReferencesResponse,
-    KnowledgeDepth, SourceContext, ContradictingSource
+    KnowledgeDepth, SourceContext, ContradictingSource,
+    BatchInsightRequest, BatchInsightResponse
+)
+from .structured_output_model import (
+    ConnectionOutput, ConnectionsOutput, ConnectionsWithSummaryOutput,
+    InsightOutput, InsightsOutput, insights_output_for
 )
 
 __all__ = [
@@ -15,5 +20,8 @@ __all__ = [
     "PodcastRequest", "PodcastScript", "PodcastResponse",
     "IndividualInsightRequest", "KeyTakeawayResponse", "DidYouKnowResponse",
     "ContradictionsResponse", "ExamplesResponse", "CrossReferencesResponse",
-    "KnowledgeDepth", "SourceContext", "ContradictingSource"
+    "KnowledgeDepth", "SourceContext", "ContradictingSource",
+    "BatchInsightRequest", "BatchInsightResponse",
+    "ConnectionOutput", "ConnectionsOutput", "ConnectionsWithSummaryOutput",
+    "InsightOutput", "InsightsOutput", "insights_output_for"
 ]
\ No newline at end of file
@@ -7,6 +7,7 @@ class ConnectionRequest(BaseModel):
     current_page: int
     context_before: Optional[str] = ""
     context_after: Optional[str] = ""
+    summary: bool = True  # False skips the summary (returned as "")
 
 class DocumentConnection(BaseModel):
     title: str  # Heading from PDF outline
@@ -18,5 +19,5 @@ class DocumentConnection(BaseModel):
 
 class ConnectionResponse(BaseModel):
     connections: List[DocumentConnection]
-    summary: str  # LLM-generated summary
+    summary: str  # Summary from the same LLM response (extractive fallback); "" when not requested
     processing_time: float
\ No newline at end of file
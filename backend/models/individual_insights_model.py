@@ -1,4 +1,4 @@
-from typing import List, Literal
+from typing import List, Literal, Optional
 from pydantic import BaseModel
 
 class SourceDocument(BaseModel):
@@ -83,3 +83,22 @@ class CrossReferencesResponse(BaseInsightResponse):
     innovation_catalyst: List[str]  # 3 single-line strings
     pattern_analysis: str  # 2-3 line sentences
     future_exploration: List[str]  # 3 single-line strings
+
+# === BATCH MODELS ===
+# All requested insight types for one selection, generated in a single LLM call
+class BatchInsightRequest(BaseModel):
+    selected_text: str
+    document_id: str
+    page_no: int
+    insight_types: List[Literal["key_takeaway", "did_you_know", "examples", "cross_references", "contradictions"]] = [
+        "key_takeaway", "did_you_know", "examples", "cross_references", "contradictions"
+    ]
+    respond: Respond
+
+class BatchInsightResponse(BaseModel):
+    key_takeaway: Optional[KeyTakeawayResponse] = None
+    did_you_know: Optional[DidYouKnowResponse] = None
+    contradictions: Optional[ContradictionsResponse] = None
+    examples: Optional[ExamplesResponse] = None
+    cross_references: Optional[CrossReferencesResponse] = None
+    processing_time: float
@@ -19,10 +19,13 @@ class InsightRequest(BaseModel):
         "did_you_know"
     ]
 
-class Insight(BaseModel):
+class InsightBase(BaseModel):
+    # Fields shared by the API insight and the LLM wire format (InsightOutput)
     type: str
+    content: str  # 2-3 sentences
+
+class Insight(InsightBase):
     title: str
-    content: str
     source_documents: List[Dict[str, Any]]  # References to source PDFs
     confidence: float
 
@@ -20,6 +20,8 @@ class PodcastRequest(BaseModel):
     duration: Literal["short", "medium", "long"] = "medium"
     # BCP-47 language code (e.g., 'en', 'en-US', 'es', 'fr', 'de', 'hi', 'ja', 'zh')
     language: Optional[str] = "en"
+    # Audio container for /generate-audio; None negotiates from the Accept header (WAV by default)
+    output_format: Optional[Literal["wav", "mp3", "opus"]] = None
 
 class PodcastScript(BaseModel):
     speaker: str
@@ -0,0 +1,38 @@
+from functools import lru_cache
+from pydantic import BaseModel, ConfigDict, create_model
+from typing import List, Literal, Tuple, Type
+from .connection_model import DocumentConnection
+from .insights_model import InsightBase
+
+# Wire formats for schema-constrained LLM output (passed as Gemini response_schema)
+
+InsightType = Literal["key_takeaways", "contradictions", "examples", "cross_references", "did_you_know"]
+
+class ConnectionOutput(DocumentConnection):
+    # Same fields as DocumentConnection; unknown keys from the model are dropped
+    model_config = ConfigDict(extra="ignore")
+
+class ConnectionsOutput(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    connections: List[ConnectionOutput]
+
+class ConnectionsWithSummaryOutput(ConnectionsOutput):
+    summary: str  # 2-3 sentences over the connections above
+
+class InsightOutput(InsightBase):
+    # LLM side of Insight: title is derived from type, source_documents from relevant_document/page_number
+    model_config = ConfigDict(extra="ignore")
+    type: InsightType
+    relevant_document: str  # Single PDF name
+    page_number: int
+    relevance_score: float  # Becomes Insight.confidence
+
+class InsightsOutput(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    insights: List[InsightOutput]
+
+@lru_cache(maxsize=32)
+def insights_output_for(insight_types: Tuple[str, ...]) -> Type[InsightsOutput]:
+    """InsightsOutput whose type enum is narrowed to one batch of insight types"""
+    item = create_model("InsightOutput", __base__=InsightOutput, type=(Literal[insight_types], ...))
+    return create_model("InsightsOutput", __base__=InsightsOutput, insights=(List[item], ...))
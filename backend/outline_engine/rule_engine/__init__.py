@@ -1 +1,2 @@
 from .smart_rule_engine import SmartRuleEngine
+from .outline_extraction import OutlineExtraction
@@ -2,11 +2,16 @@
 import re
 from typing import List, Dict
 from ..shared_utils import (
-    PDFTextUtils, DocumentAnalysisUtils, TableDetectionUtils,
-    TOCDetectionUtils, GeometricUtils
+    Block, DocumentAnalysisUtils, TableDetectionUtils,
+    TOCDetectionUtils, GeometricUtils, SpanTable, BOLD_FLAG
 )
 from .level_classifier import LevelClassifier
 
+_SENTENCE_SPLIT_PATTERN = re.compile(r'[.!?]\s+')
+_TITLE_CASE_PATTERN = re.compile(r'[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*$')
+# Numbered item, "Part IV:" style label, or a question word
+_FRAGMENT_PREFIX_PATTERN = re.compile(r'\d+\.?\s+[A-Z]|[A-Z][a-z]+\s+[IVX]+:|(?:What|How|Why|Where|When|Which)\s+')
+
 class HeadingExtractor:
     def __init__(self, heading_patterns):
         self.heading_patterns = heading_patterns
@@ -16,24 +21,27 @@ class HeadingExtractor:
         headings = []
         doc_type = DocumentAnalysisUtils.detect_document_type(doc)
         for page_num, page in enumerate(doc):
-            page_headings = self._extract_page_headings(page, page_num + 1, font_hierarchy, title, doc_type)
+            page_headings = self.extract_page_headings(page, page_num + 1, font_hierarchy, title, doc_type)
             headings.extend(page_headings)
         headings = DocumentAnalysisUtils.validate_hierarchy(headings)
         return headings
 
-    def _extract_page_headings(self, page, page_num: int, font_hierarchy: Dict, title: str = None, doc_type: str = 'general') -> List[Dict]:
-        blocks = page.get_text("dict")["blocks"]
-        if TOCDetectionUtils.is_table_of_contents_page(page, blocks):
+    def extract_page_headings(self, page, page_num: int, font_hierarchy: Dict, title: str = None, doc_type: str = 'general') -> List[Dict]:
+        blocks = Block.from_page(page)
+        if TOCDetectionUtils.is_table_of_contents_page(blocks):
             return TOCDetectionUtils.extract_toc_heading_only(blocks, page_num)
         return self._extract_generic_headings(blocks, page_num, font_hierarchy, title)
 
-    def _extract_generic_headings(self, blocks: List[Dict], page_num: int, font_hierarchy: Dict, title: str = None) -> List[Dict]:
+    def _extract_generic_headings(self, blocks: List[Block], page_num: int, font_hierarchy: Dict, title: str = None) -> List[Dict]:
         headings = []
         table_areas = TableDetectionUtils.detect_tables(None, blocks) if blocks else []
-        for block in blocks:
-            if block["type"] != 0:
+        spans = SpanTable.from_blocks(blocks, page_num)
+        block_font_sizes = spans.block_font_sizes(len(blocks))
+        block_is_bold = spans.block_has_flag(BOLD_FLAG, len(blocks))
+        for block_index, block in enumerate(blocks):
+            if not block.is_text:
                 continue
-            text = PDFTextUtils.extract_block_text(block).strip()
+            text = block.text
             if not text:
                 continue
             if GeometricUtils.is_block_in_table(block, table_areas):
@@ -44,8 +52,8 @@ class HeadingExtractor:
                 continue
             if title and text.strip().lower() == title.strip().lower():
                 continue
-            font_size = PDFTextUtils.get_block_font_size(block)
-            is_bold = PDFTextUtils.is_block_bold(block)
+            font_size = float(block_font_sizes[block_index])
+            is_bold = bool(block_is_bold[block_index])
             level = self.level_classifier.determine_heading_level_generic(text, font_size, is_bold, font_hierarchy, page_num)
             if level:
                 headings.append({'level': level,'text': text,'page': page_num})
@@ -53,7 +61,7 @@ class HeadingExtractor:
 
     def _extract_headings_from_long_block(self, text: str, page_num: int) -> List[Dict]:
         headings = []
-        sentences = re.split(r'[.!?]\s+', text)
+        sentences = _SENTENCE_SPLIT_PATTERN.split(text)
         for sentence in sentences:
             sentence = sentence.strip()
             if not sentence or len(sentence) < 5:
@@ -65,12 +73,10 @@ class HeadingExtractor:
     def _looks_like_heading_fragment(self, text: str) -> bool:
         if len(text) > 100:
             return False
-        heading_indicators = [
-            len(text) < 50 and text.isupper(),
-            text.endswith(':') and len(text) < 30,
-            re.match(r'^[A-Z][a-z]+(\s+[A-Z][a-z]+)*$', text) and len(text) < 40,
-            re.match(r'^\d+\.?\s+[A-Z]', text),
-            re.match(r'^[A-Z][a-z]+\s+[IVX]+:', text),
-            re.match(r'^(What|How|Why|Where|When|Which)\s+', text),
-        ]
-        return any(heading_indicators)
+        # Cheapest checks first; stops at the first indicator
+        return (
+            (len(text) < 50 and text.isupper())
+            or (text.endswith(':') and len(text) < 30)
+            or (len(text) < 40 and _TITLE_CASE_PATTERN.match(text) is not None)
+            or _FRAGMENT_PREFIX_PATTERN.match(text) is not None
+        )
@@ -2,6 +2,29 @@
 import re
 from typing import Dict, Optional
 
+# Body sentences, instructions, dates, versions, addresses, contacts, long numbers and
+# repeated phrases: one anchored alternation, compiled once. The sentence, address and URL
+# branches are written so they cannot backtrack quadratically (".*[a-z]+" nesting, ".*\d+.*"):
+# each accepts exactly the same strings as the original per-pattern list.
+_NON_HEADING_PATTERN = re.compile(
+    r'[A-Z][a-z].*[a-z]\s+(?:will|are|is|have|has|can|should|must|would|could)\s+.+\.$'
+    r'|(?:Please|Click|Visit|Fill|Complete|Submit|Download|Upload|Print|Sign)\s+'
+    r'|(?:January|February|March|April|May|June|July|August|September|October|November|December)\s+\d+,?\s+\d{4}'
+    r'|\d{1,2}[/-]\d{1,2}[/-]\d{2,4}'
+    r'|(?:Version|Copyright|©)\s+'
+    r'|[^\n\d]*\d[^\n]*?\b(?:Street|St|Avenue|Ave|Drive|Dr|Road|Rd|Lane|Ln|Boulevard|Blvd)\b'
+    r'|[^\n@]*@[^\n]*?\.(?:com|org|net|edu|gov)'
+    r'|[^\n]*?(?:http|www\.|\.com|\.org)'
+    r'|\d{5,}'
+    r'|(?P<phrase>.{3,})\s+(?P=phrase)',
+    re.IGNORECASE
+)
+_PART_PREFIX_PATTERN = re.compile(r'(Chapter|Section|Part|Appendix)', re.IGNORECASE)
+_NUMBERED_TITLE_PATTERN = re.compile(r'\d+\.\s+[A-Z]')
+# "1." -> H1, "1.2" -> H2, "1.2.3" -> H3
+_SECTION_NUMBER_PATTERN = re.compile(r'\d+\.(\d+(\.\d+)?)?')
+_PART_LABEL_PATTERN = re.compile(r'(Appendix|Chapter|Section|Part)\s+[A-Z0-9]', re.IGNORECASE)
+
 class LevelClassifier:
     def __init__(self, heading_patterns):
         self.heading_patterns = heading_patterns
@@ -28,22 +51,7 @@ class LevelClassifier:
     def _is_potential_heading(self, text: str, page_num: int) -> bool:
         if len(text) > 150 or len(text) < 3:
             return False
-        non_heading_patterns = [
-            r'^[A-Z][a-z]+.*[a-z]+\s+(will|are|is|have|has|can|should|must|would|could)\s+.+\.$',
-            r'^(Please|Click|Visit|Fill|Complete|Submit|Download|Upload|Print|Sign)\s+',
-            r'^(January|February|March|April|May|June|July|August|September|October|November|December)\s+\d+,?\s+\d{4}',
-            r'^\d{1,2}[/-]\d{1,2}[/-]\d{2,4}',
-            r'^(Version|Copyright|©|$c$)\s+',
-            r'.*\d+.*\b(Street|St|Avenue|Ave|Drive|Dr|Road|Rd|Lane|Ln|Boulevard|Blvd)\b.*',
-            r'.*@.*\.(com|org|net|edu|gov).*',
-            r'.*(http|www\.|\.com|\.org).*',
-            r'^\d{5,}.*',
-            r'^(.{3,})\s+\1'
-        ]
-        for pattern in non_heading_patterns:
-            if re.match(pattern, text, re.IGNORECASE):
-                return False
-        return True
+        return _NON_HEADING_PATTERN.match(text) is None
 
     def _classify_by_font_hierarchy(self, text: str, font_size: float, is_bold: bool, font_hierarchy: Dict) -> Optional[str]:
         title_threshold = font_hierarchy.get('title', 16.0)
@@ -61,7 +69,7 @@ class LevelClassifier:
         elif font_size >= 13.0:
             if len(text) < 60:
                 h1_indicators = [
-                    re.match(r'^(Chapter|Section|Part|Appendix)', text, re.IGNORECASE),
+                    _PART_PREFIX_PATTERN.match(text),
                     text.endswith('Library') or text.endswith('Strategy'),
                     'Digital Library' in text or 'Road Map' in text,
                     len(text) > 40 and not text.endswith(':')
@@ -74,7 +82,7 @@ class LevelClassifier:
             if len(text) < 60:
                 return 'H2'
             if len(text) < 60:
-                if (re.match(r'^\d+\.\s+[A-Z]', text) or text.endswith(':') or is_bold):
+                if (_NUMBERED_TITLE_PATTERN.match(text) or text.endswith(':') or is_bold):
                     return 'H2'
                 else:
                     return 'H3'
@@ -84,12 +92,11 @@ class LevelClassifier:
         elif is_bold and font_size > body_size * 1.05:
             if len(text) < 40:
                 return 'H3'
-        if re.match(r'^\d+\.\d+\.\d+', text):
-            return 'H3'
-        elif re.match(r'^\d+\.\d+', text):
-            return 'H2'
-        elif re.match(r'^\d+\.', text):
-            return 'H1'
-        if re.match(r'^(Appendix|Chapter|Section|Part)\s+[A-Z0-9]', text, re.IGNORECASE):
+        section_number = _SECTION_NUMBER_PATTERN.match(text)
+        if section_number:
+            if section_number.group(2):
+                return 'H3'
+            return 'H2' if section_number.group(1) else 'H1'
+        if _PART_LABEL_PATTERN.match(text):
             return 'H1'
         return None
@@ -0,0 +1,62 @@
+# outline_extraction.py
+import time
+import fitz
+from typing import Dict, List, Optional
+from ..shared_utils import DocumentAnalysisUtils, FontHierarchyAnalyzer, MUPDF_LOCK
+
+class OutlineExtraction:
+    """Resumable outline extraction for one PDF.
+
+    Title and font hierarchy are computed up front, from a page sample when ``sample_pages``
+    is set and the document has more than ``full_scan_pages`` pages. Headings are then
+    extracted page by page by ``run`` until the document is done or the deadline passes. ``result`` returns the outline so far, and ``run`` can be
+    called again later to finish it.
+    """
+
+    def __init__(self, engine, pdf_path: str, sample_pages: Optional[int] = None, full_scan_pages: int = 0):
+        self.engine = engine
+        self.pdf_path = pdf_path
+        self.next_page = 0
+        self.headings: List[Dict] = []
+        with MUPDF_LOCK:
+            self.doc = fitz.open(pdf_path)
+            try:
+                self.page_count = len(self.doc)
+                pages = None
+                if sample_pages and self.page_count > full_scan_pages:
+                    pages = FontHierarchyAnalyzer.sample_pages(self.page_count, sample_pages)
+                self.font_hierarchy = engine.font_analyzer.analyze(self.doc, pages)
+                self.title = engine.title_extractor.extract_title(self.doc, self.font_hierarchy)
+                self.doc_type = DocumentAnalysisUtils.detect_document_type(self.doc)
+            except Exception:
+                self.doc.close()
+                raise
+
+    @property
+    def done(self) -> bool:
+        return self.next_page >= self.page_count
+
+    def run(self, deadline: Optional[float] = None) -> bool:
+        """Extract headings until done or ``time.monotonic()`` passes the deadline; returns done"""
+        while not self.done:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            # Held per page, so other PDF reads interleave with a background resume
+            with MUPDF_LOCK:
+                page = self.doc[self.next_page]
+                self.headings.extend(self.engine.heading_extractor.extract_page_headings(
+                    page, self.next_page + 1, self.font_hierarchy, self.title, self.doc_type
+                ))
+            self.next_page += 1
+        return True
+
+    def result(self) -> Dict:
+        headings = DocumentAnalysisUtils.validate_hierarchy([dict(heading) for heading in self.headings])
+        outline = {"title": self.title, "outline": headings}
+        if not self.done:
+            outline.update({"partial": True, "pages_processed": self.next_page, "page_count": self.page_count})
+        return outline
+
+    def close(self) -> None:
+        with MUPDF_LOCK:
+            self.doc.close()
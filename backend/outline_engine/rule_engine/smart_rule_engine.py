@@ -1,10 +1,11 @@
 # smart_rule_engine.py (copied & adapted)
-import fitz
-from typing import Dict
+import time
+from typing import Dict, Optional
 from config import Config
 from ..shared_utils import PatternMatchingUtils, FontHierarchyAnalyzer
 from .title_extractor import TitleExtractor
 from .heading_extractor import HeadingExtractor
+from .outline_extraction import OutlineExtraction
 
 class SmartRuleEngine:
     def __init__(self):
@@ -14,9 +15,30 @@ class SmartRuleEngine:
         self.heading_extractor = HeadingExtractor(self.heading_patterns)
 
     def extract(self, pdf_path: str) -> Dict:
-        doc = fitz.open(pdf_path)
-        font_hierarchy = self.font_analyzer.analyze(doc)
-        title = self.title_extractor.extract_title(doc, font_hierarchy)
-        headings = self.heading_extractor.extract_headings(doc, font_hierarchy, title)
-        doc.close()
-        return {"title": title, "outline": headings}
+        extraction = OutlineExtraction(self, pdf_path)
+        try:
+            extraction.run()
+            return extraction.result()
+        finally:
+            extraction.close()
+
+    def extract_within(self, pdf_path: str, time_budget: Optional[float] = None) -> OutlineExtraction:
+        """Budgeted extraction: font hierarchy, then headings until the budget runs out.
+
+        Documents short enough to finish within the budget get the full-document hierarchy,
+        so their outline matches ``extract``; longer ones estimate it from a page sample.
+        The returned extraction holds the (possibly partial) outline in ``result()``; when it
+        is not ``done`` the caller resumes it with ``run()`` and must ``close()`` it.
+        """
+        budget = Config.MAX_PROCESSING_TIME if time_budget is None else time_budget
+        deadline = time.monotonic() + budget
+        extraction = OutlineExtraction(
+            self, pdf_path, sample_pages=Config.HIERARCHY_SAMPLE_PAGES,
+            full_scan_pages=int(budget * Config.HIERARCHY_FULL_SCAN_PAGES_PER_SECOND)
+        )
+        try:
+            extraction.run(deadline)
+        except Exception:
+            extraction.close()
+            raise
+        return extraction
@@ -1,30 +1,33 @@
 # title_extractor.py (copied)
 import re
 from typing import Dict
-from ..shared_utils import PDFTextUtils, TableDetectionUtils, GeometricUtils
+from ..shared_utils import Block, TableDetectionUtils, GeometricUtils, SpanTable, BOLD_FLAG
 
 class TitleExtractor:
     def extract_title(self, doc, font_hierarchy: Dict) -> str:
         title_candidates = []
+        page_layouts = {}
         for page_num in range(min(3, len(doc))):
             page = doc[page_num]
-            blocks = page.get_text("dict")["blocks"]
-            table_areas = TableDetectionUtils.detect_tables(page, blocks)
+            blocks, table_areas = self._page_blocks_and_tables(page, page_layouts)
+            spans = SpanTable.from_blocks(blocks, page_num)
+            block_font_sizes = spans.block_font_sizes(len(blocks))
             if page_num == 0:
-                title_parts = self._extract_multi_block_title(blocks, table_areas, font_hierarchy)
+                title_parts = self._extract_multi_block_title(blocks, table_areas, font_hierarchy, block_font_sizes)
                 if title_parts:
                     return title_parts
-            for block in blocks:
-                if block["type"] == 0:
-                    text = PDFTextUtils.extract_block_text(block).strip()
+            block_is_bold = spans.block_has_flag(BOLD_FLAG, len(blocks))
+            for block_index, block in enumerate(blocks):
+                if block.is_text:
+                    text = block.text
                     if not text or len(text) > 300:
                         continue
                     if GeometricUtils.is_block_in_table(block, table_areas):
                         continue
                     if TableDetectionUtils.is_table_or_form_content(text):
                         continue
-                    font_size = PDFTextUtils.get_block_font_size(block)
-                    is_bold = PDFTextUtils.is_block_bold(block)
+                    font_size = float(block_font_sizes[block_index])
+                    is_bold = bool(block_is_bold[block_index])
                     score = 0
                     body_size = font_hierarchy.get('body', 10.0)
                     if font_size >= body_size * 1.8:
@@ -43,7 +46,7 @@ class TitleExtractor:
                         score -= 2
                     elif len(text) > 100:
                         score -= 1
-                    bbox = block['bbox']
+                    bbox = block.bbox
                     page_height = page.rect.height
                     if bbox[1] < page_height * 0.4:
                         score += 1
@@ -55,33 +58,38 @@ class TitleExtractor:
             title_candidates.sort(key=lambda x: (-x['score'], x['page'], -x['font_size']))
             return title_candidates[0]['text']
         if len(doc) > 0:
-            page = doc[0]
-            blocks = page.get_text("dict")["blocks"]
-            table_areas = TableDetectionUtils.detect_tables(page, blocks)
+            blocks, table_areas = self._page_blocks_and_tables(doc[0], page_layouts)
             for block in blocks:
-                if block["type"] == 0:
+                if block.is_text:
                     if GeometricUtils.is_block_in_table(block, table_areas):
                         continue
-                    text = PDFTextUtils.extract_block_text(block).strip()
+                    text = block.text
                     if (text and 10 <= len(text) <= 200 and not TableDetectionUtils.is_table_or_form_content(text)):
                         return text
         return "Untitled Document"
 
-    def _extract_multi_block_title(self, blocks, table_areas, font_hierarchy: Dict) -> str:
+    def _page_blocks_and_tables(self, page, page_layouts: Dict):
+        # Table detection is the expensive part; the fallback pass revisits page 0
+        if page.number not in page_layouts:
+            blocks = Block.from_page(page)
+            page_layouts[page.number] = (blocks, TableDetectionUtils.detect_tables(page, blocks))
+        return page_layouts[page.number]
+
+    def _extract_multi_block_title(self, blocks, table_areas, font_hierarchy: Dict, block_font_sizes) -> str:
         title_blocks = []
         for i, block in enumerate(blocks):
-            if block["type"] == 0:
-                text = PDFTextUtils.extract_block_text(block).strip()
+            if block.is_text:
+                text = block.text
                 if not text or len(text) < 5:
                     continue
                 if GeometricUtils.is_block_in_table(block, table_areas):
                     continue
                 if TableDetectionUtils.is_table_or_form_content(text):
                     continue
-                font_size = PDFTextUtils.get_block_font_size(block)
+                font_size = float(block_font_sizes[i])
                 body_size = font_hierarchy.get('body', 10.0)
                 if font_size >= body_size * 1.5:
-                    bbox = block['bbox']
+                    bbox = block.bbox
                     title_blocks.append({'text': text,'font_size': font_size,'bbox': bbox,'y_pos': bbox[1]})
         if not title_blocks:
             return None
@@ -1,3 +1,4 @@
+from .blocks import Block
 from .pdf_text import PDFTextUtils
 from .geometric import GeometricUtils
 from .document_analysis import DocumentAnalysisUtils
@@ -6,8 +7,11 @@ from .toc_detection import TOCDetectionUtils
 from .text_normalization import TextNormalizationUtils
 from .font_hierarchy import FontHierarchyAnalyzer
 from .pattern_matching import PatternMatchingUtils
+from .span_table import SpanTable, BOLD_FLAG, ITALIC_FLAG
+from .mupdf_lock import MUPDF_LOCK
 
 __all__ = [
+    'Block',
     'PDFTextUtils',
     'GeometricUtils',
     'DocumentAnalysisUtils',
@@ -15,5 +19,9 @@ __all__ = [
     'TOCDetectionUtils',
     'TextNormalizationUtils',
     'FontHierarchyAnalyzer',
-    'PatternMatchingUtils'
+    'PatternMatchingUtils',
+    'SpanTable',
+    'BOLD_FLAG',
+    'ITALIC_FLAG',
+    'MUPDF_LOCK'
 ]
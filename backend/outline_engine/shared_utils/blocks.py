@@ -0,0 +1,36 @@
+# blocks.py
+from typing import Dict, List
+
+class Block:
+    """A page block from ``page.get_text("dict")`` with its text joined once.
+
+    ``text`` is the span-joined text used by the classifiers (same as
+    ``PDFTextUtils.extract_block_text``); ``plain_text`` keeps the raw line text the way
+    ``page.get_text()`` reports it. ``raw`` is the original dict (lines and spans).
+    """
+    __slots__ = ('index', 'type', 'bbox', 'text', 'plain_text', 'raw')
+
+    def __init__(self, raw: Dict, index: int = 0):
+        self.index = index
+        self.type = raw.get("type")
+        self.bbox = raw.get("bbox")
+        self.raw = raw
+        text_parts = []
+        plain_lines = []
+        for line in raw.get("lines", []):
+            span_texts = [span.get("text", "") for span in line.get("spans", [])]
+            plain_lines.append("".join(span_texts))
+            line_text = " ".join(span_text.strip() for span_text in span_texts if span_text.strip())
+            if line_text:
+                text_parts.append(line_text)
+        self.text = " ".join(text_parts)
+        self.plain_text = "\n".join(plain_lines)
+
+    @property
+    def is_text(self) -> bool:
+        return self.type == 0
+
+    @staticmethod
+    def from_page(page) -> List['Block']:
+        """Extract a page's blocks with a single get_text("dict") call"""
+        return [Block(raw, index) for index, raw in enumerate(page.get_text("dict")["blocks"])]
@@ -2,32 +2,32 @@
 import re
 import numpy as np
 from typing import List, Dict
-from .pdf_text import PDFTextUtils
+from .blocks import Block
 
 class DocumentAnalysisUtils:
     @staticmethod
     def calculate_document_stats(blocks: List[Dict]) -> Dict:
-        font_sizes = []
-        for block in blocks:
-            avg_size = block.get('avg_font_size', 0)
-            word_count = block.get('word_count', 1)
-            if avg_size > 0:
-                font_sizes.extend([avg_size] * word_count)
-        if not font_sizes:
+        avg_sizes = np.array([block.get('avg_font_size', 0) for block in blocks], dtype=np.float64)
+        word_counts = np.array([block.get('word_count', 1) for block in blocks], dtype=np.int64)
+        # Each block's size counts once per word: repeat instead of building the list in Python
+        weights = np.where(avg_sizes > 0, np.maximum(word_counts, 0), 0)
+        font_sizes = np.repeat(avg_sizes, weights)
+        if not font_sizes.size:
             return {
                 'median_font_size': 12,
                 'font_size_percentiles': {'p75': 14, 'p90': 16, 'p95': 18},
                 'avg_block_words': 5,
                 'total_blocks': len(blocks)
             }
+        p75, p90, p95 = np.percentile(font_sizes, [75, 90, 95])
         return {
             'median_font_size': np.median(font_sizes),
             'font_size_percentiles': {
-                'p75': np.percentile(font_sizes, 75),
-                'p90': np.percentile(font_sizes, 90),
-                'p95': np.percentile(font_sizes, 95)
+                'p75': p75,
+                'p90': p90,
+                'p95': p95
             },
-            'avg_block_words': np.mean([b.get('word_count', 1) for b in blocks]),
+            'avg_block_words': word_counts.mean(),
             'total_blocks': len(blocks)
         }
 
@@ -83,15 +83,15 @@ class DocumentAnalysisUtils:
         sample_pages = min(3, len(doc))
         for page_num in range(sample_pages):
             page = doc[page_num]
-            blocks = page.get_text("dict")["blocks"]
-            total_blocks += len([b for b in blocks if b["type"] == 0])
+            blocks = Block.from_page(page)
+            total_blocks += len([b for b in blocks if b.is_text])
             for block in blocks:
-                if block["type"] != 0:
+                if not block.is_text:
                     continue
-                text = PDFTextUtils.extract_block_text(block)
-                if not text.strip():
+                text = block.text
+                if not text:
                     continue
-                bbox = block['bbox']
+                bbox = block.bbox
                 page_width = page.rect.width
                 block_center = (bbox[0] + bbox[2]) / 2
                 page_center = page_width / 2
@@ -101,7 +101,7 @@ class DocumentAnalysisUtils:
                     short_lines += 1
                 if re.match(r'^\d+\.?\s+[A-Z]', text.strip()):
                     numbered_sections += 1
-                for line in block.get("lines", []):
+                for line in block.raw.get("lines", []):
                     for span in line.get("spans", []):
                         font_sizes.add(round(span.get("size", 10), 1))
         if sample_pages > 0:
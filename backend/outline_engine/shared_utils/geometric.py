@@ -1,5 +1,6 @@
 # geometric.py (copied)
 from typing import List, Dict
+from .blocks import Block
 
 class GeometricUtils:
     @staticmethod
@@ -7,10 +8,10 @@ class GeometricUtils:
         return not (bbox1[2] <= bbox2[0] or bbox2[2] <= bbox1[0] or bbox1[3] <= bbox2[1] or bbox2[3] <= bbox1[1])
 
     @staticmethod
-    def is_block_in_table(block: Dict, table_areas: List[Dict]) -> bool:
+    def is_block_in_table(block: Block, table_areas: List[Dict]) -> bool:
         if not table_areas:
             return False
-        block_bbox = block['bbox']
+        block_bbox = block.bbox
         for table in table_areas:
             if GeometricUtils.bboxes_overlap(block_bbox, table['bbox']):
                 return True
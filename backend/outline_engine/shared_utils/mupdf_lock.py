@@ -0,0 +1,6 @@
+# mupdf_lock.py
+import threading
+
+# MuPDF is not thread-safe. Every fitz.open and page access in the backend (outline
+# extraction, including its background resume, and utils.pdf_utils) takes this lock
+MUPDF_LOCK = threading.Lock()
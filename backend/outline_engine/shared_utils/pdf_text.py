@@ -1,6 +1,7 @@
 # pdf_text.py (copied from temp-repo)
-import numpy as np
 from typing import Dict
+from .blocks import Block
+from .span_table import SpanTable, BOLD_FLAG, ITALIC_FLAG
 
 class PDFTextUtils:
     @staticmethod
@@ -35,25 +36,17 @@ class PDFTextUtils:
 
     @staticmethod
     def extract_font_features(block: Dict) -> Dict:
+        spans = SpanTable.from_blocks([Block(block)])
         features = {
-            'font_sizes': [],
-            'font_names': set(),
-            'is_bold': False,
-            'is_italic': False
+            'font_sizes': spans.sizes.tolist(),
+            'font_names': set(spans.fonts),
+            'is_bold': bool(spans.block_has_flag(BOLD_FLAG, 1)[0]),
+            'is_italic': bool(spans.block_has_flag(ITALIC_FLAG, 1)[0])
         }
-        for line in block.get("lines", []):
-            for span in line.get("spans", []):
-                features['font_sizes'].append(span.get("size", 0))
-                features['font_names'].add(span.get("font", ""))
-                flags = span.get("flags", 0)
-                if flags & 2**4:
-                    features['is_bold'] = True
-                if flags & 2**1:
-                    features['is_italic'] = True
-        if features['font_sizes']:
-            features['avg_font_size'] = np.mean(features['font_sizes'])
-            features['max_font_size'] = max(features['font_sizes'])
-            features['min_font_size'] = min(features['font_sizes'])
+        if len(spans):
+            features['avg_font_size'] = float(spans.block_font_sizes(1)[0])
+            features['max_font_size'] = float(spans.sizes.max())
+            features['min_font_size'] = float(spans.sizes.min())
         else:
             features['avg_font_size'] = 0
             features['max_font_size'] = 0
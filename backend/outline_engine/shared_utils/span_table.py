@@ -0,0 +1,101 @@
+# span_table.py
+import numpy as np
+from typing import Callable, Dict, List, Optional
+from .blocks import Block
+
+BOLD_FLAG = 2**4
+ITALIC_FLAG = 2**1
+DEFAULT_SPAN_SIZE = 10.0
+
+class SpanTable:
+    """Text spans as parallel NumPy columns (one row per span).
+
+    Columns: size, flags, font id (index into ``fonts``), character count, page number,
+    bbox (N x 4) and the span's block index within its page's block list. Font
+    statistics are computed as reductions over these columns instead of per-span dicts.
+    """
+
+    def __init__(self, sizes, flags, font_ids, char_counts, pages, bboxes, block_ids, fonts: List[str]):
+        self.sizes = sizes
+        self.flags = flags
+        self.font_ids = font_ids
+        self.char_counts = char_counts
+        self.pages = pages
+        self.bboxes = bboxes
+        self.block_ids = block_ids
+        self.fonts = fonts
+
+    def __len__(self) -> int:
+        return len(self.sizes)
+
+    @classmethod
+    def from_blocks(cls, blocks: List[Block], page_num: int = 0, block_filter: Optional[Callable[[Block], bool]] = None) -> 'SpanTable':
+        builder = _SpanTableBuilder()
+        builder.add_page(blocks, page_num, block_filter)
+        return builder.build()
+
+    @classmethod
+    def from_document(cls, doc, block_filter: Optional[Callable[[Block], bool]] = None, pages: Optional[List[int]] = None) -> 'SpanTable':
+        """All pages, or only the given page numbers (spans keep their real page number)"""
+        builder = _SpanTableBuilder()
+        for page_num in (range(len(doc)) if pages is None else pages):
+            builder.add_page(Block.from_page(doc[page_num]), page_num, block_filter)
+        return builder.build()
+
+    # Per-block reductions; only meaningful for a single page's table
+    def block_font_sizes(self, block_count: int, default: float = DEFAULT_SPAN_SIZE) -> np.ndarray:
+        """Mean span size of each block (``default`` for blocks without spans)"""
+        totals = np.bincount(self.block_ids, weights=self.sizes, minlength=block_count)
+        counts = np.bincount(self.block_ids, minlength=block_count)
+        return np.divide(totals, counts, out=np.full(block_count, default), where=counts > 0)
+
+    def block_has_flag(self, flag: int, block_count: int) -> np.ndarray:
+        """Whether any span of each block has ``flag`` set (e.g. BOLD_FLAG)"""
+        return np.bincount(self.block_ids[(self.flags & flag) != 0], minlength=block_count) > 0
+
+    def body_font_size(self) -> float:
+        """Size of the (size, font) pair carrying the most characters; ties go to the first seen"""
+        _, size_ids = np.unique(self.sizes, return_inverse=True)
+        font_keys = size_ids * max(len(self.fonts), 1) + self.font_ids
+        _, first_rows, group_ids = np.unique(font_keys, return_index=True, return_inverse=True)
+        group_chars = np.bincount(group_ids, weights=self.char_counts)
+        busiest = np.flatnonzero(group_chars == group_chars.max())
+        return float(self.sizes[first_rows[busiest].min()])
+
+class _SpanTableBuilder:
+    def __init__(self):
+        self.sizes: List[float] = []
+        self.flags: List[int] = []
+        self.font_ids: List[int] = []
+        self.char_counts: List[int] = []
+        self.pages: List[int] = []
+        self.bboxes: List = []
+        self.block_ids: List[int] = []
+        self.font_index: Dict[str, int] = {}
+
+    def add_page(self, blocks: List[Block], page_num: int, block_filter: Optional[Callable[[Block], bool]]):
+        for block_id, block in enumerate(blocks):
+            if not block.is_text or (block_filter and not block_filter(block)):
+                continue
+            for line in block.raw.get("lines", []):
+                for span in line.get("spans", []):
+                    font = span.get("font", "")
+                    self.sizes.append(span.get("size", DEFAULT_SPAN_SIZE))
+                    self.flags.append(span.get("flags", 0))
+                    self.font_ids.append(self.font_index.setdefault(font, len(self.font_index)))
+                    self.char_counts.append(len(span.get("text", "")))
+                    self.pages.append(page_num)
+                    self.bboxes.append(span.get("bbox", (0, 0, 0, 0)))
+                    self.block_ids.append(block_id)
+
+    def build(self) -> SpanTable:
+        return SpanTable(
+            sizes=np.array(self.sizes, dtype=np.float64),
+            flags=np.array(self.flags, dtype=np.int64),
+            font_ids=np.array(self.font_ids, dtype=np.int64),
+            char_counts=np.array(self.char_counts, dtype=np.int64),
+            pages=np.array(self.pages, dtype=np.int64),
+            bboxes=np.array(self.bboxes, dtype=np.float64).reshape(-1, 4),
+            block_ids=np.array(self.block_ids, dtype=np.int64),
+            fonts=list(self.font_index)
+        )
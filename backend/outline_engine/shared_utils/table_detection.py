@@ -1,85 +1,126 @@
 # table_detection.py (copied)
 import re
 from typing import List, Dict, Optional
-from .pdf_text import PDFTextUtils
+from .blocks import Block
+
+# Classifier patterns are compiled once; anchored checks are fused into one alternation each
+
+# Column headers (searched anywhere in the block). Searches with a literal prefix are much
+# faster than one case-insensitive alternation, so ASCII text is lowercased once and scanned
+# with the lowercase patterns; other text uses the case-insensitive fused pattern.
+_TABLE_HEADER_PATTERNS = (
+    re.compile(r's\.?no\.?\s+(?:name|description|item)'),
+    re.compile(r'(?:name|item|description)\s+(?:age|quantity|amount)'),
+    re.compile(r'(?:name|age|relationship)\s+(?:name|age|relationship)'),
+)
+_TABLE_HEADER_PATTERN = re.compile('|'.join(pattern.pattern for pattern in _TABLE_HEADER_PATTERNS), re.IGNORECASE)
+# Three numbered cells in a row ("1. 2. 3."); starting at the last digit of a number is enough
+_NUMBERED_CELLS_PATTERN = re.compile(r'\d\.\s+\d+\.\s+\d+\.')
+_NUMBER_RUN_PATTERN = re.compile(r'\d+\.\s*\d+\.\s*\d+\.\s*\d+')
+# Form field labels and bare number cells (anchored at the start of the raw block text)
+_FORM_FIELD_PATTERN = re.compile(
+    r'\d+\.\s*(?:Name|Designation|PAY|Whether|Home Town|Amount)'
+    r'|S\.?No\.?\s+(?:Name|Age|Relationship)'
+    r'|\d+\.\s+\d+\.\s*$'
+    r'|\d+\.\s+\d+\.\s+\d+\.\s*$'
+    r'|\d+\.\s+\d+\.\s+\d+\.\s+\d+'
+    r'|(?:Date|Signature)'
+    r'|Rs\.\s*$'
+    r'|\d+\s+\d+\s+\d+\s*$'
+    r'|\d+\s*\d+\s*\d+\s*$',
+    re.IGNORECASE
+)
+# Row numbers, "3. A." style markers and short runs of digits and dots containing a dot
+# (matched against the stripped text, case-sensitive)
+_FORM_MARKER_PATTERN = re.compile(
+    r'\d+\.?\s*$'
+    r'|\d+\.\s*[A-Z]\.?\s*$'
+    r'|(?=[\d\s]*\.)[\d.\s]{2,10}$'
+)
+_NUMBERED_FIELD_PATTERN = re.compile(r'\d+\.\s*(.{0,50})?$')
+# PyMuPDF's default snap tolerance and minimum edge length for table rulings
+_RULING_TOLERANCE = 3
 
 class TableDetectionUtils:
     @staticmethod
     def is_table_structure(text: str) -> bool:
-        table_patterns = [
-            r'S\.?No\.?\s+(Name|Description|Item)',
-            r'(Name|Item|Description)\s+(Age|Quantity|Amount)',
-            r'\d+\.\s+\d+\.\s+\d+\.',
-            r'(Name|Age|Relationship)\s+(Name|Age|Relationship)',
-        ]
-        for pattern in table_patterns:
-            if re.search(pattern, text, re.IGNORECASE):
-                return True
-        if re.search(r'S\.?No\.?\s+Name\s+Age\s+Relationship', text, re.IGNORECASE):
-            return True
-        if re.match(r'^\d+\.\s*\d+\.\s*\d+\.\s*\d+', text.strip()):
+        if '.' in text and (_NUMBERED_CELLS_PATTERN.search(text) or _NUMBER_RUN_PATTERN.match(text.strip())):
             return True
-        return False
+        if text.isascii():
+            lowered = text.lower()
+            return any(pattern.search(lowered) for pattern in _TABLE_HEADER_PATTERNS)
+        return _TABLE_HEADER_PATTERN.search(text) is not None
 
     @staticmethod
     def is_table_or_form_content(text: str) -> bool:
-        if re.match(r'^\d+\.?\s*$', text.strip()):
-            return True
-        form_patterns = [
-            r'^\d+\.\s*(Name|Designation|PAY|Whether|Home Town|Amount)',
-            r'^S\.?No\.?\s+(Name|Age|Relationship)',
-            r'^\d+\.\s+\d+\.\s*$',
-            r'^\d+\.\s+\d+\.\s+\d+\.\s*$',
-            r'^\d+\.\s+\d+\.\s+\d+\.\s+\d+',
-            r'^(Date|Signature)',
-            r'^Rs\.\s*$',
-            r'^\d+\s+\d+\s+\d+\s*$',
-            r'^\d+\s*\d+\s*\d+\s*$',
-        ]
-        for pattern in form_patterns:
-            if re.search(pattern, text, re.IGNORECASE):
-                return True
-        if len(text.strip()) <= 2 and text.strip().isdigit():
-            return True
-        if re.match(r'^\d+\.\s*[A-Z]\.?(\s*)?$', text.strip()):
+        stripped = text.strip()
+        if _FORM_MARKER_PATTERN.match(stripped) or _FORM_FIELD_PATTERN.match(text):
             return True
-        if re.match(r'^[\d\.\s]{2,10}$', text.strip()) and '.' in text:
-            return True
-        return False
+        return len(stripped) <= 2 and stripped.isdigit()
 
     @staticmethod
-    def detect_tables(page, blocks: List[Dict]) -> List[Dict]:
+    def detect_tables(page, blocks: List[Block]) -> List[Dict]:
         table_areas = []
         for block in blocks:
-            if block["type"] != 0:
+            if not block.is_text:
                 continue
-            text = PDFTextUtils.extract_block_text(block).strip()
-            if TableDetectionUtils.is_table_structure(text):
-                table_areas.append({'bbox': block['bbox'], 'type': 'text_table', 'confidence': 0.8})
-        try:
-            layout_tables = page.find_tables()
-            for table in layout_tables:
-                table_areas.append({'bbox': table.bbox, 'type': 'detected_table', 'confidence': 0.9})
-        except:
-            pass
+            if TableDetectionUtils.is_table_structure(block.text):
+                table_areas.append({'bbox': block.bbox, 'type': 'text_table', 'confidence': 0.8})
+        if page is not None:
+            try:
+                if TableDetectionUtils.has_ruling_lines(page):
+                    for table in page.find_tables():
+                        table_areas.append({'bbox': table.bbox, 'type': 'detected_table', 'confidence': 0.9})
+            except:
+                pass
         form_area = TableDetectionUtils.detect_form_structure(blocks)
         if form_area:
             table_areas.append(form_area)
         return table_areas
 
     @staticmethod
-    def detect_form_structure(blocks: List[Dict]) -> Optional[Dict]:
+    def has_ruling_lines(page) -> bool:
+        """Cheap pre-check for find_tables, whose line strategy builds cells from ruling edges.
+
+        A table needs at least two horizontal and two vertical axis-parallel segments
+        (drawn lines, rectangle or quad sides); pages without them are skipped.
+        """
+        horizontal = vertical = 0
+        for path in page.get_cdrawings():
+            for item in path["items"]:
+                kind = item[0]
+                if kind == "l":
+                    segments = (item[1:3],)
+                elif kind == "re":
+                    x0, y0, x1, y1 = item[1]
+                    segments = (((x0, y0), (x1, y0)), ((x0, y1), (x1, y1)), ((x0, y0), (x0, y1)), ((x1, y0), (x1, y1)))
+                elif kind == "qu":
+                    upper_left, upper_right, lower_left, lower_right = item[1]
+                    segments = ((upper_left, upper_right), (lower_left, lower_right), (upper_left, lower_left), (upper_right, lower_right))
+                else:
+                    continue
+                for (x0, y0), (x1, y1) in segments:
+                    dx, dy = abs(x1 - x0), abs(y1 - y0)
+                    if dy <= _RULING_TOLERANCE and dx >= _RULING_TOLERANCE:
+                        horizontal += 1
+                    elif dx <= _RULING_TOLERANCE and dy >= _RULING_TOLERANCE:
+                        vertical += 1
+                if horizontal >= 2 and vertical >= 2:
+                    return True
+        return False
+
+    @staticmethod
+    def detect_form_structure(blocks: List[Block]) -> Optional[Dict]:
         numbered_blocks = []
         for block in blocks:
-            if block["type"] != 0:
+            if not block.is_text:
                 continue
-            text = PDFTextUtils.extract_block_text(block).strip()
-            if (re.match(r'^\d+\.\s*(.{0,50})?$', text.strip()) and not TableDetectionUtils.is_table_or_form_content(text)):
+            if (_NUMBERED_FIELD_PATTERN.match(block.text) and not TableDetectionUtils.is_table_or_form_content(block.text)):
                 numbered_blocks.append(block)
         if len(numbered_blocks) >= 8:
-            min_x = min(block['bbox'][0] for block in numbered_blocks)
-            min_y = min(block['bbox'][1] for block in numbered_blocks)
-            max_x = max(block['bbox'][2] for block in numbered_blocks)
-            max_y = max(block['bbox'][3] for block in numbered_blocks)
+            min_x = min(block.bbox[0] for block in numbered_blocks)
+            min_y = min(block.bbox[1] for block in numbered_blocks)
+            max_x = max(block.bbox[2] for block in numbered_blocks)
+            max_y = max(block.bbox[3] for block in numbered_blocks)
             return {'bbox': [min_x, min_y, max_x, max_y], 'type': 'form_structure', 'confidence': 0.7}
         return None
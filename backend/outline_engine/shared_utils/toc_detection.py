@@ -1,40 +1,47 @@
 # toc_detection.py (copied)
 import re
 from typing import List, Dict
-from .pdf_text import PDFTextUtils
+from .blocks import Block
+
+# Entries ending in a page number: numbered/chapter entries, or any text (longer than 10 chars)
+_TOC_LINE_PATTERN = re.compile(
+    r'(?P<numbered>(?:\d+\.|\d+\.\d+\.?|Chapter\s+\d+:?)\s+.+\s+\d+\s*$)'
+    r'|(?P<trailing_page>.+\s+\d{1,3}\s*$)'
+)
+# Section number, title, page, next section number (entries run together in one block)
+_TOC_RUN_PATTERN = re.compile(r'\d+\.\d+\s+[^0-9]+\s+\d+\s+\d+\.\d+')
+_TOC_HEADING_PATTERN = re.compile(r'^(Table of Contents|Contents|TOC)$', re.IGNORECASE)
 
 class TOCDetectionUtils:
     @staticmethod
-    def is_table_of_contents_page(page, blocks: List[Dict]) -> bool:
-        page_text = page.get_text().upper()
-        if "TABLE OF CONTENTS" in page_text:
+    def is_table_of_contents_page(blocks: List[Block]) -> bool:
+        # plain_text matches page.get_text(), so no second extraction of the page
+        if any("TABLE OF CONTENTS" in block.plain_text.upper() for block in blocks if block.is_text):
             return True
         toc_indicators = 0
         for block in blocks:
-            if block["type"] != 0:
+            if not block.is_text:
                 continue
-            text = PDFTextUtils.extract_block_text(block).strip()
-            if TOCDetectionUtils.is_toc_entry(text):
+            if TOCDetectionUtils.is_toc_entry(block.text):
                 toc_indicators += 1
         return toc_indicators >= 3
 
     @staticmethod
     def is_toc_entry(text: str) -> bool:
-        if re.search(r'^(\d+\.|\d+\.\d+\.?|Chapter\s+\d+:?)\s+.+\s+\d+\s*$', text.strip()):
-            return True
-        if re.search(r'\d+\.\d+\s+[^0-9]+\s+\d+\s+\d+\.\d+', text):
-            return True
-        if re.search(r'^.+\s+\d{1,3}\s*$', text.strip()) and len(text.strip()) > 10:
-            return True
-        return False
+        stripped = text.strip()
+        # Both line patterns need a trailing page number; most blocks end in a letter or period
+        if stripped[-1:].isdigit():
+            match = _TOC_LINE_PATTERN.match(stripped)
+            if match and (match.lastgroup == 'numbered' or len(stripped) > 10):
+                return True
+        return '.' in text and _TOC_RUN_PATTERN.search(text) is not None
 
     @staticmethod
-    def extract_toc_heading_only(blocks: List[Dict], page_num: int) -> List[Dict]:
+    def extract_toc_heading_only(blocks: List[Block], page_num: int) -> List[Dict]:
         headings = []
         for block in blocks:
-            if block["type"] != 0:
+            if not block.is_text:
                 continue
-            text = PDFTextUtils.extract_block_text(block).strip()
-            if re.match(r'^(Table of Contents|Contents|TOC)$', text, re.IGNORECASE):
-                headings.append({'level': 'H1', 'text': text, 'page': page_num - 1})
+            if _TOC_HEADING_PATTERN.match(block.text):
+                headings.append({'level': 'H1', 'text': block.text, 'page': page_num - 1})
         return headings
@@ -3,11 +3,13 @@ from .connection_service import connection_service
 from .insights_service import insights_service
 from .podcast_service import podcast_service
 from .search_service import search_service
+from .storage_janitor import storage_janitor
 
 __all__ = [
     "document_service",
     "connection_service",
     "insights_service",
     "podcast_service",
-    "search_service"
+    "search_service",
+    "storage_janitor"
 ]
\ No newline at end of file
@@ -8,11 +8,17 @@ from .llm_parser import LLMParser
 from .connection_analyzer import ConnectionAnalyzer
 from .fallback_generator import FallbackGenerator
 from .utils import ConnectionUtils
+from .retrieval import SectionRetriever
+from .token_index import HeadingTokenIndex
+from .result_cache import ConnectionResultCache
 
 __all__ = [
     'ContextBuilder',
     'LLMParser', 
     'ConnectionAnalyzer',
     'FallbackGenerator',
-    'ConnectionUtils'
+    'ConnectionUtils',
+    'SectionRetriever',
+    'HeadingTokenIndex',
+    'ConnectionResultCache'
 ]
@@ -4,7 +4,10 @@ Connection analyzer module for analyzing document connections and generating tem
 
 import re
 from typing import List, Dict, Any
+import numpy as np
 from services.document_service import document_service
+from .retrieval import section_retriever
+from .token_index import HeadingTokenIndex
 
 
 class ConnectionAnalyzer:
@@ -20,34 +23,54 @@ class ConnectionAnalyzer:
         # Extract key concepts from selected text
         text_words = self._extract_key_concepts(selected_text)
         
-        # Analyze each document's outline for relevant connections
-        for doc in all_documents:
-            outline = document_service.get_document_outline(doc.id)
-            if not outline or not outline.get('outline'):
-                continue
+        # Score every heading in the library at once (concept matches, word overlap, vector similarity)
+        sections, scores = section_retriever.score_library(selected_text, text_words)
+        
+        if sections:
+            relevance = scores['relevance']
+            candidates = np.flatnonzero(relevance > 0)
+            use_similarity = len(candidates) == 0
+            if use_similarity:
+                # No concept matches anywhere: fall back to the closest section vectors
+                candidates = np.flatnonzero(scores['similarity'] > 0)
+            
+            # Top 3 per document by matched concepts, then similarity (outline order breaks ties)
+            order = candidates[np.lexsort((
+                candidates, -scores['similarity'][candidates], -scores['matched'][candidates]
+            ))]
+            per_document: Dict[str, int] = {}
+            selected = []
+            for index in order:
+                doc_id = sections[index]['document_id']
+                if per_document.get(doc_id, 0) < 3:
+                    per_document[doc_id] = per_document.get(doc_id, 0) + 1
+                    selected.append(index)
             
-            # Find matching sections in this document's outline
-            relevant_sections = self.find_relevant_outline_sections(
-                text_words, outline['outline'], doc.filename
-            )
+            # Sort by relevance and limit to top connections
+            selected = np.asarray(selected, dtype=np.int64)
+            if len(selected):
+                selected = selected[np.lexsort((
+                    selected, -scores['similarity'][selected], -scores['title_overlap'][selected]
+                ))]
             
-            # Convert relevant sections to connection templates
-            for section in relevant_sections:
+            for index in selected[:5]:
+                section = sections[index]
                 connection_type = self.determine_connection_type(section['heading'], selected_text)
                 snippet = self.generate_smart_snippet(section['heading'], selected_text)
+                if use_similarity:
+                    strength = self.similarity_to_strength(float(scores['similarity'][index]))
+                else:
+                    strength = self.score_to_strength(float(relevance[index]))
                 
                 templates.append({
                     'title': section['heading'],
                     'type': connection_type,
-                    'document': doc.filename,
+                    'document': section['pdf_name'],
                     'pages': [section.get('page', 1)],
                     'snippet': snippet,
-                    'strength': section.get('relevance_score', 'medium')
+                    'strength': strength
                 })
         
-        # Sort by relevance and limit to top connections
-        templates.sort(key=lambda x: self.calculate_relevance_score(x['title'], selected_text), reverse=True)
-        
         # If no outline-based connections found, create minimal fallbacks
         if not templates:
             templates = self.create_minimal_fallback_templates(all_documents)
@@ -56,45 +79,34 @@ class ConnectionAnalyzer:
     
     def find_relevant_outline_sections(self, key_concepts: List[str], outline: List[Dict], doc_filename: str) -> List[Dict]:
         """Find outline sections that match the key concepts"""
+        headings = [section.get('text', section.get('heading', '')) for section in outline]
+        if not headings:
+            return []
+        
+        # Calculate relevance scores for all headings in one sparse pass
+        matched, relevance = HeadingTokenIndex(headings).concept_scores(key_concepts)
+        candidates = np.flatnonzero(relevance > 0)
+        
+        # Sort by relevance (number of matched concepts; outline order breaks ties)
+        top = candidates[np.argsort(-matched[candidates], kind='stable')][:3]  # Top 3 per document
+        
         relevant_sections = []
+        for index in top:
+            section = outline[index]
+            heading = headings[index].lower()
+            relevant_sections.append({
+                'heading': section.get('text', section.get('heading', 'Section')),
+                'page': section.get('page', 1),
+                'level': section.get('level', 'H1'),
+                'relevance_score': self.score_to_strength(float(relevance[index])),
+                'matched_concepts': [
+                    concept for concept in key_concepts
+                    if concept in heading or any(word in heading for word in concept.split())
+                ],
+                'document': doc_filename
+            })
         
-        for section in outline:
-            heading = section.get('text', section.get('heading', '')).lower()
-            
-            # Calculate relevance score based on concept matching
-            relevance_score = 0
-            matched_concepts = []
-            
-            for concept in key_concepts:
-                if concept in heading:
-                    relevance_score += 2  # Exact match
-                    matched_concepts.append(concept)
-                elif any(word in heading for word in concept.split()):
-                    relevance_score += 1  # Partial match
-                    matched_concepts.append(concept)
-            
-            # Also check for semantic similarity (basic word overlap)
-            heading_words = set(heading.split())
-            concept_words = set(' '.join(key_concepts).split())
-            overlap = len(heading_words.intersection(concept_words))
-            relevance_score += overlap * 0.5
-            
-            # If section has some relevance, add it
-            if relevance_score > 0:
-                section_info = {
-                    'heading': section.get('text', section.get('heading', 'Section')),
-                    'page': section.get('page', 1),
-                    'level': section.get('level', 'H1'),
-                    'relevance_score': self.score_to_strength(relevance_score),
-                    'matched_concepts': matched_concepts,
-                    'document': doc_filename
-                }
-                relevant_sections.append(section_info)
-        
-        # Sort by relevance
-        relevant_sections.sort(key=lambda x: len(x['matched_concepts']), reverse=True)
-        
-        return relevant_sections[:3]  # Top 3 per document
+        return relevant_sections
     
     def determine_connection_type(self, heading: str, selected_text: str) -> str:
         """Intelligently determine connection type based on heading and text content"""
@@ -164,6 +176,15 @@ class ConnectionAnalyzer:
         else:
             return 'low'
     
+    def similarity_to_strength(self, similarity: float) -> str:
+        """Convert a cosine similarity to strength category"""
+        if similarity >= 0.4:
+            return 'high'
+        elif similarity >= 0.2:
+            return 'medium'
+        else:
+            return 'low'
+    
     def create_minimal_fallback_templates(self, documents: List) -> List[Dict[str, str]]:
         """Create minimal fallback templates when no outline matches found"""
         templates = []
@@ -5,6 +5,7 @@ Fallback generator module for creating intelligent fallback connections.
 from typing import List, Dict
 from models import DocumentConnection
 from services.document_service import document_service
+from .retrieval import section_retriever
 import logging
 
 logger = logging.getLogger(__name__)
@@ -13,6 +14,17 @@ logger = logging.getLogger(__name__)
 class FallbackGenerator:
     """Handles generation of fallback connections when primary methods fail."""
     
+    def __init__(self):
+        self._analyzer = None
+    
+    @property
+    def analyzer(self):
+        """Shared analyzer (created lazily; kept across requests)"""
+        if self._analyzer is None:
+            from .connection_analyzer import ConnectionAnalyzer
+            self._analyzer = ConnectionAnalyzer()
+        return self._analyzer
+    
     def create_dynamic_fallback_connections(self, selected_text: str, source_pdf_name: str) -> List[DocumentConnection]:
         """Create dynamic fallback connections based on intelligent outline analysis"""
         connections = []
@@ -24,9 +36,7 @@ class FallbackGenerator:
             return connections
         
         # Use the intelligent template generation
-        from .connection_analyzer import ConnectionAnalyzer
-        analyzer = ConnectionAnalyzer()
-        connection_templates = analyzer.generate_connection_templates(selected_text)
+        connection_templates = self.analyzer.generate_connection_templates(selected_text)
         
         # Filter templates to exclude source document
         valid_templates = [
@@ -54,7 +64,8 @@ class FallbackGenerator:
         logger.info(f"FallbackGenerator: Created {len(connections)} dynamic fallback connections")
         return connections
     
-    def create_intelligent_fallbacks(self, selected_text: str, source_pdf_name: str, existing_count: int) -> List[DocumentConnection]:
+    def create_intelligent_fallbacks(self, selected_text: str, source_pdf_name: str, existing_count: int,
+                                     existing: List[DocumentConnection] = None) -> List[DocumentConnection]:
         """Create intelligent fallback connections when needed"""
         connections = []
         needed = max(0, 4 - existing_count)  # Ensure at least 4 total connections
@@ -65,33 +76,65 @@ class FallbackGenerator:
         all_documents = document_service.get_all_documents()
         other_docs = [doc for doc in all_documents if doc.filename != source_pdf_name]
         
+        # Best matching section of every document from the cached section vectors
+        best_sections = section_retriever.best_sections_per_document(selected_text, per_doc=1)
+        # Prefer documents not already covered, then the best matching ones
+        covered = {(conn.document, conn.title) for conn in (existing or [])}
+        covered_docs = {document for document, _ in covered}
+        other_docs.sort(key=lambda doc: (
+            doc.filename in covered_docs,
+            -best_sections.get(doc.filename, [{'score': 0.0}])[0]['score']
+        ))
+        
         # Create external fallback connections first
         external_needed = min(needed, 3, len(other_docs))
         for i in range(external_needed):
             doc = other_docs[i] if i < len(other_docs) else other_docs[0]
+            section = best_sections.get(doc.filename, [None])[0]
             
-            connection = DocumentConnection(
-                title="Related Content",
-                type="reference",
-                document=doc.filename,
-                pages=[1],
-                snippet="Related document content available for cross-reference.",
-                strength="low"
-            )
+            if section and (doc.filename, section['heading']) not in covered:
+                connection = self._connection_from_section(section, selected_text, doc.filename)
+            else:
+                connection = DocumentConnection(
+                    title="Related Content",
+                    type="reference",
+                    document=doc.filename,
+                    pages=[1],
+                    snippet="Related document content available for cross-reference.",
+                    strength="low"
+                )
             connections.append(connection)
         
         # Create internal connection if needed and we have remaining slots
         if len(connections) < needed:
-            internal_connection = DocumentConnection(
-                title="Related Section",
-                type="internal", 
-                document=source_pdf_name,
-                pages=[1],
-                snippet="Additional context within the same document.",
-                strength="low"
-            )
+            section = best_sections.get(source_pdf_name, [None])[0]
+            if section and (source_pdf_name, section['heading']) not in covered:
+                internal_connection = self._connection_from_section(
+                    section, selected_text, source_pdf_name, connection_type="internal"
+                )
+            else:
+                internal_connection = DocumentConnection(
+                    title="Related Section",
+                    type="internal", 
+                    document=source_pdf_name,
+                    pages=[1],
+                    snippet="Additional context within the same document.",
+                    strength="low"
+                )
             connections.append(internal_connection)
         
         if connections:
             logger.info(f"FallbackGenerator: Added {len(connections)} intelligent fallback connections (needed={needed})")
         return connections
+    
+    def _connection_from_section(self, section: Dict, selected_text: str, document: str,
+                                 connection_type: str = None) -> DocumentConnection:
+        """Build a connection from a retrieved outline section"""
+        return DocumentConnection(
+            title=section['heading'],
+            type=connection_type or self.analyzer.determine_connection_type(section['heading'], selected_text),
+            document=document,
+            pages=[section.get('page', 1)],
+            snippet=self.analyzer.generate_smart_snippet(section['heading'], selected_text),
+            strength=self.analyzer.similarity_to_strength(section['score'])
+        )
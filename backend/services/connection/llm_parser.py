@@ -2,17 +2,10 @@
 LLM response parser module for handling and validating LLM responses.
 """
 
-import json
-import re
 import logging
 from typing import List, Optional, Any
-from models import DocumentConnection
-
-# Optional tolerant JSON parser
-try:
-    import demjson3 as demjson
-except Exception:  # pragma: no cover
-    demjson = None
+from models import DocumentConnection, ConnectionsOutput
+from utils.json_scanner import extract_json_values, loads_tolerant
 
 logger = logging.getLogger(__name__)
 
@@ -29,46 +22,31 @@ class LLMParser:
             logger.warning("LLMParser: Empty response received; returning 0 connections")
             return connections
 
-        # Strategy 1: Try to find JSON using patterns, decode with stdlib first then demjson3 as tolerant fallback
-        json_patterns = [
-            (r"```json\s*(\[.*?\])\s*```", "code_block_array"),
-            (r"```\s*(\[.*?\])\s*```", "code_block_array_nolang"),
-            (r"```json\s*(\{.*?\})\s*```", "code_block_object"),
-            (r"```\s*(\{.*?\})\s*```", "code_block_object_nolang"),
-            (r"\[.*?\]", "array"),
-            (r"\{.*?\}", "object"),
-        ]
-
-        for pattern, pattern_type in json_patterns:
-            matches = re.findall(pattern, response, re.DOTALL)
-            if not matches:
-                continue
-            for match in matches:
-                data = self._attempt_json_load(match, pattern_type)
-                if data is None:
-                    continue
-
-                # Normalize to list of dicts
-                if isinstance(data, list):
-                    candidates = [x for x in data if isinstance(x, dict)]
-                elif isinstance(data, dict):
-                    candidates = [data]
-                else:
-                    candidates = []
-
-                for item in candidates:
-                    if self.is_valid_connection_dict(item):
-                        conn = self.dict_to_connection(item, source_pdf_name)
-                        if conn:
-                            connections.append(conn)
-
-                if connections:
-                    logger.info(
-                        f"LLMParser: Parsed {len(connections)} connections using pattern '{pattern_type}'"
-                    )
-                    return connections
+        # Strategy 1: Single-pass scan for JSON spans; strict json first, bounded repair as a last resort
+        for data in extract_json_values(response):
+            # Normalize to list of dicts
+            if isinstance(data, dict) and isinstance(data.get("connections"), list):
+                data = data["connections"]
+            if isinstance(data, list):
+                candidates = [x for x in data if isinstance(x, dict)]
+            elif isinstance(data, dict):
+                candidates = [data]
+            else:
+                candidates = []
+
+            for item in candidates:
+                if self.is_valid_connection_dict(item):
+                    conn = self.dict_to_connection(item, source_pdf_name)
+                    if conn:
+                        connections.append(conn)
+
+            if connections:
+                logger.info(
+                    f"LLMParser: Parsed {len(connections)} connections from scanned JSON"
+                )
+                return connections
 
-        logger.debug("LLMParser: JSON patterns failed; attempting line-by-line heuristic parse")
+        logger.debug("LLMParser: JSON scan failed; attempting line-by-line heuristic parse")
 
         # Strategy 2: Try to parse line-by-line structured text
         lines = response.split("\n")
@@ -131,34 +109,22 @@ class LLMParser:
 
         return connections
 
+    def from_structured_output(self, output: ConnectionsOutput, source_pdf_name: str) -> List[DocumentConnection]:
+        """Apply the connection rules (source document handling, snippet length) to validated structured output"""
+        connections: List[DocumentConnection] = []
+        for item in output.connections:
+            conn = self.dict_to_connection(item.model_dump(), source_pdf_name)
+            if conn:
+                connections.append(conn)
+        logger.info(f"LLMParser: Accepted {len(connections)} of {len(output.connections)} structured connections")
+        return connections
+
     def _attempt_json_load(self, text: str, pattern_type: str) -> Optional[Any]:
-        """Try parsing JSON using stdlib first, then demjson3 (tolerant)."""
-        # First try strict json
-        try:
-            data = json.loads(text)
-            logger.debug(
-                f"LLMParser: json.loads succeeded for pattern '{pattern_type}'"
-            )
-            return data
-        except Exception:
-            pass
-
-        # Try demjson3 as tolerant parser
-        if demjson is not None:
-            try:
-                data = demjson.decode(text, strict=False)  # tolerant
-                logger.debug(
-                    f"LLMParser: demjson3.decode succeeded for pattern '{pattern_type}'"
-                )
-                return data
-            except Exception:
-                logger.debug(
-                    f"LLMParser: demjson3.decode failed for pattern '{pattern_type}'"
-                )
-                return None
-        else:
-            logger.debug("LLMParser: demjson3 not installed; skipping tolerant decode")
-            return None
+        """Try parsing JSON strictly first, then with a bounded repair / size-capped demjson3."""
+        data = loads_tolerant(text)
+        if data is None:
+            logger.debug(f"LLMParser: Could not decode JSON for '{pattern_type}'")
+        return data
 
     def is_valid_connection_dict(self, data: dict) -> bool:
         """Check if dictionary contains valid connection fields"""
@@ -0,0 +1,90 @@
+"""
+Result cache module for reusing connection results for repeated selections.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Set
+from models import ConnectionResponse
+
+
+class ConnectionResultCache:
+    """Bounded LRU of connection results keyed by normalized selection, source document and library version."""
+    
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max(1, max_entries)
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped when a document is added: any selection may now have new connections
+        self.library_version = 0
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def normalize(selected_text: str) -> str:
+        """Case- and whitespace-insensitive form of the selection"""
+        return " ".join((selected_text or "").lower().split())
+    
+    def make_key(self, selected_text: str, source_doc_id: str) -> str:
+        raw = f"{self.library_version}\x00{source_doc_id}\x00{self.normalize(selected_text)}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+    
+    def get(self, key: str, include_summary: bool = True) -> Optional[ConnectionResponse]:
+        """Cached response (a copy), or None; entries stored without a summary only serve summary-less requests"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or (include_summary and not entry['has_summary']):
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            response = entry['response']
+        
+        update = {} if include_summary else {'summary': ""}
+        return response.model_copy(update=update, deep=True)
+    
+    def put(self, key: str, source_doc_id: str, response: ConnectionResponse, include_summary: bool = True) -> None:
+        cited: Set[str] = {conn.document for conn in response.connections}
+        with self._lock:
+            existing = self._entries.get(key)
+            if existing is not None and existing['has_summary'] and not include_summary:
+                # Keep the richer entry
+                self._entries.move_to_end(key)
+                return
+            self._entries[key] = {
+                'response': response.model_copy(deep=True),
+                'has_summary': include_summary,
+                'source_doc_id': source_doc_id,
+                'documents': cited
+            }
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def on_document_added(self) -> None:
+        """New document: every cached result may be missing connections to it"""
+        with self._lock:
+            self.library_version += 1
+            self._entries.clear()
+    
+    def invalidate_document(self, doc_id: str, filename: Optional[str] = None) -> int:
+        """Drop results selected in, or citing, a removed document; returns the number dropped"""
+        with self._lock:
+            stale = [
+                key for key, entry in self._entries.items()
+                if entry['source_doc_id'] == doc_id or (filename and filename in entry['documents'])
+            ]
+            for key in stale:
+                del self._entries[key]
+            return len(stale)
+    
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'library_version': self.library_version,
+                'hits': self.hits,
+                'misses': self.misses
+            }
@@ -0,0 +1,276 @@
+"""
+Retrieval module for ranking outline sections by similarity to the selected text.
+"""
+
+import threading
+import logging
+from typing import List, Dict, Optional, Tuple
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import HashingVectorizer
+from config import settings
+from services.document_service import document_service
+from .token_index import HeadingTokenIndex
+
+logger = logging.getLogger(__name__)
+
+
+class HashedTfidfEncoder:
+    """Stateless hashed term encoder; IDF weights are derived from the indexed sections at query time."""
+    
+    kind = "tfidf"
+    
+    def __init__(self, n_features: int = 2 ** 18):
+        # Hashing keeps per-document vectors comparable without a shared fitted vocabulary
+        self.vectorizer = HashingVectorizer(
+            n_features=n_features,
+            stop_words='english',
+            ngram_range=(1, 2),
+            lowercase=True,
+            token_pattern=r'\b[a-zA-Z][a-zA-Z0-9]*\b',
+            alternate_sign=False,
+            norm=None
+        )
+    
+    def encode(self, texts: List[str]) -> sparse.csr_matrix:
+        """Sublinear term-frequency vectors, one row per text"""
+        matrix = self.vectorizer.transform(texts).tocsr()
+        matrix.data = np.log1p(matrix.data)
+        return matrix
+    
+    def stack(self, matrices: List[sparse.csr_matrix]) -> sparse.csr_matrix:
+        return sparse.vstack(matrices, format='csr')
+    
+    def prepare(self, matrix: sparse.csr_matrix) -> Tuple[sparse.csr_matrix, sparse.dia_matrix, np.ndarray]:
+        """IDF-weighted rows and their norms; computed once per library version"""
+        n_rows = matrix.shape[0]
+        document_frequency = np.bincount(matrix.indices, minlength=matrix.shape[1])
+        idf = sparse.diags(np.log((1.0 + n_rows) / (1.0 + document_frequency)) + 1.0)
+        weighted = (matrix @ idf).tocsr()
+        row_norms = np.sqrt(np.asarray(weighted.multiply(weighted).sum(axis=1)).ravel())
+        return weighted, idf, row_norms
+    
+    def score(self, query_vector: sparse.csr_matrix, prepared) -> np.ndarray:
+        """Cosine similarity of the query against every prepared row"""
+        weighted, idf, row_norms = prepared
+        weighted_query = query_vector @ idf
+        query_norm = np.sqrt(weighted_query.multiply(weighted_query).sum())
+        if query_norm == 0:
+            return np.zeros(weighted.shape[0])
+        
+        dots = np.asarray((weighted @ weighted_query.T).todense()).ravel()
+        return dots / np.maximum(row_norms * query_norm, 1e-12)
+
+
+class EmbeddingEncoder:
+    """Dense sentence embeddings from a local CPU model (normalized, so dot product is cosine)."""
+    
+    kind = "embedding"
+    
+    def __init__(self, model):
+        self.model = model
+    
+    def encode(self, texts: List[str]) -> np.ndarray:
+        vectors = self.model.encode(texts, normalize_embeddings=True, convert_to_numpy=True,
+                                    show_progress_bar=False)
+        return np.asarray(vectors, dtype=np.float32)
+    
+    def stack(self, matrices: List[np.ndarray]) -> np.ndarray:
+        return np.vstack(matrices)
+    
+    def prepare(self, matrix: np.ndarray) -> np.ndarray:
+        return matrix
+    
+    def score(self, query_vector: np.ndarray, prepared: np.ndarray) -> np.ndarray:
+        return prepared @ query_vector.ravel()
+
+
+class SectionRetriever:
+    """Per-document section vectors computed once at ingest and ranked across the library per query."""
+    
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._encoder = None
+        # Per-document caches: filled at ingest (or lazily for documents loaded at startup)
+        # and invalidated per document on upload/delete
+        self.document_vectors: Dict[str, object] = {}
+        self.heading_metadata: Dict[str, List[Dict]] = {}
+        self.heading_tokens: Dict[str, List[Tuple[str, ...]]] = {}
+        # (library version, sections, prepared matrix, token index); rebuilt only when the document set changes
+        self._library: Optional[Tuple[tuple, List[Dict], object, HeadingTokenIndex]] = None
+    
+    @property
+    def encoder(self):
+        """Embedding model when configured and installed, hashed TF-IDF otherwise (loaded lazily)"""
+        if self._encoder is None:
+            with self._lock:
+                if self._encoder is None:
+                    self._encoder = self._load_encoder()
+        return self._encoder
+    
+    def _load_encoder(self):
+        model_name = settings.connection_embedding_model.strip()
+        if model_name:
+            try:
+                from sentence_transformers import SentenceTransformer  # optional dependency
+                model = SentenceTransformer(model_name, device="cpu")
+                logger.info(f"SectionRetriever: Using embedding model '{model_name}'")
+                return EmbeddingEncoder(model)
+            except Exception as e:
+                logger.warning(
+                    f"SectionRetriever: Embedding model '{model_name}' unavailable ({e}); using hashed TF-IDF"
+                )
+        return HashedTfidfEncoder()
+    
+    def _document_sections(self, doc) -> List[Dict]:
+        """Outline sections of one document"""
+        outline = document_service.get_document_outline(doc.id) or {}
+        sections = []
+        for position, item in enumerate(outline.get('outline', []) or []):
+            heading = str(item.get('text', '')).strip()
+            if not heading:
+                continue
+            sections.append({
+                'document_id': doc.id,
+                'pdf_name': doc.filename,
+                'heading': heading,
+                'level': item.get('level', 'H1'),
+                'page': item.get('page', 1),
+                'position': position
+            })
+        return sections
+    
+    def index_document(self, doc_id: str) -> int:
+        """Compute and cache section vectors for one document; returns the number of sections"""
+        doc = document_service.get_document(doc_id)
+        if not doc:
+            self.invalidate_document(doc_id)
+            return 0
+        return self._index(doc)
+    
+    def _index(self, doc) -> int:
+        sections = self._document_sections(doc)
+        matrix = self.encoder.encode([s['heading'] for s in sections]) if sections else None
+        tokens = [tuple(s['heading'].lower().split()) for s in sections]
+        with self._lock:
+            self.heading_metadata[doc.id] = sections
+            self.document_vectors[doc.id] = matrix
+            self.heading_tokens[doc.id] = tokens
+            self._library = None
+        return len(sections)
+    
+    def invalidate_document(self, doc_id: str) -> None:
+        """Drop cached vectors for one document (deleted or replaced)"""
+        with self._lock:
+            self.heading_metadata.pop(doc_id, None)
+            self.document_vectors.pop(doc_id, None)
+            self.heading_tokens.pop(doc_id, None)
+            self._library = None
+    
+    def _library_index(self) -> Tuple[List[Dict], Optional[object], Optional[HeadingTokenIndex]]:
+        """Sections, prepared vectors and token index for the whole library"""
+        documents = document_service.get_all_documents()
+        for doc in documents:
+            if doc.id not in self.heading_metadata:
+                self._index(doc)
+        doc_ids = [doc.id for doc in documents]
+        
+        with self._lock:
+            live_ids = set(doc_ids)
+            for doc_id in [d for d in self.heading_metadata if d not in live_ids]:
+                self.invalidate_document(doc_id)
+            
+            version = tuple(doc_ids)
+            if self._library is None or self._library[0] != version:
+                sections: List[Dict] = []
+                tokens: List[Tuple[str, ...]] = []
+                matrices = []
+                for doc_id in doc_ids:
+                    matrix = self.document_vectors.get(doc_id)
+                    if matrix is not None:
+                        sections.extend(self.heading_metadata[doc_id])
+                        tokens.extend(self.heading_tokens[doc_id])
+                        matrices.append(matrix)
+                prepared = self.encoder.prepare(self.encoder.stack(matrices)) if matrices else None
+                token_index = HeadingTokenIndex([s['heading'] for s in sections], tokens) if sections else None
+                self._library = (version, sections, prepared, token_index)
+            
+            return self._library[1], self._library[2], self._library[3]
+    
+    def score_sections(self, query: str) -> Tuple[List[Dict], np.ndarray]:
+        """Every library section with its similarity to the query (one matrix product)"""
+        sections, prepared, _ = self._library_index()
+        if not sections:
+            return [], np.zeros(0)
+        encoder = self.encoder
+        return sections, encoder.score(encoder.encode([query or ""]), prepared)
+    
+    def score_library(self, query: str, key_concepts: List[str]) -> Tuple[List[Dict], Dict[str, np.ndarray]]:
+        """Vector similarity plus concept/overlap scores for every library section, aligned by row"""
+        sections, prepared, token_index = self._library_index()
+        if not sections:
+            return [], {}
+        encoder = self.encoder
+        matched, relevance = token_index.concept_scores(key_concepts)
+        return sections, {
+            'similarity': encoder.score(encoder.encode([query or ""]), prepared),
+            'matched': matched,
+            'relevance': relevance,
+            'title_overlap': token_index.overlap_scores(query or "")
+        }
+    
+    def retrieve(self, query: str, source_pdf_name: str = "", top_k: Optional[int] = None,
+                 per_doc: Optional[int] = None, internal_k: int = 2) -> List[Dict]:
+        """Top-k sections most similar to the query.
+        
+        At most ``per_doc`` sections come from any other document and up to ``internal_k``
+        from the source document, so the LLM always sees a diverse candidate set.
+        """
+        top_k = top_k or settings.connection_retrieval_top_k
+        per_doc = per_doc or settings.connection_retrieval_per_doc
+        
+        sections, scores = self.score_sections(query)
+        if not sections:
+            return []
+        
+        # Stable sort keeps outline order among equally scored sections
+        order = np.argsort(-scores, kind='stable')
+        
+        external_k = max(1, top_k - internal_k)
+        external, internal = [], []
+        per_doc_counts: Dict[str, int] = {}
+        for index in order:
+            section = sections[index]
+            if section['pdf_name'] == source_pdf_name:
+                if len(internal) < internal_k:
+                    internal.append(index)
+            elif len(external) < external_k:
+                count = per_doc_counts.get(section['document_id'], 0)
+                if count < per_doc:
+                    per_doc_counts[section['document_id']] = count + 1
+                    external.append(index)
+            if len(external) >= external_k and len(internal) >= internal_k:
+                break
+        
+        return [
+            dict(sections[index], score=round(float(scores[index]), 4))
+            for index in external + internal
+        ]
+    
+    def best_sections_per_document(self, query: str, per_doc: int = 3,
+                                   min_score: float = 0.0) -> Dict[str, List[Dict]]:
+        """Highest scoring sections of every document (score above ``min_score``), keyed by pdf name"""
+        sections, scores = self.score_sections(query)
+        results: Dict[str, List[Dict]] = {}
+        for index in np.argsort(-scores, kind='stable'):
+            if scores[index] <= min_score:
+                break
+            section = sections[index]
+            bucket = results.setdefault(section['pdf_name'], [])
+            if len(bucket) < per_doc:
+                bucket.append(dict(section, score=round(float(scores[index]), 4)))
+        return results
+
+
+# Create singleton instance
+section_retriever = SectionRetriever()
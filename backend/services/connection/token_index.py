@@ -0,0 +1,106 @@
+"""
+Token index module for scoring outline headings against key concepts with sparse matrix operations.
+"""
+
+from typing import List, Sequence, Tuple
+import numpy as np
+from scipy import sparse
+
+
+class HeadingTokenIndex:
+    """Heading x token incidence matrix; headings are tokenized once and scored in bulk."""
+    
+    def __init__(self, headings: Sequence[str], token_lists: Sequence[Sequence[str]] = None):
+        # Same tokenization as the analyzer's per-heading loops: lowercase, whitespace split
+        self.headings = [heading.lower() for heading in headings]
+        if token_lists is None:
+            token_lists = [heading.split() for heading in self.headings]
+        
+        vocabulary = {}
+        indptr = [0]
+        indices: List[int] = []
+        for tokens in token_lists:
+            token_ids = {vocabulary.setdefault(token, len(vocabulary)) for token in tokens}
+            indices.extend(sorted(token_ids))
+            indptr.append(len(indices))
+        
+        self.vocabulary = vocabulary
+        self.incidence = sparse.csr_matrix(
+            (np.ones(len(indices), dtype=np.float32), indices, indptr),
+            shape=(len(token_lists), len(vocabulary))
+        )
+        # Distinct tokens per heading (len(set(heading.split())))
+        self.unique_counts = np.diff(np.asarray(indptr))
+        
+        # Newline-joined vocabulary for substring lookups; offsets map match positions to token ids
+        tokens = list(vocabulary)
+        self._joined = "\n".join(tokens)
+        lengths = np.fromiter((len(token) + 1 for token in tokens), dtype=np.int64, count=len(tokens))
+        self._offsets = np.concatenate(([0], np.cumsum(lengths)[:-1])) if tokens else np.zeros(0, dtype=np.int64)
+    
+    def __len__(self) -> int:
+        return self.incidence.shape[0]
+    
+    def _indicator(self, token_ids) -> np.ndarray:
+        vector = np.zeros(len(self.vocabulary), dtype=np.float32)
+        vector[list(token_ids)] = 1.0
+        return vector
+    
+    def tokens_containing(self, fragment: str) -> np.ndarray:
+        """Ids of vocabulary tokens that contain ``fragment`` as a substring"""
+        if not fragment or "\n" in fragment or not self.vocabulary:
+            return np.zeros(0, dtype=np.int64)
+        positions = []
+        start = self._joined.find(fragment)
+        while start != -1:
+            positions.append(start)
+            start = self._joined.find(fragment, start + 1)
+        if not positions:
+            return np.zeros(0, dtype=np.int64)
+        return np.unique(np.searchsorted(self._offsets, positions, side='right') - 1)
+    
+    def _contains_any(self, token_ids: np.ndarray) -> np.ndarray:
+        """Boolean per heading: any of the given tokens occurs in it"""
+        if len(token_ids) == 0:
+            return np.zeros(len(self), dtype=bool)
+        return (self.incidence @ self._indicator(token_ids)) > 0
+    
+    def concept_scores(self, key_concepts: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Matched concept counts and relevance scores for every heading.
+
+        Mirrors the analyzer's rules: +2 when the concept occurs in the heading, +1 when only
+        one of its words does, plus 0.5 per heading word shared with the concepts.
+        """
+        matched = np.zeros(len(self), dtype=np.int32)
+        relevance = np.zeros(len(self), dtype=np.float64)
+        
+        for concept in key_concepts:
+            words = concept.split()
+            if len(words) <= 1:
+                # A single token occurs in a heading iff it is a substring of one of its tokens
+                full = self._contains_any(self.tokens_containing(concept))
+                partial = np.zeros(len(self), dtype=bool)
+            else:
+                word_hits = [self._contains_any(self.tokens_containing(word)) for word in words]
+                any_word = np.logical_or.reduce(word_hits)
+                all_words = np.logical_and.reduce(word_hits)
+                # Phrase matches can only be among headings that contain every word
+                full = np.zeros(len(self), dtype=bool)
+                for row in np.flatnonzero(all_words):
+                    full[row] = concept in self.headings[row]
+                partial = any_word & ~full
+            relevance += 2 * full + partial
+            matched += full | partial
+        
+        concept_words = set(' '.join(key_concepts).split())
+        overlap_ids = [self.vocabulary[word] for word in concept_words if word in self.vocabulary]
+        if overlap_ids:
+            relevance += 0.5 * (self.incidence @ self._indicator(overlap_ids))
+        
+        return matched, relevance
+    
+    def overlap_scores(self, text: str) -> np.ndarray:
+        """Word overlap with ``text`` plus a short-title bonus, for every heading at once"""
+        text_ids = [self.vocabulary[word] for word in set(text.lower().split()) if word in self.vocabulary]
+        overlap = self.incidence @ self._indicator(text_ids) if text_ids else np.zeros(len(self))
+        return overlap + 1.0 / np.maximum(1, self.unique_counts - 2)
@@ -50,3 +50,24 @@ class ConnectionUtils:
         doc_names = {doc.filename for doc in all_documents}
         
         return connection.document in doc_names
+    
+    def build_extractive_summary(self, selected_text: str, connections: List[DocumentConnection]) -> str:
+        """Local 2-3 sentence summary assembled from the strongest connections' own text"""
+        if not connections:
+            return "No cross-document connections were found for the selected text."
+        
+        strength_rank = {"high": 0, "medium": 1, "low": 2}
+        ranked = sorted(connections, key=lambda conn: strength_rank.get(conn.strength, 3))
+        documents = list(dict.fromkeys(conn.document for conn in connections))
+        
+        sentences = [
+            f"Found {len(connections)} connections across {len(documents)} "
+            f"document{'s' if len(documents) != 1 else ''}, most strongly '{ranked[0].title}' in {ranked[0].document}."
+        ]
+        # Reuse the snippets of the top connections verbatim (extractive, no LLM call)
+        for conn in ranked[:2]:
+            snippet = conn.snippet.strip()
+            if snippet and snippet not in sentences:
+                sentences.append(snippet if snippet[-1] in ".!?" else snippet + ".")
+        
+        return " ".join(sentences)
@@ -4,8 +4,9 @@ import logging
 from typing import List, Dict, Any, Optional
 from config import settings
 from utils import get_llm_client
+from utils.llm_resilience import LLMError, LLMCircuitOpenError
 from services.document_service import document_service
-from models import DocumentConnection, ConnectionResponse
+from models import DocumentConnection, ConnectionResponse, ConnectionsOutput, ConnectionsWithSummaryOutput
 
 # Import modular components
 from .connection.context_builder import ContextBuilder
@@ -13,6 +14,8 @@ from .connection.llm_parser import LLMParser
 from .connection.connection_analyzer import ConnectionAnalyzer
 from .connection.fallback_generator import FallbackGenerator
 from .connection.utils import ConnectionUtils
+from .connection.retrieval import section_retriever
+from .connection.result_cache import ConnectionResultCache
 
 
 class ConnectionService:
@@ -26,25 +29,74 @@ class ConnectionService:
         self.connection_analyzer = ConnectionAnalyzer()
         self.fallback_generator = FallbackGenerator()
         self.utils = ConnectionUtils()
+        self.retriever = section_retriever  # Shared per-document section vector cache
+        self.result_cache = ConnectionResultCache(settings.connection_cache_max_entries)
 
         # Logger
         self.logger = logging.getLogger(__name__)
         
+    @property
+    def document_vectors(self) -> Dict[str, Any]:
+        """Cached section vectors per document id"""
+        return self.retriever.document_vectors
+    
+    @property
+    def heading_metadata(self) -> Dict[str, List[Dict]]:
+        """Cached outline sections per document id (rows of document_vectors)"""
+        return self.retriever.heading_metadata
+    
+    def index_document(self, doc_id: str) -> int:
+        """Compute section vectors for a newly ingested document"""
+        self.result_cache.on_document_added()
+        return self.retriever.index_document(doc_id)
+    
+    def invalidate_document(self, doc_id: str, filename: Optional[str] = None) -> None:
+        """Drop cached section vectors and connection results for a deleted document"""
+        self.retriever.invalidate_document(doc_id)
+        self.result_cache.invalidate_document(doc_id, filename)
+    
     def _get_all_pdf_outlines_with_context(self, selected_text: str, source_pdf: str) -> str:
         """Get formatted PDF outlines for LLM context"""
         return self.context_builder.get_all_pdf_outlines_with_context(selected_text, source_pdf)
     
+    def _get_candidate_context(self, selected_text: str, source_pdf: str) -> str:
+        """Get retrieved candidate sections for LLM context"""
+        try:
+            candidates = self.retriever.retrieve(selected_text, source_pdf)
+        except Exception as e:
+            self.logger.error(f"Connections: Section retrieval failed: {e}")
+            candidates = []
+        
+        if not candidates:
+            return self._get_all_pdf_outlines_with_context(selected_text, source_pdf)
+        
+        self.logger.info(
+            f"Connections: Retrieved {len(candidates)} candidate sections "
+            f"({self.retriever.encoder.kind}), top score={candidates[0]['score']:.2f}"
+        )
+        return self.context_builder.build_candidate_context(selected_text, source_pdf, candidates)
+    
     def find_connections(self, selected_text: str, current_doc_id: str, 
-                        context_before: str = "", context_after: str = "") -> ConnectionResponse:
-        """Find cross-document connections using LLM analysis of PDF outlines"""
+                        context_before: str = "", context_after: str = "",
+                        include_summary: bool = True) -> ConnectionResponse:
+        """Find cross-document connections (and their summary) with a single LLM call"""
         start_time = time.time()
         
+        # Repeated selections are served from the result cache
+        cache_key = self.result_cache.make_key(selected_text, current_doc_id)
+        cached = self.result_cache.get(cache_key, include_summary)
+        if cached is not None:
+            cached.processing_time = time.time() - start_time
+            self.logger.info(f"Connections: Served from result cache ({len(cached.connections)} connections)")
+            return cached
+        
         # Get source document name
         source_doc = document_service.get_document(current_doc_id)
         source_pdf_name = source_doc.filename if source_doc else "Unknown document"
         
-        # Get formatted PDF outlines
-        pdf_context = self._get_all_pdf_outlines_with_context(selected_text, source_pdf_name)
+        # Rank sections locally and send only the top-k candidates; whole-library outlines
+        # are used only when retrieval finds nothing
+        pdf_context = self._get_candidate_context(selected_text, source_pdf_name)
         
         # Create system prompt for finding connections - now requires 4 connections total
         system_prompt = """You are a multi-document connection expert specializing in cross-PDF analysis. Your task is to find 4 relevant connections: 3 from OTHER documents and 1 from the source document.
@@ -64,13 +116,13 @@ CONNECTION OBJECT FORMAT:
 - snippet: Brief explanation of relevance to selected text (max 25 words)
 - strength: high/medium/low based on content relevance
 
-RESPONSE FORMAT: Valid JSON array with EXACTLY 4 connection objects:
-[
+RESPONSE FORMAT: Valid JSON object whose "connections" array holds EXACTLY 4 connection objects:
+{"connections": [
   {"title":"Heading from Other PDF 1","type":"concept","document":"Other1.pdf","pages":[2],"snippet":"Explains concept mentioned in selected text.","strength":"high"},
   {"title":"Heading from Other PDF 2","type":"comparison","document":"Other2.pdf","pages":[5],"snippet":"Contrasts with approach in selected text.","strength":"medium"},
   {"title":"Heading from Other PDF 3","type":"example","document":"Other3.pdf","pages":[1],"snippet":"Provides example of principle discussed.","strength":"medium"},
   {"title":"Related Section","type":"internal","document":"SOURCE_DOCUMENT","pages":[X],"snippet":"Additional context within same document.","strength":"low"}
-]
+]""" + (""", "summary": "2-3 plain-text sentences on the main themes and relationships across these connections."}""" if include_summary else "}") + """
 
 Analyze the selected text content carefully to ensure diverse, relevant connections."""
 
@@ -91,46 +143,38 @@ TASK: Find EXACTLY 4 connections based on the selected text content:
 1. Find 3 connections from DIFFERENT PDF documents (NOT '{source_pdf_name}')
 2. Find 1 connection from '{source_pdf_name}' itself (different section)
 3. Each connection should relate to specific themes/concepts in the selected text
-4. Use exact headings from the PDF outlines as titles
+4. Use exact headings from the candidate sections as titles
 5. Ensure connections are thematically diverse and specific to this content
 
-Return JSON array with EXACTLY 4 connection objects (3 external + 1 internal):"""
+Return the JSON object with EXACTLY 4 connection objects (3 external + 1 internal){' and the summary' if include_summary else ''}:"""
 
+        llm_summary = ""
+        llm_answered = False  # Only cache results backed by an LLM answer, not degraded fallbacks
         try:
+            if not self.llm_client.is_available():
+                # Fast path: circuit is open, go straight to the local fallback generators
+                raise LLMCircuitOpenError("Connections LLM circuit open", "connections")
+            
             self.logger.info(f"Connections: Sending prompt to LLM (len={len(user_prompt)} chars)")
             # Increase temperature slightly to get more diverse results based on text content
             temperature = 0.5 + (len(selected_text.split()) / 1000.0)  # Slight variation based on text length
             temperature = min(0.8, temperature)  # Cap at 0.8
             
-            response = self.llm_client.generate(
+            # Schema-constrained output: one validated load, no JSON recovery or re-ask
+            output = self.llm_client.generate_structured(
                 prompt=user_prompt,
+                output_model=ConnectionsWithSummaryOutput if include_summary else ConnectionsOutput,
                 max_tokens=4000,  # Significantly increased for complete responses
                 temperature=temperature,  # Dynamic temperature for diversity
                 system_prompt=system_prompt
             )
             
-            self.logger.info(f"Connections: LLM response received (len={len(response)} chars), temp={temperature:.2f}")
+            self.logger.info(f"Connections: LLM response received ({len(output.connections)} connections), temp={temperature:.2f}")
             
-            # Enhanced response parsing with multiple fallback strategies
-            connections = self._parse_llm_response(response, source_pdf_name)
-            
-            if len(connections) < 4:
-                self.logger.warning("Connections: Parsed <4 connections; retrying with simplified prompt")
-                # Retry with simplified prompt
-                simplified_prompt = self._create_simplified_prompt(selected_text, pdf_context, source_pdf_name)
-                retry_response = self.llm_client.generate(
-                    prompt=simplified_prompt,
-                    max_tokens=3000,  # Increased for complete retry responses
-                    temperature=0.3,
-                    system_prompt="You are a document analyst. Find exactly 4 connections: 3 from different documents + 1 from source. Return only valid JSON array."
-                )
-                
-                retry_connections = self._parse_llm_response(retry_response, source_pdf_name)
-                if len(retry_connections) > len(connections):
-                    self.logger.info(
-                        f"Connections: Retry improved results {len(connections)} -> {len(retry_connections)}"
-                    )
-                    connections = retry_connections
+            # Connections and summary come back together; short results are topped up locally below
+            connections = self.llm_parser.from_structured_output(output, source_pdf_name)
+            llm_summary = getattr(output, "summary", "").strip()
+            llm_answered = bool(connections)
             
             self.logger.info(f"Connections: Successfully parsed {len(connections)} connections before validation")
             
@@ -157,6 +201,12 @@ Return JSON array with EXACTLY 4 connection objects (3 external + 1 internal):""
             
             connections = final_connections[:6]  # Max 6 total
             
+        except LLMError as e:
+            self.logger.warning(f"Connections: LLM unavailable ({type(e).__name__}): {e}")
+            connections = self._create_dynamic_fallback_connections(selected_text, source_pdf_name)
+            self.logger.warning(
+                f"Connections: Using dynamic fallback connections (count={len(connections)})"
+            )
         except (json.JSONDecodeError, Exception) as e:
             self.logger.error(f"Connections: Error parsing LLM response: {e}")
             # Use dynamic fallback based on actual document content
@@ -167,23 +217,30 @@ Return JSON array with EXACTLY 4 connection objects (3 external + 1 internal):""
         
         # Ensure minimum connections with intelligent fallback
         if len(connections) < 4:
-            additional_connections = self._create_intelligent_fallbacks(selected_text, source_pdf_name, len(connections))
+            additional_connections = self._create_intelligent_fallbacks(
+                selected_text, source_pdf_name, len(connections), existing=connections
+            )
             connections.extend(additional_connections)
             if additional_connections:
                 self.logger.warning(
                     f"Connections: Added intelligent fallbacks to reach minimum. Added={len(additional_connections)}"
                 )
         
-        # Generate summary
-        summary = self._generate_connection_summary(selected_text, connections)
+        # Summary from the same LLM response, or a local extractive one
+        summary = ""
+        if include_summary:
+            summary = llm_summary or self._generate_connection_summary(selected_text, connections)
         
         processing_time = time.time() - start_time
         
-        return ConnectionResponse(
+        result = ConnectionResponse(
             connections=connections,
             summary=summary,
             processing_time=processing_time
         )
+        if llm_answered:
+            self.result_cache.put(cache_key, current_doc_id, result, include_summary)
+        return result
     
     def _parse_llm_response(self, response: str, source_pdf_name: str) -> List[DocumentConnection]:
         """Enhanced LLM response parsing with multiple fallback strategies"""
@@ -201,10 +258,6 @@ Return JSON array with EXACTLY 4 connection objects (3 external + 1 internal):""
         """Validate if connection is useful and not referencing source document"""
         return self.utils.validate_connection(connection, source_pdf_name)
     
-    def _create_simplified_prompt(self, selected_text: str, pdf_context: str, source_pdf_name: str) -> str:
-        """Create a simplified prompt for retry attempts"""
-        return self.context_builder.create_simplified_prompt(selected_text, pdf_context, source_pdf_name)
-    
     def _create_dynamic_fallback_connections(self, selected_text: str, source_pdf_name: str) -> List[DocumentConnection]:
         """Create dynamic fallback connections based on intelligent outline analysis"""
         return self.fallback_generator.create_dynamic_fallback_connections(selected_text, source_pdf_name)
@@ -241,9 +294,10 @@ Return JSON array with EXACTLY 4 connection objects (3 external + 1 internal):""
         """Create minimal fallback templates when no outline matches found"""
         return self.connection_analyzer.create_minimal_fallback_templates(documents)
     
-    def _create_intelligent_fallbacks(self, selected_text: str, source_pdf_name: str, existing_count: int) -> List[DocumentConnection]:
+    def _create_intelligent_fallbacks(self, selected_text: str, source_pdf_name: str, existing_count: int,
+                                      existing: Optional[List[DocumentConnection]] = None) -> List[DocumentConnection]:
         """Create intelligent fallback connections when needed"""
-        return self.fallback_generator.create_intelligent_fallbacks(selected_text, source_pdf_name, existing_count)
+        return self.fallback_generator.create_intelligent_fallbacks(selected_text, source_pdf_name, existing_count, existing)
 
     def _analyze_selected_text(self, selected_text: str) -> dict:
         """Analyze selected text to extract key themes and concepts for better connection targeting"""
@@ -304,31 +358,8 @@ Return JSON array with EXACTLY 4 connection objects (3 external + 1 internal):""
         }
 
     def _generate_connection_summary(self, selected_text: str, connections: List[DocumentConnection]) -> str:
-        """Generate a summary of found connections"""
-        system_prompt = """You are a document connection summarizer. Create a concise 2-3 sentence summary of the cross-document connections found for the selected text. Focus on the main themes and relationships identified. Use plain text format only."""
-        
-        connection_descriptions = []
-        for conn in connections:
-            connection_descriptions.append(f"{conn.title} ({conn.strength} strength): {conn.snippet}")
-        
-        user_prompt = f"""Selected text: {selected_text}
-
-Connections found:
-{chr(10).join(connection_descriptions)}
-
-Provide a 2-3 sentence summary of these cross-document connections:"""
-        
-        try:
-            summary = self.llm_client.generate(
-                prompt=user_prompt,
-                max_tokens=800,  # Increased for complete summary
-                temperature=0.6,
-                system_prompt=system_prompt
-            )
-            return summary.strip()
-        except Exception as e:
-            self.logger.error(f"Connections: Error generating summary: {e}")
-            return f"Found {len(connections)} cross-document connections related to the selected text."
+        """Generate a summary of found connections locally (no extra LLM round trip)"""
+        return self.utils.build_extractive_summary(selected_text, connections)
 
 # Create singleton instance
 connection_service = ConnectionService()
\ No newline at end of file
@@ -1,4 +1,5 @@
 import os
+import threading
 from typing import List, Dict, Any, Optional
 from fastapi import UploadFile
 from models import DocumentInfo
@@ -25,6 +26,8 @@ class DocumentService:
         # Initialize data structures
         self.documents: Dict[str, DocumentInfo] = {}
         self._id_filename_map: Dict[str, str] = {}
+        # Index refreshes run from request handlers and from the background outline worker
+        self._refresh_lock = threading.Lock()
         
         # Load data
         self._rebuild_index_from_files()  # Always rebuild from actual files
@@ -66,28 +69,28 @@ class DocumentService:
         if doc_info.id in self.documents:
             return doc_info
         
-        # Generate outline for new document
-        doc_info = self.outline_manager.generate_and_save_outline(doc_info)
+        # Generate outline for new document (large PDFs finish in the background)
+        doc_info = self.outline_manager.generate_and_save_outline(doc_info, on_complete=self._refresh_indexes)
         
         # Add to index and runtime
         self._id_filename_map[doc_info.id] = doc_info.filename
         self._save_index()
         self.documents[doc_info.id] = doc_info
         
-        # Refresh search / connection indexes (best-effort)
+        self._refresh_indexes(doc_info)
+        return doc_info
+    
+    def _refresh_indexes(self, doc_info: DocumentInfo) -> None:
+        """Refresh search / connection indexes for a new or re-outlined document (best-effort)"""
         try:
             from services.search_service import search_service  # local import
             from services.connection_service import connection_service  # local import
-            search_service._build_search_index()
-            if hasattr(connection_service, 'heading_metadata'):
-                delattr(connection_service, 'heading_metadata')
-            if hasattr(connection_service, 'document_vectors'):
-                connection_service.document_vectors = {}
-            print(f"🔄 Refreshed search indexes")
+            with self._refresh_lock:
+                search_service._build_search_index()
+                sections = connection_service.index_document(doc_info.id)
+            print(f"🔄 Refreshed search indexes ({sections} section vectors cached)")
         except Exception as e:
             print(f"⚠️ Index refresh warning: {e}")
-
-        return doc_info
     
     async def bulk_upload_documents(self, files: List[UploadFile]) -> List[DocumentInfo]:
         """Upload multiple documents with duplicate checking"""
@@ -174,6 +177,13 @@ class DocumentService:
         self.document_operations.remove_document(doc_id)
         self.documents = self.document_operations.get_documents_dict()
         
+        # Drop cached section vectors and connection results (best-effort)
+        try:
+            from services.connection_service import connection_service  # local import
+            connection_service.invalidate_document(doc_id, doc.filename)
+        except Exception as e:
+            print(f"⚠️ Connection cache invalidation warning: {e}")
+        
         return True
     
     def sync_with_filesystem(self) -> None:
@@ -1,10 +1,15 @@
 """
 Outline manager module for PDF outline generation and management.
+
+Uploads get a time-budgeted outline: when the budget runs out a partial outline is
+saved right away and the remaining pages are finished by a single background worker,
+which then rewrites the outline file.
 """
 
 import os
 import json
-from typing import Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, Callable
 from config import settings
 from models import DocumentInfo
 
@@ -12,37 +17,100 @@ from models import DocumentInfo
 class OutlineManager:
     """Handles PDF outline generation and management."""
     
-    def generate_and_save_outline(self, doc_info: DocumentInfo) -> DocumentInfo:
-        """Generate and save outline for a document"""
+    def __init__(self):
+        # One worker: background completions run one at a time, after the uploads
+        self._resume_executor: Optional[ThreadPoolExecutor] = None
+    
+    def generate_and_save_outline(self, doc_info: DocumentInfo,
+                                  on_complete: Optional[Callable[[DocumentInfo], None]] = None) -> DocumentInfo:
+        """Generate and save outline for a document.
+        
+        If the outline is finished in the background, on_complete(doc_info) runs once the
+        full outline has been written.
+        """
         print(f"📋 Generating outline...")
         
         # Ensure outline folder exists
         os.makedirs(settings.outline_folder, exist_ok=True)
         
         # Generate outline
-        from utils import generate_pdf_outline
-        outline = generate_pdf_outline(doc_info.filepath)
+        from utils import generate_pdf_outline, start_pdf_outline
+        extraction = None
+        if settings.outline_time_budget_seconds > 0:
+            outline, extraction = start_pdf_outline(doc_info.filepath, settings.outline_time_budget_seconds)
+        else:
+            outline = generate_pdf_outline(doc_info.filepath)
         
         # Save outline with same base name as PDF
         base_name = os.path.splitext(doc_info.filename)[0]
         outline_path = os.path.join(settings.outline_folder, f"{base_name}.json")
         
-        try:
-            with open(outline_path, 'w', encoding='utf-8') as f:
-                json.dump(outline, f, indent=2, ensure_ascii=False)
+        if self._write_outline(outline_path, outline):
             print(f"💾 Saved outline: {outline_path}")
             
             # Update document info
             doc_info.outline_path = outline_path
             doc_info.has_outline = True
-            
-        except Exception as e:
-            print(f"❌ Failed to write outline for {doc_info.filename}: {e}")
+        else:
             doc_info.outline_path = None
             doc_info.has_outline = False
         
+        if extraction is not None:
+            if doc_info.has_outline:
+                print(f"⏱️ Outline budget reached after {outline['pages_processed']}/{outline['page_count']} pages, "
+                      f"finishing {doc_info.filename} in the background")
+                self._get_resume_executor().submit(self._finish_outline, extraction, doc_info, outline_path, on_complete)
+            else:
+                extraction.close()
+        
         return doc_info
     
+    def _get_resume_executor(self) -> ThreadPoolExecutor:
+        if self._resume_executor is None:
+            self._resume_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="outline-resume")
+        return self._resume_executor
+    
+    def _finish_outline(self, extraction, doc_info: DocumentInfo, outline_path: str,
+                        on_complete: Optional[Callable[[DocumentInfo], None]]) -> None:
+        """Background: extract the remaining pages and replace the partial outline"""
+        try:
+            extraction.run()
+            outline = extraction.result()
+        except Exception as e:
+            print(f"❌ Background outline failed for {doc_info.filename}, keeping the partial outline: {e}")
+            return
+        finally:
+            extraction.close()
+        
+        if not os.path.exists(doc_info.filepath):
+            # Deleted while the outline was being finished
+            return
+        if not self._write_outline(outline_path, outline):
+            return
+        print(f"💾 Completed outline in the background: {outline_path} ({len(outline['outline'])} headings)")
+        
+        if on_complete:
+            try:
+                on_complete(doc_info)
+            except Exception as e:
+                print(f"⚠️ Outline completion callback failed for {doc_info.filename}: {e}")
+    
+    def _write_outline(self, outline_path: str, outline: Dict[str, Any]) -> bool:
+        # Write then rename: readers never see a half-written outline
+        temp_path = f"{outline_path}.{os.getpid()}.part"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(outline, f, indent=2, ensure_ascii=False)
+            os.replace(temp_path, outline_path)
+            return True
+        except Exception as e:
+            print(f"❌ Failed to write outline for {os.path.basename(outline_path)}: {e}")
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            return False
+    
     def get_document_outline(self, doc_info: Optional[DocumentInfo]) -> Optional[Dict[str, Any]]:
         """Get document outline by document info"""
         if not doc_info or not doc_info.outline_path or not os.path.exists(doc_info.outline_path):
@@ -10,6 +10,7 @@ from .did_you_know_generator import DidYouKnowGenerator
 from .contradictions_generator import ContradictionsGenerator
 from .examples_generator import ExamplesGenerator
 from .cross_references_generator import CrossReferencesGenerator
+from .batch_generator import BatchInsightsGenerator
 from .utils import InsightsUtils
 
 __all__ = [
@@ -20,5 +21,6 @@ __all__ = [
     'ContradictionsGenerator',
     'ExamplesGenerator',
     'CrossReferencesGenerator',
+    'BatchInsightsGenerator',
     'InsightsUtils'
 ]
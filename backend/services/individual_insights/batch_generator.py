@@ -0,0 +1,100 @@
+"""
+Batch generator module for producing several individual insight types in one LLM call.
+"""
+
+import json
+import logging
+from typing import Dict, List
+from utils import get_llm_client
+from models.individual_insights_model import Respond
+
+logger = logging.getLogger(__name__)
+
+
+class BatchInsightsGenerator:
+    """Requests all selected insight types in one structured-output call and splits the result."""
+    
+    def __init__(self, generators: Dict[str, object]):
+        self.client = get_llm_client("insights")  # Dedicated insights client
+        # insight_type -> generator exposing SECTIONS, RESPONSE_SCHEMA, build_response, build_fallback
+        self.generators = generators
+    
+    def build_response_schema(self, insight_types: List[str]) -> dict:
+        """Combined schema: one property per requested insight type.
+        
+        Stays a raw schema rather than generate_structured: a section that is missing or
+        malformed falls back on its own, while a model would reject the whole response.
+        """
+        return {
+            "type": "object",
+            "properties": {
+                insight_type: self.generators[insight_type].RESPONSE_SCHEMA
+                for insight_type in insight_types
+            },
+            "required": list(insight_types)
+        }
+    
+    def generate_batch(self, selected_text: str, document_id: str, page_no: int,
+                       original_insight: Respond, insight_types: List[str],
+                       context: dict, utils, parser) -> Dict[str, object]:
+        """Generate every requested insight type; types missing from the response fall back locally"""
+        sections = "\n\n".join(
+            f'"{insight_type}":\n{self.generators[insight_type].SECTIONS}'
+            for insight_type in insight_types
+        )
+        system_prompt = f"""You are a document insight analyst. Produce several structured analyses of the same selected text in one response.
+
+Return ONE JSON object with exactly these top-level keys: {', '.join(insight_types)}.
+Each key holds an object with the following sections:
+
+{sections}
+
+Arrays described as "exactly 3" must contain exactly 3 one-line strings.
+No markdown, no explanations, just pure JSON."""
+        
+        user_prompt = f"""Document Context: {context['pdf_context']}
+
+Primary Document: {context['primary_document']} (Page {context['page_number']})
+
+Selected Text: "{selected_text}"
+
+Original Insight: "{original_insight.content}"
+
+Generate the structured analyses for: {', '.join(insight_types)}"""
+        
+        data = {}
+        try:
+            response = self.client.generate(
+                prompt=user_prompt,
+                max_tokens=min(8192, sum(self.generators[t].MAX_TOKENS for t in insight_types)),
+                temperature=0.6,
+                system_prompt=system_prompt,
+                response_schema=self.build_response_schema(insight_types)
+            )
+            
+            logger.debug("Batch insights raw response (%d chars): %.200s", len(response), response)
+            
+            data = json.loads(parser.clean_llm_response(response))
+            if not isinstance(data, dict):
+                data = {}
+        except Exception as e:
+            print(f"Error generating batch insights: {e}")
+        
+        results = {}
+        for insight_type in insight_types:
+            generator = self.generators[insight_type]
+            section = data.get(insight_type)
+            try:
+                if not isinstance(section, dict):
+                    raise ValueError(f"missing section '{insight_type}'")
+                results[insight_type] = generator.build_response(
+                    section, selected_text, document_id, page_no,
+                    original_insight, context, utils, parser
+                )
+            except Exception as e:
+                print(f"Batch insights: falling back for {insight_type}: {e}")
+                results[insight_type] = generator.build_fallback(
+                    selected_text, document_id, page_no, original_insight, context, utils
+                )
+        
+        return results
@@ -3,18 +3,18 @@ Context manager module for handling document context and PDF outline management.
 """
 
 from typing import Dict, Any
-from utils.llm_client import format_outlines_for_context, get_all_pdf_outlines
+from utils.llm_client import get_library_context
 from services.document_service import document_service
 
 
 class ContextManager:
     """Handles document context retrieval and PDF outline management."""
     
-    def get_document_context(self, document_id: str, page_no: int) -> Dict[str, Any]:
+    def get_document_context(self, document_id: str, page_no: int, selected_text: str = "") -> Dict[str, Any]:
         """Get document context for the LLM"""
         try:
             doc = document_service.get_document(document_id)
-            pdf_context = format_outlines_for_context(get_all_pdf_outlines())
+            pdf_context = get_library_context(selected_text)
             
             return {
                 "primary_document": doc.filename if doc else "Unknown",
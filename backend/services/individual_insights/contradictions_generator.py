@@ -10,6 +10,39 @@ from models.individual_insights_model import ContradictionsResponse, Contradicti
 class ContradictionsGenerator:
     """Handles contradictions analysis generation."""
     
+    INSIGHT_TYPE = "contradictions"
+    
+    SECTIONS = """1. source_a: Object with pdf_name and description (1 line)
+2. source_b: Object with pdf_name and description (1 line)
+3. resolution_strategy: A thoughtful 2-3 line strategy for resolving conflicts"""
+    
+    # Gemini structured-output schema for the type-specific fields
+    RESPONSE_SCHEMA = {
+        "type": "object",
+        "properties": {
+            "source_a": {
+                "type": "object",
+                "properties": {
+                    "pdf_name": {"type": "string"},
+                    "description": {"type": "string"}
+                },
+                "required": ["pdf_name", "description"]
+            },
+            "source_b": {
+                "type": "object",
+                "properties": {
+                    "pdf_name": {"type": "string"},
+                    "description": {"type": "string"}
+                },
+                "required": ["pdf_name", "description"]
+            },
+            "resolution_strategy": {"type": "string"}
+        },
+        "required": ["source_a", "source_b", "resolution_strategy"]
+    }
+    
+    MAX_TOKENS = 700
+    
     def __init__(self):
         self.client = get_llm_client("insights")  # Dedicated insights client
     
@@ -19,9 +52,7 @@ class ContradictionsGenerator:
         """Generate contradictions analysis with specific structure"""
         system_prompt = """You are a critical analysis expert. Create a structured contradictions analysis with exactly 3 sections:
 
-1. source_a: Object with pdf_name and description (1 line)
-2. source_b: Object with pdf_name and description (1 line)  
-3. resolution_strategy: A thoughtful 2-3 line strategy for resolving conflicts
+""" + self.SECTIONS + """
 
 CRITICAL: Respond with ONLY valid JSON in this exact format:
 {
@@ -30,14 +61,14 @@ CRITICAL: Respond with ONLY valid JSON in this exact format:
     "description": "Brief one-line description of this source's perspective."
   },
   "source_b": {
-    "pdf_name": "Document B.pdf", 
+    "pdf_name": "Document B.pdf",
     "description": "Brief one-line description of this source's perspective."
   },
   "resolution_strategy": "Detailed 2-3 line strategy for resolving or reconciling the conflicting information."
 }
 
 No markdown, no explanations, just pure JSON."""
-
+        
         user_prompt = f"""Document Context: {context['pdf_context']}
 
 Primary Document: {context['primary_document']} (Page {context['page_number']})
@@ -47,11 +78,11 @@ Selected Text: "{selected_text}"
 Original Insight: "{original_insight.content}"
 
 Analyze potential contradictions and provide resolution strategy:"""
-
+        
         try:
             response = self.client.generate(
                 prompt=user_prompt,
-                max_tokens=700,
+                max_tokens=self.MAX_TOKENS,
                 temperature=0.6,
                 system_prompt=system_prompt
             )
@@ -61,44 +92,56 @@ Analyze potential contradictions and provide resolution strategy:"""
             cleaned_response = parser.clean_llm_response(response)
             data = json.loads(cleaned_response)
             
-            # Extract source information
-            source_a_data = data.get('source_a', {})
-            source_b_data = data.get('source_b', {})
-            
-            return ContradictionsResponse(
-                # Common fields
-                title=utils.generate_title("contradictions", selected_text),
-                content=utils.generate_content_summary(selected_text, original_insight.content),
-                source_documents=utils.generate_source_documents(document_id, page_no),
-                confidence=utils.calculate_confidence(0.8),
-                # Specific fields
-                source_a=ContradictingSource(
-                    pdf_name=source_a_data.get('pdf_name', context['primary_document']),
-                    description=source_a_data.get('description', 'Primary perspective on the topic.')
-                ),
-                source_b=ContradictingSource(
-                    pdf_name=source_b_data.get('pdf_name', 'Related document'),
-                    description=source_b_data.get('description', 'Alternative perspective on the topic.')
-                ),
-                resolution_strategy=data.get('resolution_strategy', '').strip() or "Cross-reference both sources and consider context to develop a balanced understanding that incorporates valid points from each perspective."
-            )
-            
+            return self.build_response(data, selected_text, document_id, page_no,
+                                       original_insight, context, utils, parser)
+        
         except Exception as e:
             print(f"Error generating contradictions: {e}")
-            return ContradictionsResponse(
-                # Common fields
-                title=utils.generate_title("contradictions", selected_text),
-                content=utils.generate_content_summary(selected_text, original_insight.content),
-                source_documents=utils.generate_source_documents(document_id, page_no),
-                confidence=utils.calculate_confidence(0.6),
-                # Specific fields
-                source_a=ContradictingSource(
-                    pdf_name=context['primary_document'],
-                    description="Primary source providing one perspective on the topic."
-                ),
-                source_b=ContradictingSource(
-                    pdf_name="Alternative source",
-                    description="Secondary source offering different viewpoint."
-                ),
-                resolution_strategy="Compare both perspectives carefully and synthesize a balanced view that considers the context and validity of each source."
-            )
+            return self.build_fallback(selected_text, document_id, page_no,
+                                       original_insight, context, utils)
+    
+    def build_response(self, data: dict, selected_text: str, document_id: str, page_no: int,
+                       original_insight: Respond, context: dict, utils, parser) -> ContradictionsResponse:
+        """Build the response model from parsed LLM JSON"""
+        # Extract source information
+        source_a_data = data.get('source_a', {})
+        source_b_data = data.get('source_b', {})
+        
+        return ContradictionsResponse(
+            # Common fields
+            title=utils.generate_title("contradictions", selected_text),
+            content=utils.generate_content_summary(selected_text, original_insight.content),
+            source_documents=utils.generate_source_documents(document_id, page_no),
+            confidence=utils.calculate_confidence(0.8),
+            # Specific fields
+            source_a=ContradictingSource(
+                pdf_name=source_a_data.get('pdf_name', context['primary_document']),
+                description=source_a_data.get('description', 'Primary perspective on the topic.')
+            ),
+            source_b=ContradictingSource(
+                pdf_name=source_b_data.get('pdf_name', 'Related document'),
+                description=source_b_data.get('description', 'Alternative perspective on the topic.')
+            ),
+            resolution_strategy=data.get('resolution_strategy', '').strip() or "Cross-reference both sources and consider context to develop a balanced understanding that incorporates valid points from each perspective."
+        )
+    
+    def build_fallback(self, selected_text: str, document_id: str, page_no: int,
+                       original_insight: Respond, context: dict, utils) -> ContradictionsResponse:
+        """Local response used when the LLM call or parsing fails"""
+        return ContradictionsResponse(
+            # Common fields
+            title=utils.generate_title("contradictions", selected_text),
+            content=utils.generate_content_summary(selected_text, original_insight.content),
+            source_documents=utils.generate_source_documents(document_id, page_no),
+            confidence=utils.calculate_confidence(0.6),
+            # Specific fields
+            source_a=ContradictingSource(
+                pdf_name=context['primary_document'],
+                description="Primary source providing one perspective on the topic."
+            ),
+            source_b=ContradictingSource(
+                pdf_name="Alternative source",
+                description="Secondary source offering different viewpoint."
+            ),
+            resolution_strategy="Compare both perspectives carefully and synthesize a balanced view that considers the context and validity of each source."
+        )
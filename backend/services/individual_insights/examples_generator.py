@@ -10,6 +10,23 @@ from models.individual_insights_model import ExamplesResponse, Respond
 class ExamplesGenerator:
     """Handles examples generation with implementation approaches and challenges."""
     
+    INSIGHT_TYPE = "examples"
+    
+    SECTIONS = """1. implementation_approach: Array of exactly 3 one-line practical steps
+2. key_challenges: Array of exactly 3 one-line potential challenges"""
+    
+    # Gemini structured-output schema for the type-specific fields
+    RESPONSE_SCHEMA = {
+        "type": "object",
+        "properties": {
+            "implementation_approach": {"type": "array", "items": {"type": "string"}},
+            "key_challenges": {"type": "array", "items": {"type": "string"}}
+        },
+        "required": ["implementation_approach", "key_challenges"]
+    }
+    
+    MAX_TOKENS = 700
+    
     def __init__(self):
         self.client = get_llm_client("insights")  # Dedicated insights client
     
@@ -19,14 +36,13 @@ class ExamplesGenerator:
         """Generate examples with specific structure"""
         system_prompt = """You are a practical implementation expert. Create a structured examples analysis with exactly 2 sections:
 
-1. implementation_approach: Array of exactly 3 one-line practical steps
-2. key_challenges: Array of exactly 3 one-line potential challenges
+""" + self.SECTIONS + """
 
 CRITICAL: Respond with ONLY valid JSON in this exact format:
 {
   "implementation_approach": [
     "First specific implementation step.",
-    "Second specific implementation step.", 
+    "Second specific implementation step.",
     "Third specific implementation step."
   ],
   "key_challenges": [
@@ -37,7 +53,7 @@ CRITICAL: Respond with ONLY valid JSON in this exact format:
 }
 
 No markdown, no explanations, just pure JSON."""
-
+        
         user_prompt = f"""Document Context: {context['pdf_context']}
 
 Primary Document: {context['primary_document']} (Page {context['page_number']})
@@ -47,11 +63,11 @@ Selected Text: "{selected_text}"
 Original Insight: "{original_insight.content}"
 
 Generate practical implementation approach and key challenges:"""
-
+        
         try:
             response = self.client.generate(
                 prompt=user_prompt,
-                max_tokens=700,
+                max_tokens=self.MAX_TOKENS,
                 temperature=0.6,
                 system_prompt=system_prompt
             )
@@ -61,52 +77,64 @@ Generate practical implementation approach and key challenges:"""
             cleaned_response = parser.clean_llm_response(response)
             data = json.loads(cleaned_response)
             
-            # Extract and validate arrays
-            implementation_approach = data.get('implementation_approach', [])
-            key_challenges = data.get('key_challenges', [])
-            
-            # Ensure exactly 3 items in each array
-            if not isinstance(implementation_approach, list):
-                implementation_approach = self._extract_list_from_text(str(implementation_approach), 3)
-            elif len(implementation_approach) != 3:
-                implementation_approach = self._extract_list_from_text(' '.join(implementation_approach), 3)
-            
-            if not isinstance(key_challenges, list):
-                key_challenges = self._extract_list_from_text(str(key_challenges), 3)
-            elif len(key_challenges) != 3:
-                key_challenges = self._extract_list_from_text(' '.join(key_challenges), 3)
-            
-            return ExamplesResponse(
-                # Common fields
-                title=utils.generate_title("examples", selected_text),
-                content=utils.generate_content_summary(selected_text, original_insight.content),
-                source_documents=utils.generate_source_documents(document_id, page_no),
-                confidence=utils.calculate_confidence(0.85),
-                # Specific fields
-                implementation_approach=implementation_approach[:3] if len(implementation_approach) >= 3 else implementation_approach + ["Additional implementation step needed."] * (3 - len(implementation_approach)),
-                key_challenges=key_challenges[:3] if len(key_challenges) >= 3 else key_challenges + ["Additional challenge consideration required."] * (3 - len(key_challenges))
-            )
-            
+            return self.build_response(data, selected_text, document_id, page_no,
+                                       original_insight, context, utils, parser)
+        
         except Exception as e:
             print(f"Error generating examples: {e}")
-            return ExamplesResponse(
-                # Common fields
-                title=utils.generate_title("examples", selected_text),
-                content=utils.generate_content_summary(selected_text, original_insight.content),
-                source_documents=utils.generate_source_documents(document_id, page_no),
-                confidence=utils.calculate_confidence(0.6),
-                # Specific fields
-                implementation_approach=[
-                    "Analyze the content thoroughly for key insights.",
-                    "Develop a structured implementation plan.",
-                    "Execute with regular monitoring and adjustments."
-                ],
-                key_challenges=[
-                    "Resource allocation and timeline management.",
-                    "Stakeholder alignment and communication.",
-                    "Quality assurance and performance measurement."
-                ]
-            )
+            return self.build_fallback(selected_text, document_id, page_no,
+                                       original_insight, context, utils)
+    
+    def build_response(self, data: dict, selected_text: str, document_id: str, page_no: int,
+                       original_insight: Respond, context: dict, utils, parser) -> ExamplesResponse:
+        """Build the response model from parsed LLM JSON"""
+        # Extract and validate arrays
+        implementation_approach = data.get('implementation_approach', [])
+        key_challenges = data.get('key_challenges', [])
+        
+        # Ensure exactly 3 items in each array
+        if not isinstance(implementation_approach, list):
+            implementation_approach = self._extract_list_from_text(str(implementation_approach), 3)
+        elif len(implementation_approach) != 3:
+            implementation_approach = self._extract_list_from_text(' '.join(implementation_approach), 3)
+        
+        if not isinstance(key_challenges, list):
+            key_challenges = self._extract_list_from_text(str(key_challenges), 3)
+        elif len(key_challenges) != 3:
+            key_challenges = self._extract_list_from_text(' '.join(key_challenges), 3)
+        
+        return ExamplesResponse(
+            # Common fields
+            title=utils.generate_title("examples", selected_text),
+            content=utils.generate_content_summary(selected_text, original_insight.content),
+            source_documents=utils.generate_source_documents(document_id, page_no),
+            confidence=utils.calculate_confidence(0.85),
+            # Specific fields
+            implementation_approach=implementation_approach[:3] if len(implementation_approach) >= 3 else implementation_approach + ["Additional implementation step needed."] * (3 - len(implementation_approach)),
+            key_challenges=key_challenges[:3] if len(key_challenges) >= 3 else key_challenges + ["Additional challenge consideration required."] * (3 - len(key_challenges))
+        )
+    
+    def build_fallback(self, selected_text: str, document_id: str, page_no: int,
+                       original_insight: Respond, context: dict, utils) -> ExamplesResponse:
+        """Local response used when the LLM call or parsing fails"""
+        return ExamplesResponse(
+            # Common fields
+            title=utils.generate_title("examples", selected_text),
+            content=utils.generate_content_summary(selected_text, original_insight.content),
+            source_documents=utils.generate_source_documents(document_id, page_no),
+            confidence=utils.calculate_confidence(0.6),
+            # Specific fields
+            implementation_approach=[
+                "Analyze the content thoroughly for key insights.",
+                "Develop a structured implementation plan.",
+                "Execute with regular monitoring and adjustments."
+            ],
+            key_challenges=[
+                "Resource allocation and timeline management.",
+                "Stakeholder alignment and communication.",
+                "Quality assurance and performance measurement."
+            ]
+        )
     
     def _extract_list_from_text(self, text: str, count: int) -> list:
         """Extract a list of items from text when JSON parsing fails"""
@@ -119,9 +147,9 @@ Generate practical implementation approach and key challenges:"""
                 line = line.lstrip('- •*').strip()
                 if line:
                     items.append(line)
-                    
+        
         # Ensure we have exactly 'count' items
         while len(items) < count:
             items.append(f"Additional item {len(items) + 1} needed.")
-            
+        
         return items[:count]
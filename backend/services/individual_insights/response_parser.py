@@ -5,6 +5,7 @@ Response parser module for handling LLM response parsing and cleaning utilities.
 import json
 import re
 from typing import List
+from utils.json_scanner import first_json_span, loads_tolerant, strip_code_fence
 
 
 class ResponseParser:
@@ -12,24 +13,21 @@ class ResponseParser:
     
     def clean_llm_response(self, response: str) -> str:
         """Clean and extract JSON from LLM response"""
-        response = response.strip()
-        
         # Remove markdown code blocks
-        if response.startswith('```json'):
-            response = response[7:]
-        elif response.startswith('```'):
-            response = response[3:]
-        if response.endswith('```'):
-            response = response[:-3]
-        
-        response = response.strip()
-        
-        # Try to find JSON object in response
-        json_match = re.search(r'\{.*\}', response, re.DOTALL)
-        if json_match:
-            return json_match.group()
-        
-        return response
+        response = strip_code_fence(response.strip()).strip()
+        
+        # First balanced JSON object (single pass; braces inside strings are ignored)
+        span = first_json_span(response, "{")
+        if span is None:
+            return response
+        
+        # Hand back valid JSON when a bounded repair can fix it (trailing commas, truncation)
+        try:
+            json.loads(span)
+            return span
+        except ValueError:
+            data = loads_tolerant(span)
+            return json.dumps(data) if isinstance(data, dict) else span
     
     def extract_list_from_text(self, text: str, expected_count: int = 3) -> List[str]:
         """Extract a list of points from text, handling various formats"""
@@ -1,18 +1,21 @@
 import json
 import re
 import time
+import hashlib
 from typing import Dict, Any, List, Optional
-from utils.llm_client import get_llm_client, format_outlines_for_context, get_all_pdf_outlines
+from utils.llm_client import get_llm_client, get_library_context
+from utils.single_flight import SingleFlight
 from services.document_service import document_service
 from models.individual_insights_model import (
     KeyTakeawayResponse, DidYouKnowResponse, ContradictionsResponse,
     ExamplesResponse, CrossReferencesResponse, KnowledgeDepth,
-    SourceContext, ContradictingSource, ResponseSourceDocument, Respond
+    SourceContext, ContradictingSource, ResponseSourceDocument, Respond,
+    BatchInsightResponse
 )
 from .individual_insights import (
     ContextManager, ResponseParser, InsightsUtils,
     KeyTakeawayGenerator, DidYouKnowGenerator, ContradictionsGenerator,
-    ExamplesGenerator, CrossReferencesGenerator
+    ExamplesGenerator, CrossReferencesGenerator, BatchInsightsGenerator
 )
 
 class IndividualInsightsService:
@@ -28,12 +31,26 @@ class IndividualInsightsService:
         self.contradictions_generator = ContradictionsGenerator()
         self.examples_generator = ExamplesGenerator()
         self.cross_references_generator = CrossReferencesGenerator()
+        # Keyed by each generator's own insight type (the BatchInsightRequest names)
+        self.batch_generator = BatchInsightsGenerator({
+            generator.INSIGHT_TYPE: generator
+            for generator in (
+                self.key_takeaway_generator,
+                self.did_you_know_generator,
+                self.contradictions_generator,
+                self.examples_generator,
+                self.cross_references_generator,
+            )
+        })
         
-    def _get_document_context(self, document_id: str, page_no: int) -> Dict[str, Any]:
+        # Duplicate requests for the same selection and insight type share one generation
+        self._in_flight = SingleFlight()
+        
+    def _get_document_context(self, document_id: str, page_no: int, selected_text: str = "") -> Dict[str, Any]:
         """Get document context for the LLM"""
         try:
             doc = document_service.get_document(document_id)
-            pdf_context = format_outlines_for_context(get_all_pdf_outlines())
+            pdf_context = get_library_context(selected_text)
             
             return {
                 "primary_document": doc.filename if doc else "Unknown",
@@ -126,49 +143,90 @@ class IndividualInsightsService:
             
         return items[:count]
 
+    def _coalesced(self, insight_type: str, selected_text: str, document_id: str,
+                   page_no: int, original_insight: Respond, generate):
+        """Run generate() once per identical in-flight (type, selection, insight) request"""
+        digest = hashlib.sha256()
+        for part in (insight_type, document_id, str(page_no), selected_text.strip(),
+                     original_insight.model_dump_json()):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\x00")
+        return self._in_flight.do(digest.hexdigest(), generate)
+
     def generate_key_takeaway(self, selected_text: str, document_id: str, 
                             page_no: int, original_insight: Respond) -> KeyTakeawayResponse:
         """Generate key takeaway using modular component"""
-        context = self.context_manager.get_document_context(document_id, page_no)
-        return self.key_takeaway_generator.generate_key_takeaway(
-            selected_text, document_id, page_no, original_insight,
-            context, self.utils, self.response_parser
-        )
+        def generate():
+            context = self.context_manager.get_document_context(document_id, page_no, selected_text)
+            return self.key_takeaway_generator.generate_key_takeaway(
+                selected_text, document_id, page_no, original_insight,
+                context, self.utils, self.response_parser
+            )
+        return self._coalesced("key_takeaway", selected_text, document_id, page_no, original_insight, generate)
     
     def generate_did_you_know(self, selected_text: str, document_id: str,
                              page_no: int, original_insight: Respond) -> DidYouKnowResponse:
         """Generate did you know insight using modular component"""
-        context = self.context_manager.get_document_context(document_id, page_no)
-        return self.did_you_know_generator.generate_did_you_know(
-            selected_text, document_id, page_no, original_insight,
-            context, self.utils, self.response_parser
-        )
+        def generate():
+            context = self.context_manager.get_document_context(document_id, page_no, selected_text)
+            return self.did_you_know_generator.generate_did_you_know(
+                selected_text, document_id, page_no, original_insight,
+                context, self.utils, self.response_parser
+            )
+        return self._coalesced("did_you_know", selected_text, document_id, page_no, original_insight, generate)
     
     def generate_contradictions(self, selected_text: str, document_id: str,
                               page_no: int, original_insight: Respond) -> ContradictionsResponse:
         """Generate contradictions analysis using modular component"""
-        context = self.context_manager.get_document_context(document_id, page_no)
-        return self.contradictions_generator.generate_contradictions(
-            selected_text, document_id, page_no, original_insight,
-            context, self.utils, self.response_parser
-        )
+        def generate():
+            context = self.context_manager.get_document_context(document_id, page_no, selected_text)
+            return self.contradictions_generator.generate_contradictions(
+                selected_text, document_id, page_no, original_insight,
+                context, self.utils, self.response_parser
+            )
+        return self._coalesced("contradictions", selected_text, document_id, page_no, original_insight, generate)
     
     def generate_examples(self, selected_text: str, document_id: str,
                          page_no: int, original_insight: Respond) -> ExamplesResponse:
         """Generate examples using modular component"""
-        context = self.context_manager.get_document_context(document_id, page_no)
-        return self.examples_generator.generate_examples(
-            selected_text, document_id, page_no, original_insight,
-            context, self.utils, self.response_parser
-        )
+        def generate():
+            context = self.context_manager.get_document_context(document_id, page_no, selected_text)
+            return self.examples_generator.generate_examples(
+                selected_text, document_id, page_no, original_insight,
+                context, self.utils, self.response_parser
+            )
+        return self._coalesced("examples", selected_text, document_id, page_no, original_insight, generate)
     
     def generate_cross_references(self, selected_text: str, document_id: str,
                                 page_no: int, original_insight: Respond) -> CrossReferencesResponse:
         """Generate cross references using modular component"""
-        context = self.context_manager.get_document_context(document_id, page_no)
-        return self.cross_references_generator.generate_cross_references(
-            selected_text, document_id, page_no, original_insight,
-            context, self.utils, self.response_parser
+        def generate():
+            context = self.context_manager.get_document_context(document_id, page_no, selected_text)
+            return self.cross_references_generator.generate_cross_references(
+                selected_text, document_id, page_no, original_insight,
+                context, self.utils, self.response_parser
+            )
+        return self._coalesced("cross_references", selected_text, document_id, page_no, original_insight, generate)
+    
+    def generate_batch(self, selected_text: str, document_id: str, page_no: int,
+                       original_insight: Respond, insight_types: List[str]) -> BatchInsightResponse:
+        """Generate several insight types for one selection with a single LLM call"""
+        start_time = time.time()
+        # Preserve request order, drop duplicates
+        insight_types = list(dict.fromkeys(insight_types))
+        
+        def generate():
+            context = self.context_manager.get_document_context(document_id, page_no, selected_text)
+            return self.batch_generator.generate_batch(
+                selected_text, document_id, page_no, original_insight, insight_types,
+                context, self.utils, self.response_parser
+            )
+        results = self._coalesced("batch:" + ",".join(insight_types), selected_text,
+                                  document_id, page_no, original_insight, generate)
+        
+        return BatchInsightResponse(
+            **results,
+            processing_time=time.time() - start_time
         )
 
 # Create singleton instance
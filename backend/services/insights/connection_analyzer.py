@@ -18,7 +18,8 @@ class ConnectionAnalyzer:
         connection_items = []
         
         try:
-            connections = connection_service.find_connections(selected_text, document_id)
+            # Only the connection list is used here, so skip the summary
+            connections = connection_service.find_connections(selected_text, document_id, include_summary=False)
             connection_items = getattr(connections, 'connections', []) or []
         except Exception:
             connection_items = []
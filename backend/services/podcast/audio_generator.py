@@ -3,9 +3,12 @@ Audio generator module for creating audio files and handling fallbacks.
 """
 
 import os
-from typing import List, Dict, Any
+from typing import Callable, Iterator, List, Dict, Any, Optional
 from config import settings
-from utils import create_podcast_audio
+from utils import create_podcast_audio, stream_podcast_audio, PodcastAudioPipeline
+
+# Read size when streaming an already generated file
+STREAM_CHUNK_SIZE = 64 * 1024
 
 
 class AudioGenerator:
@@ -21,6 +24,33 @@ class AudioGenerator:
         print(f"🎤 create_podcast_audio returned: {audio_filename}")
         return audio_filename or ""
     
+    def start_pipeline(self, language: str = "en") -> PodcastAudioPipeline:
+        """Synthesis pipeline fed turn by turn while the script is still being generated"""
+        return PodcastAudioPipeline(language=language)
+    
+    def finish_pipeline(self, pipeline: PodcastAudioPipeline, script_data: List[Dict[str, Any]]) -> str:
+        """Combined audio for the final script, reusing segments the pipeline already started"""
+        print(f"🎤 Finishing pipelined audio for {len(script_data)} segments ({pipeline.submitted} started early)...")
+        audio_filename = pipeline.finish(script_data)
+        print(f"🎤 Pipelined audio returned: {audio_filename}")
+        return audio_filename or ""
+    
+    def stream_audio(self, script_data: List[Dict[str, Any]], language: str = "en",
+                     on_complete: Optional[Callable[[Optional[str]], None]] = None) -> Iterator[bytes]:
+        """Progressive WAV stream; segments are sent as they are synthesized"""
+        print(f"🎤 Streaming podcast audio for {len(script_data)} segments...")
+        return stream_podcast_audio(script_data, language=language, on_complete=on_complete)
+    
+    def iter_audio_file(self, audio_filename: str) -> Iterator[bytes]:
+        """Stream an existing audio file in chunks"""
+        audio_path = os.path.join(settings.audio_folder, audio_filename)
+        with open(audio_path, "rb") as audio_file:
+            while True:
+                chunk = audio_file.read(STREAM_CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+    
     def process_audio_result(self, audio_filename: str, script_data: List[Dict[str, Any]], language: str = "en") -> str:
         """Process audio generation result and handle fallbacks"""
         if audio_filename and audio_filename.endswith('.wav'):
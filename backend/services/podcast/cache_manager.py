@@ -1,38 +1,192 @@
 """
 Cache manager module for handling podcast caching.
+
+Entries are JSON files (one per cache key) holding the response, so the cache survives
+restarts and is shared by every worker process. Last use is tracked in the entry's mtime;
+least recently used podcasts and their audio are evicted once the audio folder outgrows
+its budget.
 """
 
+import os
+import json
 import hashlib
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Set
+from pydantic import ValidationError
+from config import settings
 from models import PodcastResponse
 
+# Bump when the script or audio pipeline changes so old entries stop matching
+CACHE_KEY_VERSION = "v2"
+AUDIO_URL_PREFIX = "/static/audio/"
+# Encoded copies that live next to a podcast WAV (see utils.tts_client.transcode)
+DERIVED_AUDIO_EXTENSIONS = (".mp3", ".opus")
+
 
 class CacheManager:
     """Handles podcast caching and cache key generation."""
     
-    def __init__(self):
-        self.generated_podcasts = {}
+    def __init__(self, cache_dir: Optional[str] = None, max_audio_bytes: Optional[int] = None):
+        self.cache_dir = cache_dir or settings.podcast_cache_dir
+        self.max_audio_bytes = (
+            max_audio_bytes if max_audio_bytes is not None
+            else settings.podcast_cache_max_mb * 1024 * 1024
+        )
     
-    def generate_cache_key(self, selected_text: str, insights: List[Dict[str, Any]], format: str, duration: str) -> str:
+    def generate_cache_key(self, selected_text: str, insights: List[Dict[str, Any]], format: str,
+                           duration: str, language: str = "en") -> str:
         """Generate a unique cache key based on content"""
-        # Create a hash of the selected text and insights to ensure uniqueness
-        content_hash = hashlib.md5(
-            f"{selected_text}_{len(insights)}_{format}_{duration}".encode()
-        ).hexdigest()
+        # Hash the full content: every insight field counts, not just how many there are
+        payload = json.dumps(
+            {
+                "version": CACHE_KEY_VERSION,
+                "selected_text": selected_text.strip(),
+                "insights": insights,
+                "format": format,
+                "duration": duration,
+                "language": (language or "en").lower()
+            },
+            sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str
+        )
+        content_hash = hashlib.sha256(payload.encode("utf-8")).hexdigest()
         return f"podcast_{content_hash}"
     
+    def _entry_path(self, cache_key: str) -> str:
+        return os.path.join(self.cache_dir, f"{cache_key}.json")
+    
+    def _audio_filename(self, response: PodcastResponse) -> Optional[str]:
+        if response.audio_url.startswith(AUDIO_URL_PREFIX):
+            return response.audio_url[len(AUDIO_URL_PREFIX):]
+        return None
+    
+    def _load_entry(self, entry_path: str) -> Optional[PodcastResponse]:
+        try:
+            with open(entry_path, "r", encoding="utf-8") as entry_file:
+                return PodcastResponse.model_validate(json.load(entry_file)["response"])
+        except (OSError, ValueError, KeyError, ValidationError):
+            return None
+    
     def get_cached_podcast(self, cache_key: str) -> Optional[PodcastResponse]:
         """Get cached podcast if available"""
-        cached = self.generated_podcasts.get(cache_key)
-        if cached:
-            print(f"🎵 Using cached podcast for key: {cache_key}")
-            return cached
-        return None
+        entry_path = self._entry_path(cache_key)
+        cached = self._load_entry(entry_path)
+        if cached is None:
+            return None
+        
+        # Another worker (or the janitor) may have removed the audio
+        audio_filename = self._audio_filename(cached)
+        if audio_filename and not os.path.exists(os.path.join(settings.audio_folder, audio_filename)):
+            print(f"⚠️ Cached podcast audio is gone, dropping key: {cache_key}")
+            self._remove_file(entry_path)
+            return None
+        
+        try:
+            os.utime(entry_path)  # Mark as recently used
+        except OSError:
+            pass
+        print(f"🎵 Using cached podcast for key: {cache_key}")
+        return cached
     
     def cache_podcast(self, cache_key: str, response: PodcastResponse) -> None:
         """Cache the podcast response"""
-        self.generated_podcasts[cache_key] = response
+        if not response.audio_url:
+            # Failed generations are retried next time rather than cached
+            return
+        
+        os.makedirs(self.cache_dir, exist_ok=True)
+        entry_path = self._entry_path(cache_key)
+        temp_path = f"{entry_path}.{os.getpid()}.part"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as entry_file:
+                json.dump({"key": cache_key, "response": response.model_dump(mode="json")}, entry_file)
+            os.replace(temp_path, entry_path)
+        except OSError as e:
+            print(f"⚠️ Could not cache podcast {cache_key}: {e}")
+            self._remove_file(temp_path)
+            return
+        
+        self.evict_to_budget()
     
     def is_cached(self, cache_key: str) -> bool:
         """Check if podcast is cached"""
-        return cache_key in self.generated_podcasts
+        return os.path.exists(self._entry_path(cache_key))
+    
+    def referenced_audio_files(self) -> Set[str]:
+        """Audio filenames (with their encoded copies) that cached podcasts point to"""
+        referenced: Set[str] = set()
+        try:
+            with os.scandir(self.cache_dir) as scanned:
+                entry_paths = [entry.path for entry in scanned if entry.name.endswith(".json")]
+        except FileNotFoundError:
+            return referenced
+        
+        for entry_path in entry_paths:
+            cached = self._load_entry(entry_path)
+            audio_filename = self._audio_filename(cached) if cached else None
+            if audio_filename:
+                stem = os.path.splitext(audio_filename)[0]
+                referenced.add(audio_filename)
+                referenced.update(stem + extension for extension in DERIVED_AUDIO_EXTENSIONS)
+        return referenced
+    
+    def audio_footprint(self) -> int:
+        """Total bytes in the audio folder"""
+        total = 0
+        try:
+            with os.scandir(settings.audio_folder) as entries:
+                for entry in entries:
+                    if entry.is_file():
+                        total += entry.stat().st_size
+        except FileNotFoundError:
+            pass
+        return total
+    
+    def evict_to_budget(self) -> int:
+        """Drop least recently used podcasts (entry and audio) until the audio folder fits; returns evictions"""
+        footprint = self.audio_footprint()
+        if footprint <= self.max_audio_bytes:
+            return 0
+        
+        entries = []
+        try:
+            with os.scandir(self.cache_dir) as scanned:
+                for entry in scanned:
+                    if entry.is_file() and entry.name.endswith(".json"):
+                        entries.append((entry.stat().st_mtime, entry.path))
+        except FileNotFoundError:
+            return 0
+        
+        evicted = 0
+        for _, entry_path in sorted(entries):
+            if footprint <= self.max_audio_bytes:
+                break
+            cached = self._load_entry(entry_path)
+            self._remove_file(entry_path)
+            evicted += 1
+            audio_filename = self._audio_filename(cached) if cached else None
+            if audio_filename:
+                footprint -= self._remove_audio(audio_filename)
+        
+        if evicted:
+            print(f"🧹 Evicted {evicted} cached podcasts, audio folder now {footprint:,} bytes")
+        return evicted
+    
+    def _remove_audio(self, audio_filename: str) -> int:
+        """Delete a podcast's audio and its encoded copies; returns bytes freed"""
+        base_path = os.path.join(settings.audio_folder, os.path.splitext(audio_filename)[0])
+        freed = 0
+        for path in {os.path.join(settings.audio_folder, audio_filename),
+                     *(base_path + extension for extension in DERIVED_AUDIO_EXTENSIONS)}:
+            try:
+                size = os.path.getsize(path)
+                os.remove(path)
+                freed += size
+            except OSError:
+                # Missing, or already removed by another worker
+                pass
+        return freed
+    
+    def _remove_file(self, path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -2,8 +2,8 @@
 Script generator module for generating podcast scripts.
 """
 
-from typing import List, Dict, Any
-from utils import generate_podcast_script
+from typing import Callable, List, Dict, Any, Optional
+from utils import generate_podcast_script, stream_podcast_script
 
 
 class ScriptGenerator:
@@ -13,8 +13,21 @@ class ScriptGenerator:
         pass
     
     def generate_script(self, selected_text: str, insights_dict: List[Dict[str, Any]], 
-                       format: str, target_duration_minutes: float, language: str = "en") -> List[Dict[str, Any]]:
-        """Generate script using LLM with provided insights and time constraints"""
+                       format: str, target_duration_minutes: float, language: str = "en",
+                       on_segment: Optional[Callable[[Dict[str, str]], None]] = None) -> List[Dict[str, Any]]:
+        """Generate script using LLM with provided insights and time constraints
+        
+        With on_segment the LLM response is streamed and each turn is handed over as soon as it is parsed.
+        """
+        if on_segment is not None:
+            return stream_podcast_script(
+                selected_text=selected_text,
+                insights=insights_dict,
+                format=format,
+                max_duration_minutes=target_duration_minutes,
+                language=language,
+                on_segment=on_segment
+            )
         script_data = generate_podcast_script(
             selected_text=selected_text,
             insights=insights_dict,
@@ -2,7 +2,7 @@ import os
 import time
 import json
 import hashlib
-from typing import List, Dict, Any, Optional
+from typing import Callable, Iterator, List, Dict, Any, Optional, Tuple
 from config import settings
 from utils import generate_podcast_script, create_podcast_audio
 from services.document_service import document_service
@@ -14,8 +14,6 @@ from .podcast import (
 
 class PodcastService:
     def __init__(self):
-        self.generated_podcasts = {}
-        
         # Initialize modular components
         self.cache_manager = CacheManager()
         self.duration_manager = DurationManager()
@@ -23,15 +21,11 @@ class PodcastService:
         self.audio_generator = AudioGenerator()
         self.data_processor = DataProcessor()
         self.utils = PodcastServiceUtils()
-        
-        # Set the cache manager to use this service's cache
-        self.cache_manager.generated_podcasts = self.generated_podcasts
     
     def _generate_cache_key(self, selected_text: str, insights: List[Dict[str, Any]], format: str, duration: str, language: str = "en") -> str:
         """Generate a unique cache key based on content"""
-        # Include language to avoid mixing different language outputs
-        key = self.cache_manager.generate_cache_key(selected_text, insights, format, duration)
-        return f"{key}_{language.lower()}"
+        # Language is part of the key to avoid mixing different language outputs
+        return self.cache_manager.generate_cache_key(selected_text, insights, format, duration, language)
     
     def generate_podcast(self, selected_text: str, insights: List[Dict[str, Any]],
                         format: str = "podcast", duration: str = "medium", language: str = "en") -> PodcastResponse:
@@ -46,22 +40,14 @@ class PodcastService:
         
         self.utils.log_podcast_generation_start(cache_key)
         
-        # Determine target duration using duration manager
-        target_duration_minutes = self.duration_manager.get_target_duration(duration)
-        
-        # Process insights using data processor
-        insights_dict = self.data_processor.process_insights_to_dict(insights)
-        
-        # Generate script using script generator
-        script_data = self.script_generator.generate_script(
-            selected_text, insights_dict, format, target_duration_minutes, language
-        )
-        
-        # Convert to PodcastScript objects using data processor
-        script = self.data_processor.convert_script_data_to_objects(script_data)
+        # Synthesis starts on each speaker turn as soon as the streamed script yields it,
+        # so script generation and TTS overlap
+        pipeline = self.audio_generator.start_pipeline(language)
+        script_data, script = self._prepare_script(selected_text, insights, format, duration, language,
+                                                   on_segment=pipeline.submit)
         
         # Generate audio using audio generator
-        audio_filename = self.audio_generator.generate_audio(script_data, language)
+        audio_filename = self.audio_generator.finish_pipeline(pipeline, script_data)
         
         # Process audio result and handle fallbacks
         audio_url = self.audio_generator.process_audio_result(audio_filename, script_data, language)
@@ -83,6 +69,57 @@ class PodcastService:
         
         return response
     
+    def _prepare_script(self, selected_text: str, insights: List[Dict[str, Any]], format: str,
+                        duration: str, language: str,
+                        on_segment: Optional[Callable[[Dict[str, str]], None]] = None) -> Tuple[List[Dict[str, Any]], List[PodcastScript]]:
+        """Generate the script (dicts for TTS, PodcastScript objects for the response)"""
+        # Determine target duration using duration manager
+        target_duration_minutes = self.duration_manager.get_target_duration(duration)
+        
+        # Process insights using data processor
+        insights_dict = self.data_processor.process_insights_to_dict(insights)
+        
+        # Generate script using script generator
+        script_data = self.script_generator.generate_script(
+            selected_text, insights_dict, format, target_duration_minutes, language, on_segment=on_segment
+        )
+        
+        # Convert to PodcastScript objects using data processor
+        script = self.data_processor.convert_script_data_to_objects(script_data)
+        
+        return script_data, script
+    
+    def stream_podcast(self, selected_text: str, insights: List[Dict[str, Any]],
+                       format: str = "podcast", duration: str = "medium",
+                       language: str = "en") -> Tuple[List[PodcastScript], float, Iterator[bytes]]:
+        """Generate the script, then stream its audio while TTS is still running.
+        
+        Returns the transcript, the estimated duration and a WAV byte stream. Cached podcasts
+        are streamed from disk; new ones are cached once the stream completes.
+        """
+        cache_key = self._generate_cache_key(selected_text, insights, format, duration, language)
+        cached = self.cache_manager.get_cached_podcast(cache_key)
+        if cached and cached.audio_url.endswith('.wav'):
+            audio_filename = cached.audio_url.replace('/static/audio/', '')
+            if self.audio_generator.validate_audio_file(os.path.join(settings.audio_folder, audio_filename)):
+                return cached.transcript, cached.duration, self.audio_generator.iter_audio_file(audio_filename)
+        
+        self.utils.log_podcast_generation_start(cache_key)
+        script_data, script = self._prepare_script(selected_text, insights, format, duration, language)
+        estimated_duration = self.duration_manager.estimate_duration(script)
+        
+        def cache_streamed_audio(audio_filename: Optional[str]) -> None:
+            if audio_filename:
+                self.cache_manager.cache_podcast(cache_key, PodcastResponse(
+                    audio_url=f"/static/audio/{audio_filename}",
+                    transcript=script,
+                    duration=estimated_duration,
+                    format=format
+                ))
+        
+        stream = self.audio_generator.stream_audio(script_data, language, on_complete=cache_streamed_audio)
+        return script, estimated_duration, stream
+    
     def get_cached_podcast(self, selected_text: str, insights: List[Dict[str, Any]], format: str, duration: str, language: str = "en") -> Optional[PodcastResponse]:
         """Get cached podcast if available"""
         cache_key = self._generate_cache_key(selected_text, insights, format, duration, language)
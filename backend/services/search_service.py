@@ -1,3 +1,4 @@
+import threading
 from typing import List, Dict, Any
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
@@ -7,45 +8,63 @@ from services.document_service import document_service
 
 class SearchService:
     def __init__(self):
+        # Rebuilds come from request handlers and from the background outline worker:
+        # they run one at a time, and readers take the vectorizer, vectors and data together
+        self._lock = threading.RLock()
+        self.vectorizer = self._new_vectorizer()
+        self.heading_vectors = None
+        self.heading_data = []
+    
+    @staticmethod
+    def _new_vectorizer() -> TfidfVectorizer:
         # Enhanced TF-IDF with more features and n-grams for better matching
-        self.vectorizer = TfidfVectorizer(
+        return TfidfVectorizer(
             max_features=2000, 
             stop_words='english',
             ngram_range=(1, 2),  # Include bigrams for better phrase matching
             lowercase=True,
             token_pattern=r'\b[a-zA-Z][a-zA-Z0-9]*\b'  # Better tokenization
         )
-        self.heading_vectors = None
-        self.heading_data = []
     
     def _build_search_index(self):
         """Build search index from all document outlines"""
-        all_headings = []
-        self.heading_data = []
-        
-        for doc_id, doc_info in document_service.documents.items():
-            outline = document_service.get_document_outline(doc_id)
-            if outline:
-                for item in outline.get('outline', []):
-                    all_headings.append(item['text'])
-                    self.heading_data.append({
-                        'heading': item['text'],
-                        'page': item['page'],
-                        'pdf_name': doc_info.filename,
-                        'pdf_id': doc_id,
-                        'level': item['level']
-                    })
-        
-        if all_headings:
-            self.heading_vectors = self.vectorizer.fit_transform(all_headings)
+        with self._lock:
+            all_headings = []
+            heading_data = []
+            
+            for doc_id, doc_info in list(document_service.documents.items()):
+                outline = document_service.get_document_outline(doc_id)
+                if outline:
+                    for item in outline.get('outline', []):
+                        all_headings.append(item['text'])
+                        heading_data.append({
+                            'heading': item['text'],
+                            'page': item['page'],
+                            'pdf_name': doc_info.filename,
+                            'pdf_id': doc_id,
+                            'level': item['level']
+                        })
+            
+            if all_headings:
+                # Fit a new vectorizer so a query never meets vectors from another build
+                vectorizer = self._new_vectorizer()
+                self.heading_vectors = vectorizer.fit_transform(all_headings)
+                self.vectorizer = vectorizer
+            self.heading_data = heading_data
+    
+    def _snapshot(self, build: bool):
+        """Consistent (vectorizer, heading vectors, heading data), building the index first if asked"""
+        with self._lock:
+            if build:
+                self._build_search_index()
+            return self.vectorizer, self.heading_vectors, self.heading_data
     
     def search_headings(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
         """Search for headings across all PDFs with enhanced matching"""
         # Build index if not exists
-        if self.heading_vectors is None:
-            self._build_search_index()
+        vectorizer, heading_vectors, headings = self._snapshot(self.heading_vectors is None)
         
-        if self.heading_vectors is None or len(self.heading_data) == 0:
+        if heading_vectors is None or len(headings) == 0:
             return []
         
         # Preprocess query for better matching
@@ -53,7 +72,7 @@ class SearchService:
         
         # First, try exact substring matching for immediate results
         exact_matches = []
-        for i, heading_data in enumerate(self.heading_data):
+        for i, heading_data in enumerate(headings):
             heading_lower = heading_data['heading'].lower()
             if query_lower in heading_lower:
                 match_result = heading_data.copy()
@@ -76,20 +95,20 @@ class SearchService:
             return exact_matches[:limit]
         
         # Otherwise, complement with semantic similarity
-        query_vector = self.vectorizer.transform([query])
-        similarities = cosine_similarity(query_vector, self.heading_vectors)[0]
+        query_vector = vectorizer.transform([query])
+        similarities = cosine_similarity(query_vector, heading_vectors)[0]
         
         # Get top semantic results
         top_indices = np.argsort(similarities)[-limit*2:][::-1]  # Get more candidates
         
         semantic_results = []
-        exact_match_indices = {i for i, _ in enumerate(self.heading_data) 
-                              if any(em['heading'] == self.heading_data[i]['heading'] 
+        exact_match_indices = {i for i, _ in enumerate(headings) 
+                              if any(em['heading'] == headings[i]['heading'] 
                                    for em in exact_matches)}
         
         for idx in top_indices:
             if similarities[idx] > 0.05 and idx not in exact_match_indices:  # Lower threshold for semantic
-                result = self.heading_data[idx].copy()
+                result = headings[idx].copy()
                 result['relevance_score'] = float(similarities[idx])
                 semantic_results.append(result)
         
@@ -111,10 +130,9 @@ class SearchService:
     
     def search_by_level(self, level: str) -> List[Dict[str, Any]]:
         """Get all headings of a specific level"""
-        if not self.heading_data:
-            self._build_search_index()
+        _, _, headings = self._snapshot(not self.heading_data)
         
-        return [h for h in self.heading_data if h['level'] == level]
+        return [h for h in headings if h['level'] == level]
 
 # Create singleton instance
 search_service = SearchService()
\ No newline at end of file
@@ -0,0 +1,168 @@
+import os
+import time
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+from config import settings
+from services.podcast import CacheManager
+
+class StorageJanitor:
+    """
+    Background garbage collection for generated artifacts.
+
+    Audio files that no cached podcast references (fallback WAVs, text transcripts,
+    leftovers of failed or abandoned runs) are removed once older than the max age, or
+    sooner, oldest first, while storage/audio is over its quota. Outline JSON without a
+    matching PDF is removed as well. Files younger than the grace period are never
+    touched, so in-flight generations are safe.
+    """
+    
+    def __init__(self):
+        self.cache_manager = CacheManager()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._sweep_lock = threading.Lock()
+        self.metrics: Dict[str, Any] = {
+            'runs': 0,
+            'last_run': None,
+            'last_duration_ms': 0.0,
+            'files_removed': 0,
+            'bytes_reclaimed': 0,
+            'audio_files_removed': 0,
+            'outlines_removed': 0,
+            'podcasts_evicted': 0,
+            'errors': 0
+        }
+    
+    def start(self) -> None:
+        """Start the periodic sweep thread (no-op when disabled or already running)"""
+        if settings.storage_janitor_interval_minutes <= 0 or (self._thread and self._thread.is_alive()):
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="storage-janitor", daemon=True)
+        self._thread.start()
+        print(f"🧹 Storage janitor started (every {settings.storage_janitor_interval_minutes} min)")
+    
+    def stop(self) -> None:
+        self._stop_event.set()
+    
+    def _run(self) -> None:
+        interval = settings.storage_janitor_interval_minutes * 60
+        # First sweep right away: the disk may already be full from a previous run
+        while not self._stop_event.is_set():
+            try:
+                self.sweep()
+            except Exception as e:
+                self.metrics['errors'] += 1
+                print(f"❌ Storage janitor sweep failed: {e}")
+            self._stop_event.wait(interval)
+    
+    def sweep(self) -> Dict[str, int]:
+        """Run one collection pass; returns what this pass removed"""
+        with self._sweep_lock:
+            start_time = time.time()
+            result = {'audio_files_removed': 0, 'outlines_removed': 0, 'podcasts_evicted': 0, 'bytes_reclaimed': 0}
+            
+            removed, reclaimed = self._sweep_audio(start_time)
+            result['audio_files_removed'] += removed
+            result['bytes_reclaimed'] += reclaimed
+            
+            removed, reclaimed = self._sweep_outlines(start_time)
+            result['outlines_removed'] += removed
+            result['bytes_reclaimed'] += reclaimed
+            
+            # Still over quota with only referenced audio left: evict least recently used podcasts
+            footprint_before = self.cache_manager.audio_footprint()
+            result['podcasts_evicted'] = self.cache_manager.evict_to_budget()
+            result['bytes_reclaimed'] += max(0, footprint_before - self.cache_manager.audio_footprint())
+            
+            self.metrics['runs'] += 1
+            self.metrics['last_run'] = start_time
+            self.metrics['last_duration_ms'] = round((time.time() - start_time) * 1000, 1)
+            self.metrics['files_removed'] += result['audio_files_removed'] + result['outlines_removed']
+            for key, value in result.items():
+                self.metrics[key] += value
+            
+            if any(result.values()):
+                print(f"🧹 Storage janitor reclaimed {result['bytes_reclaimed']:,} bytes "
+                      f"({result['audio_files_removed']} audio, {result['outlines_removed']} outlines, "
+                      f"{result['podcasts_evicted']} podcasts evicted)")
+            return result
+    
+    def _sweep_audio(self, now: float) -> Tuple[int, int]:
+        """Remove unreferenced audio past the max age, then oldest first while over quota"""
+        referenced = self.cache_manager.referenced_audio_files()
+        candidates: List[Tuple[float, int, str]] = []
+        footprint = 0
+        for path, size, mtime in self._list_files(settings.audio_folder):
+            footprint += size
+            if os.path.basename(path) not in referenced:
+                candidates.append((mtime, size, path))
+        
+        max_age = settings.storage_janitor_max_age_hours * 3600
+        grace = settings.storage_janitor_grace_minutes * 60
+        removed = reclaimed = 0
+        for mtime, size, path in sorted(candidates):
+            age = now - mtime
+            expired = age > max_age
+            over_quota = footprint > self.cache_manager.max_audio_bytes
+            if age < grace or not (expired or over_quota):
+                continue
+            if self._remove(path):
+                removed += 1
+                reclaimed += size
+                footprint -= size
+        return removed, reclaimed
+    
+    def _sweep_outlines(self, now: float) -> Tuple[int, int]:
+        """Remove outline JSON whose PDF is gone"""
+        if not os.path.isdir(settings.upload_folder):
+            # Never treat every outline as orphaned because the PDF folder is missing
+            return 0, 0
+        pdf_names = {os.path.splitext(name)[0] for name in os.listdir(settings.upload_folder)}
+        grace = settings.storage_janitor_grace_minutes * 60
+        removed = reclaimed = 0
+        for path, size, mtime in self._list_files(settings.outline_folder):
+            if not path.endswith(".json") or now - mtime < grace:
+                continue
+            if os.path.splitext(os.path.basename(path))[0] in pdf_names:
+                continue
+            if self._remove(path):
+                removed += 1
+                reclaimed += size
+        return removed, reclaimed
+    
+    def _list_files(self, folder: str) -> List[Tuple[str, int, float]]:
+        files = []
+        try:
+            with os.scandir(folder) as entries:
+                for entry in entries:
+                    if entry.is_file():
+                        stat = entry.stat()
+                        files.append((entry.path, stat.st_size, stat.st_mtime))
+        except FileNotFoundError:
+            pass
+        return files
+    
+    def _remove(self, path: str) -> bool:
+        try:
+            os.remove(path)
+            return True
+        except FileNotFoundError:
+            # Removed concurrently (another worker's janitor or a delete request)
+            return False
+        except OSError as e:
+            self.metrics['errors'] += 1
+            print(f"⚠️ Storage janitor could not remove {path}: {e}")
+            return False
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """Counters since process start plus the current audio folder footprint"""
+        return {
+            **self.metrics,
+            'audio_bytes': self.cache_manager.audio_footprint(),
+            'audio_quota_bytes': self.cache_manager.max_audio_bytes,
+            'running': bool(self._thread and self._thread.is_alive())
+        }
+
+# Create singleton instance
+storage_janitor = StorageJanitor()
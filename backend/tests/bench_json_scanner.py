@@ -0,0 +1,83 @@
+"""
+Parse-time microbenchmarks for utils.json_scanner on recorded malformed LLM responses.
+
+Run from the backend directory:  python tests/bench_json_scanner.py [--repeat N]
+
+Reports per-case times for find_json and loads_tolerant over
+fixtures/malformed_llm_responses.json, then the time per character as broken inputs
+are scaled up. The scan and repair are linear, so it stays flat once fragments are past
+TOLERANT_MAX_CHARS; below that cap demjson3 (super-linear) may run, and the last line
+times its worst case.
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.json_scanner import TOLERANT_MAX_CHARS, find_json, loads_tolerant  # noqa: E402
+
+FIXTURES = Path(__file__).parent / "fixtures" / "malformed_llm_responses.json"
+SCALES = (1, 10, 100, 1000)
+
+
+def _per_call_us(func, repeat: int) -> float:
+    """Best-of-5 time per call in microseconds"""
+    return min(timeit.repeat(func, number=repeat, repeat=5)) / repeat * 1e6
+
+
+def bench_cases(cases, repeat: int) -> None:
+    print(f"{'case':36s} {'chars':>6s} {'find_json us':>13s} {'loads_tolerant us':>18s}  ok")
+    for case in cases:
+        text = case["response"]
+        ok = find_json(text) == case["expected"]
+        find_us = _per_call_us(lambda: find_json(text), repeat)
+        loads_us = _per_call_us(lambda: loads_tolerant(text), repeat)
+        print(f"{case['name']:36s} {len(text):6d} {find_us:13.1f} {loads_us:18.1f}  {'yes' if ok else 'NO'}")
+
+
+def _scaled_inputs(cases, scale: int):
+    """Larger broken inputs built from the recorded ones"""
+    by_name = {case["name"]: case["response"] for case in cases}
+    item = by_name["brackets_inside_strings"].split("[", 1)[1].rsplit("]", 1)[0]
+    return {
+        # One long truncated array: the last item is cut mid-string
+        "truncated array": "[" + ", ".join([item] * scale) + ", " + item[:len(item) // 2],
+        # Prose full of unbalanced brackets and no JSON at all (worst case for the old regex scan)
+        "broken prose": "The section {on neural [training is relevant because " * (4 * scale),
+        # Many recorded responses back to back in one message
+        "concatenated responses": "\n".join(by_name.values()) * scale,
+    }
+
+
+def bench_scaling(cases, repeat: int) -> None:
+    print(f"\n{'input':24s} {'scale':>6s} {'chars':>9s} {'find_json ms':>13s} {'ns/char':>8s}")
+    for scale in SCALES:
+        runs = max(1, repeat // scale)
+        for name, text in _scaled_inputs(cases, scale).items():
+            seconds = min(timeit.repeat(lambda: find_json(text), number=runs, repeat=3)) / runs
+            print(f"{name:24s} {scale:6d} {len(text):9d} {seconds * 1e3:13.3f} {seconds / len(text) * 1e9:8.1f}")
+
+    # Worst case for the bounded repair: an unrecoverable fragment just under the demjson3 cap
+    text = ("The section {on neural [training is relevant because " * TOLERANT_MAX_CHARS)[:TOLERANT_MAX_CHARS - 12]
+    seconds = min(timeit.repeat(lambda: find_json(text), number=1, repeat=3))
+    print(f"\nbroken prose at the demjson3 cap ({TOLERANT_MAX_CHARS} chars): {seconds * 1e3:.1f} ms; "
+          f"larger fragments skip demjson3")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200, help="calls per timing sample")
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+    cases = json.loads(FIXTURES.read_text())
+    bench_cases(cases, args.repeat)
+    bench_scaling(cases, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
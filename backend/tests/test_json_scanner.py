@@ -0,0 +1,23 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from utils.json_scanner import JsonArrayStream, find_json
+
+CASES = json.loads((Path(__file__).parent / "fixtures" / "malformed_llm_responses.json").read_text())
+
+
+@pytest.mark.parametrize("case", CASES, ids=[case["name"] for case in CASES])
+def test_recovers_recorded_response(case):
+    assert find_json(case["response"]) == case["expected"]
+
+
+@pytest.mark.parametrize("name", ["fenced_array", "brackets_inside_strings"])
+def test_stream_yields_items_fed_one_character_at_a_time(name):
+    case = next(case for case in CASES if case["name"] == name)
+    stream = JsonArrayStream()
+    items = []
+    for char in case["response"]:
+        items.extend(stream.feed(char))
+    assert items == case["expected"]
@@ -0,0 +1,93 @@
+import pytest
+from config import settings
+from utils.core_llm import LLMClient
+from utils.llm_resilience import CircuitBreaker, LLMResponseError
+
+
+class _FailingBackend:
+    """Backend whose next call raises the given exception (or returns the text/chunks)"""
+
+    def __init__(self, outcome):
+        self.outcome = outcome
+
+    def generate(self, prompt, max_tokens, temperature, system_prompt, response_schema=None):
+        if isinstance(self.outcome, Exception):
+            raise self.outcome
+        return self.outcome
+
+    def generate_stream(self, prompt, max_tokens, temperature, system_prompt):
+        if isinstance(self.outcome, Exception):
+            raise self.outcome
+        yield from self.outcome
+
+
+def _half_open_breaker() -> CircuitBreaker:
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0)
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    return breaker
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(settings, "llm_max_retries", 0)
+    llm_client = LLMClient("tests")
+    llm_client._breaker = _half_open_breaker()
+    monkeypatch.setattr(llm_client, "_apply_rate_limiting", lambda: None)
+    return llm_client
+
+
+def test_half_open_admits_a_single_trial():
+    breaker = _half_open_breaker()
+    trial = breaker.allow_request()
+    assert trial
+    assert not breaker.allow_request()
+    breaker.release_trial(trial)
+    assert breaker.allow_request()
+
+
+def test_call_admitted_while_closed_does_not_release_a_later_trial():
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0)
+    closed_permit = breaker.allow_request()
+    assert closed_permit
+    # Another call trips the breaker and a third takes the half-open trial
+    breaker.record_failure()
+    trial = breaker.allow_request()
+    assert trial
+
+    # The first call ends without a verdict: the trial stays reserved
+    breaker.release_trial(closed_permit)
+    assert not breaker.allow_request()
+    breaker.release_trial(trial)
+    assert breaker.allow_request()
+
+
+def test_non_tripping_failure_in_half_open_releases_the_trial(client):
+    # A blocked Gemini reply surfaces as ValueError and is classified as LLMResponseError
+    client._client = _FailingBackend(ValueError("response was blocked"))
+    with pytest.raises(LLMResponseError):
+        client.generate("prompt")
+
+    assert client._breaker.state == CircuitBreaker.HALF_OPEN
+    client._client = _FailingBackend("ok")
+    assert client.generate("prompt") == "ok"
+    assert client._breaker.state == CircuitBreaker.CLOSED
+
+
+def test_stream_closed_early_records_success(client):
+    # The podcast script stream is closed as soon as the word budget is reached
+    client._client = _FailingBackend(["first ", "second ", "third"])
+    stream = client.generate_stream("prompt")
+    assert next(stream) == "first "
+    stream.close()
+    assert client._breaker.state == CircuitBreaker.CLOSED
+
+
+def test_stream_failure_before_output_keeps_the_breaker_usable(client):
+    client._client = _FailingBackend(ValueError("response was blocked"))
+    with pytest.raises(LLMResponseError):
+        list(client.generate_stream("prompt"))
+
+    client._client = _FailingBackend(["ok"])
+    assert list(client.generate_stream("prompt")) == ["ok"]
+    assert client._breaker.state == CircuitBreaker.CLOSED
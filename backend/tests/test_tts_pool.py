@@ -0,0 +1,53 @@
+import importlib
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+# The package re-exports the create_podcast_audio function under the module's name
+podcast_audio = importlib.import_module("utils.tts_client.create_podcast_audio")
+
+
+class _BrokenPool:
+    def __init__(self):
+        self.shut_down = False
+
+    def submit(self, *args, **kwargs):
+        raise BrokenProcessPool("worker died")
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        self.shut_down = True
+
+
+@pytest.fixture
+def healthy_pool(monkeypatch):
+    pool = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(podcast_audio, "_process_pool", pool)
+    monkeypatch.setattr(podcast_audio, "synthesize_pcm", lambda text, speaker, language: f"{speaker}: {text}")
+    yield pool
+    pool.shutdown()
+
+
+def test_reset_of_a_stale_broken_pool_keeps_the_current_one(healthy_pool):
+    broken = _BrokenPool()
+    podcast_audio._reset_process_pool(broken)
+    assert podcast_audio._process_pool is healthy_pool
+    assert broken.shut_down
+    assert healthy_pool.submit(lambda: "still running").result() == "still running"
+
+
+def test_submit_on_a_broken_pool_retries_on_a_fresh_one(monkeypatch, healthy_pool):
+    broken = _BrokenPool()
+    executors = iter([broken, healthy_pool])
+    monkeypatch.setattr(podcast_audio, "_get_tts_executor", lambda: next(executors))
+    job = podcast_audio._submit_segment({"speaker": "Host", "text": "Hello"}, "en", None)
+    assert job.future.result() == "Host: Hello"
+    assert job.executor is healthy_pool
+    assert broken.shut_down
+
+
+def test_submit_falls_back_in_process_when_the_fresh_pool_breaks_too(monkeypatch, healthy_pool):
+    monkeypatch.setattr(podcast_audio, "_get_tts_executor", _BrokenPool)
+    job = podcast_audio._submit_segment({"speaker": "Guest", "text": "Hi"}, "en", None)
+    assert job.future.result() == "Guest: Hi"
+    assert job.executor is None
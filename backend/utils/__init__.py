@@ -1,18 +1,22 @@
-from .llm_client import chat_with_llm, generate_snippet_summary, generate_insights, generate_podcast_script
+from .llm_client import chat_with_llm, generate_snippet_summary, generate_insights, generate_podcast_script, stream_podcast_script
 from .core_llm import get_llm_client
-from .tts_client import generate_audio, create_podcast_audio
-from .pdf_utils import extract_pdf_info, extract_text_around_heading, get_page_text, generate_pdf_outline
+from .tts_client import generate_audio, create_podcast_audio, stream_podcast_audio, PodcastAudioPipeline
+from .pdf_utils import extract_pdf_info, extract_text_around_heading, get_page_text, generate_pdf_outline, start_pdf_outline
 
 __all__ = [
     "chat_with_llm",
     "generate_snippet_summary",
     "generate_insights",
     "generate_podcast_script",
+    "stream_podcast_script",
     "get_llm_client",
     "generate_audio",
     "create_podcast_audio",
+    "stream_podcast_audio",
+    "PodcastAudioPipeline",
     "extract_pdf_info",
     "extract_text_around_heading",
     "get_page_text",
-    "generate_pdf_outline"
+    "generate_pdf_outline",
+    "start_pdf_outline"
 ]
\ No newline at end of file
@@ -1,24 +1,52 @@
 """
-Core LLM client with rate limiting and error handling
+Core LLM client with rate limiting, retries and circuit breaking over a pluggable backend
 """
 
 import os
+import json
 import time
-from typing import Optional, Dict
+import hashlib
+import threading
+from typing import Optional, Dict, Any, Iterator, Type, TypeVar
+from pydantic import BaseModel, ValidationError
 from config import settings
+from .llm_resilience import (
+    LLMError,
+    LLMNotConfiguredError,
+    LLMResponseError,
+    LLMCircuitOpenError,
+    classify_error,
+    compute_backoff,
+    describe_error,
+    get_circuit_breaker,
+)
+from .single_flight import SingleFlight
+from .llm_backends import GeminiBackend, LocalStubBackend, LOCAL_PROVIDERS
+from .structured_output import to_response_schema
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
 
 # Rate limiting globals - separate for each service
 _last_request_times: Dict[str, float] = {}
 _min_request_interval = 1  # seconds between requests (reduced from 2)
+_rate_limit_lock = threading.Lock()
+
+# Coalesces identical in-flight requests across all services
+_in_flight_requests = SingleFlight()
 
 
 class LLMClient:
-    """Core LLM client with Gemini integration"""
+    """Core LLM client with Gemini (or local stub) integration"""
     
     def __init__(self, service_type: str = "default"):
         self._client = None
         self.service_type = service_type
         self._configure_client()
+        self._breaker = get_circuit_breaker(
+            self._breaker_key(),
+            settings.llm_circuit_failure_threshold,
+            settings.llm_circuit_reset_seconds,
+        )
     
     def _get_api_key_for_service(self) -> Optional[str]:
         """Get the appropriate API key based on service type"""
@@ -31,9 +59,26 @@ class LLMClient:
         else:
             return settings.google_api_key
     
+    def _breaker_key(self) -> str:
+        """Services sharing an API key share quota, so they share a circuit breaker"""
+        if settings.llm_provider.lower() in LOCAL_PROVIDERS:
+            return "local"
+        api_key = self._get_api_key_for_service()
+        if api_key:
+            return "key:" + hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+        return "credentials"
+    
+    def is_available(self) -> bool:
+        """Cheap check callers use to skip straight to local fallbacks"""
+        return self._client is not None and self._breaker.allows_requests()
+    
     def _configure_client(self):
-        """Configure the Gemini client"""
+        """Configure the backend selected by settings.llm_provider"""
         try:
+            if settings.llm_provider.lower() in LOCAL_PROVIDERS:
+                self._client = LocalStubBackend(self.service_type)
+                return
+            
             import google.generativeai as genai
             
             api_key = self._get_api_key_for_service()
@@ -45,7 +90,7 @@ class LLMClient:
             else:
                 raise ValueError(f"No Google API key or credentials found for service: {self.service_type}")
             
-            self._client = genai
+            self._client = GeminiBackend(genai)
             
         except Exception as e:
             print(f"Error configuring LLM client for {self.service_type}: {e}")
@@ -53,77 +98,229 @@ class LLMClient:
     
     def _apply_rate_limiting(self):
         """Apply rate limiting per service to prevent quota exhaustion"""
-        global _last_request_times
+        if isinstance(self._client, LocalStubBackend):
+            # The stub has no quota; its latency model stands in for the real service
+            return
         
-        current_time = time.time()
-        last_request_time = _last_request_times.get(self.service_type, 0)
-        time_since_last = current_time - last_request_time
+        # Reserve the next slot under the lock so concurrent threads queue up instead of all passing
+        with _rate_limit_lock:
+            current_time = time.time()
+            last_request_time = _last_request_times.get(self.service_type, 0)
+            slot = max(current_time, last_request_time + _min_request_interval)
+            _last_request_times[self.service_type] = slot
         
-        if time_since_last < _min_request_interval:
-            wait_time = _min_request_interval - time_since_last
+        wait_time = slot - current_time
+        if wait_time > 0:
             print(f"Rate limiting ({self.service_type}): waiting {wait_time:.1f} seconds...")
             time.sleep(wait_time)
-        
-        _last_request_times[self.service_type] = time.time()
     
     def generate(
         self, 
         prompt: str, 
         max_tokens: int = 8000,  # Increased default limit
         temperature: float = 0.7,
-        system_prompt: Optional[str] = None
+        system_prompt: Optional[str] = None,
+        response_schema: Optional[Dict[str, Any]] = None
     ) -> str:
         """
-        Core generation method with rate limiting and error handling
+        Core generation method with rate limiting, retries and circuit breaking.
+        
+        Raises an LLMError subclass instead of returning error text, so callers
+        can tell model output from failures and pick their local fallback.
+        With response_schema the model is constrained to JSON matching it.
         """
         if not self._client:
-            return f"LLM client not configured properly for service: {self.service_type}."
+            raise LLMNotConfiguredError(
+                f"LLM client not configured properly for service: {self.service_type}",
+                self.service_type
+            )
         
-        self._apply_rate_limiting()
+        # Identical concurrent requests (e.g. the insights panel firing several
+        # endpoints for one selection) share a single in-flight call
+        key = self._request_key(prompt, max_tokens, temperature, system_prompt, response_schema)
+        return _in_flight_requests.do(
+            key,
+            lambda: self._generate_with_retries(prompt, max_tokens, temperature, system_prompt, response_schema)
+        )
+    
+    def generate_structured(
+        self,
+        prompt: str,
+        output_model: Type[ModelT],
+        max_tokens: int = 8000,
+        temperature: float = 0.7,
+        system_prompt: Optional[str] = None
+    ) -> ModelT:
+        """
+        Schema-constrained generation: the response is validated into output_model.
         
+        Output that does not match the schema raises LLMResponseError, so callers
+        take their local fallback instead of re-asking the model.
+        """
+        text = self.generate(
+            prompt=prompt,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            system_prompt=system_prompt,
+            response_schema=to_response_schema(output_model)
+        )
         try:
-            # Remove conservative token limiting - use the requested max_tokens directly
-            actual_tokens = min(max_tokens, 8192)  # Use Gemini's actual limit
-            
-            # Create model with optional system instruction
-            if system_prompt:
-                model = self._client.GenerativeModel(
-                    settings.gemini_model,
-                    system_instruction=system_prompt
+            return output_model.model_validate_json(text)
+        except ValidationError as e:
+            raise LLMResponseError(
+                f"Response for {self.service_type} does not match {output_model.__name__}: "
+                f"{e.error_count()} validation errors",
+                self.service_type
+            ) from e
+    
+    def _request_key(
+        self,
+        prompt: str,
+        max_tokens: int,
+        temperature: float,
+        system_prompt: Optional[str],
+        response_schema: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """Key identifying requests that would produce interchangeable responses"""
+        schema = json.dumps(response_schema, sort_keys=True) if response_schema else ""
+        digest = hashlib.sha256()
+        for part in (self.service_type, settings.gemini_model, str(max_tokens), f"{temperature:.3f}",
+                     system_prompt or "", schema, prompt):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\x00")
+        return digest.hexdigest()
+    
+    def _generate_with_retries(
+        self,
+        prompt: str,
+        max_tokens: int,
+        temperature: float,
+        system_prompt: Optional[str],
+        response_schema: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """Retry loop around a single Gemini request, guarded by the circuit breaker"""
+        attempts = max(0, settings.llm_max_retries) + 1
+        for attempt in range(attempts):
+            permit = self._breaker.allow_request()
+            if not permit:
+                raise LLMCircuitOpenError(
+                    f"Circuit open for {self.service_type}, skipping LLM call",
+                    self.service_type,
+                    retry_after=self._breaker.remaining_open_time()
                 )
-            else:
-                model = self._client.GenerativeModel(settings.gemini_model)
             
-            # Generate content
-            generation_config = self._client.types.GenerationConfig(
-                max_output_tokens=actual_tokens,
-                temperature=temperature,
-            )
+            self._apply_rate_limiting()
             
-            response = model.generate_content(
-                prompt,
-                generation_config=generation_config
+            try:
+                text = self._generate_once(prompt, max_tokens, temperature, system_prompt, response_schema)
+            except Exception as e:
+                time.sleep(self._failure_delay(e, attempt, attempts, permit))
+                continue
+            else:
+                self._breaker.record_success()
+                return text
+            finally:
+                # Never leave this call's half-open trial reserved, whatever ended the attempt
+                self._breaker.release_trial(permit)
+        
+        # Unreachable: the last attempt either returns or raises
+        raise LLMError(f"LLM retries exhausted for {self.service_type}", self.service_type)
+    
+    def generate_stream(
+        self,
+        prompt: str,
+        max_tokens: int = 8000,
+        temperature: float = 0.7,
+        system_prompt: Optional[str] = None
+    ) -> Iterator[str]:
+        """
+        Streaming generation: yields text chunks as the model produces them.
+        
+        Rate limiting and the circuit breaker apply as in generate. Failures are
+        retried only until the first chunk arrives; after that the LLMError is
+        raised to the caller, which already holds the partial output. Streams
+        are not coalesced with identical in-flight requests.
+        """
+        if not self._client:
+            raise LLMNotConfiguredError(
+                f"LLM client not configured properly for service: {self.service_type}",
+                self.service_type
             )
+        
+        attempts = max(0, settings.llm_max_retries) + 1
+        for attempt in range(attempts):
+            permit = self._breaker.allow_request()
+            if not permit:
+                raise LLMCircuitOpenError(
+                    f"Circuit open for {self.service_type}, skipping LLM call",
+                    self.service_type,
+                    retry_after=self._breaker.remaining_open_time()
+                )
             
-            return response.text
+            self._apply_rate_limiting()
             
-        except Exception as e:
-            return self._handle_error(e)
+            started = completed = failed = False
+            try:
+                for chunk in self._client.generate_stream(prompt, max_tokens, temperature, system_prompt):
+                    if chunk:
+                        started = True
+                        yield chunk
+                completed = True
+            except Exception as e:
+                failed = True
+                # Once chunks have been yielded a retry would repeat them, so treat it as the last attempt
+                time.sleep(self._failure_delay(e, attempt, attempt + 1 if started else attempts, permit))
+                continue
+            finally:
+                # Also runs when the consumer closes the stream early (GeneratorExit at the yield):
+                # output means the service worked; otherwise never leave the half-open trial reserved
+                if not failed:
+                    if started or completed:
+                        self._breaker.record_success()
+                    else:
+                        self._breaker.release_trial(permit)
+            return
     
-    def _handle_error(self, error: Exception) -> str:
-        """Handle different types of errors"""
-        error_message = str(error)
-        print(f"Error in LLM generation ({self.service_type}): {error_message}")
-        
-        if "429" in error_message or "quota" in error_message.lower():
-            print(f"⚠️  API quota exceeded for {self.service_type}. Consider using a paid tier or waiting for quota reset.")
-            return f"API quota exceeded for {self.service_type}. Please try again later or upgrade to a paid plan."
-        elif "401" in error_message or "authentication" in error_message.lower():
-            return f"Authentication error for {self.service_type}. Please check your API key."
-        elif "timeout" in error_message.lower():
-            return "Request timeout. Please try again."
+    def _failure_delay(self, exception: Exception, attempt: int, attempts: int, permit: Optional[object]) -> float:
+        """Record a failed attempt; returns the wait before retrying or raises the classified LLMError"""
+        error = classify_error(exception, self.service_type)
+        delay = self._retry_delay(error, attempt, attempts)
+        if error.trips_circuit:
+            # When giving up on a rate limit, keep the circuit open for the advertised window
+            open_for = error.retry_after if delay is None else None
+            self._breaker.record_failure(open_for=open_for)
         else:
-            return f"Unable to generate response at this time for {self.service_type}."
+            # Blocked or off-schema output says nothing about the key: let the next call try
+            self._breaker.release_trial(permit)
+        if delay is None:
+            print(f"Error in LLM generation ({self.service_type}): {error}")
+            raise error from exception
+        print(f"LLM call failed ({self.service_type}, attempt {attempt + 1}/{attempts}): "
+              f"{type(error).__name__}; retrying in {delay:.1f}s")
+        return delay
+    
+    def _retry_delay(self, error: LLMError, attempt: int, attempts: int) -> Optional[float]:
+        """Seconds to wait before the next attempt, or None if the error should be raised"""
+        if not error.retryable or attempt >= attempts - 1:
+            return None
+        delay = compute_backoff(attempt, settings.llm_backoff_base_seconds, settings.llm_backoff_max_seconds)
+        if error.retry_after is not None:
+            if error.retry_after > settings.llm_backoff_max_seconds:
+                # Waiting inline would stall the request; let the caller fall back instead
+                return None
+            delay = max(delay, error.retry_after)
+        return delay
+    
+    def _generate_once(
+        self,
+        prompt: str,
+        max_tokens: int,
+        temperature: float,
+        system_prompt: Optional[str],
+        response_schema: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """Single backend request; exceptions propagate to the retry loop"""
+        return self._client.generate(prompt, max_tokens, temperature, system_prompt, response_schema)
 
 
 # Global client instances for different services
@@ -145,6 +342,10 @@ def chat_with_llm(
     service_type: str = "default"
 ) -> str:
     """
-    Legacy function for backward compatibility with service type support
+    Legacy function for backward compatibility with service type support.
+    Keeps the old contract of returning a readable message on failure.
     """
-    return get_llm_client(service_type).generate(prompt, max_tokens, temperature, system_prompt)
+    try:
+        return get_llm_client(service_type).generate(prompt, max_tokens, temperature, system_prompt)
+    except LLMError as e:
+        return describe_error(e)
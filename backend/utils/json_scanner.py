@@ -0,0 +1,268 @@
+"""
+Linear-time extraction of JSON values embedded in LLM responses
+"""
+import json
+import re
+import logging
+from typing import Any, Callable, Iterator, List, Optional, Tuple
+
+# Optional tolerant JSON parser (slow on large/broken input; only used under a size cap)
+try:
+    import demjson3 as demjson
+except Exception:  # pragma: no cover
+    demjson = None
+
+logger = logging.getLogger(__name__)
+
+# demjson3 is super-linear on broken input; never hand it more than this
+TOLERANT_MAX_CHARS = 8000
+
+_CLOSERS = {"[": "]", "{": "}"}
+_STRUCTURAL_PATTERN = re.compile(r'[\[\]{}"\\]')
+_FENCE_PATTERN = re.compile(r"^\s*```(?:json|JSON)?\s*(.*?)\s*(?:```\s*)?$", re.DOTALL)
+_TRAILING_COMMA_PATTERN = re.compile(r",(\s*[\]}])")
+# A JSON string (possibly unterminated), a bracket, or a Python literal
+_REPAIR_TOKEN_PATTERN = re.compile(r'"(?:[^"\\]|\\.)*(?:"|\\?$)|[\[\]{}]|\b(?:True|False|None)\b', re.DOTALL)
+_PYTHON_LITERALS = {"True": "true", "False": "false", "None": "null"}
+
+
+def strip_code_fence(text: str) -> str:
+    """Remove a surrounding ```json fence if present"""
+    match = _FENCE_PATTERN.match(text or "")
+    return match.group(1) if match else (text or "")
+
+
+def iter_json_spans(text: str, openers: str = "[{") -> Iterator[Tuple[int, int, bool]]:
+    """Yield (start, end, complete) for each top-level bracketed span in one pass.
+
+    Brackets inside JSON strings are ignored. A mismatched closer abandons the current span
+    and scanning continues from that point, so the whole scan stays O(n). A span still open
+    at the end of the text (truncated output) is yielded with complete=False.
+    """
+    stack: List[str] = []
+    start = -1
+    in_string = False
+    escaped_until = -1
+    
+    # Only structural characters matter, so jump between them instead of visiting every char
+    for match in _STRUCTURAL_PATTERN.finditer(text):
+        index = match.start()
+        char = text[index]
+        if not stack:
+            if char in openers:
+                stack.append(_CLOSERS[char])
+                start = index
+            continue
+        
+        if in_string:
+            if index <= escaped_until:
+                continue
+            if char == "\\":
+                escaped_until = index + 1
+            elif char == '"':
+                in_string = False
+            continue
+        
+        if char == '"':
+            in_string = True
+        elif char in "[{":
+            stack.append(_CLOSERS[char])
+        elif char in "]}":
+            if char != stack[-1]:
+                # Unbalanced: drop this span; a new one may start at a later opener
+                stack.clear()
+                continue
+            stack.pop()
+            if not stack:
+                yield start, index + 1, True
+    
+    if stack:
+        yield start, len(text), False
+
+
+class JsonArrayStream:
+    """Incremental parser for a JSON array arriving in chunks (streamed LLM output).
+
+    feed() returns the array's object items completed by the new text, so callers can act
+    on each item while the rest is still being generated. Text before the first ``[``
+    (e.g. a code fence) is skipped, and each chunk is scanned once.
+    """
+    
+    def __init__(self):
+        self._buffer = ""
+        self._position = 0
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escaped_until = -1
+        self._item_start = -1
+    
+    def feed(self, chunk: str) -> List[Any]:
+        self._buffer += chunk
+        items = []
+        for match in _STRUCTURAL_PATTERN.finditer(self._buffer, self._position):
+            index = match.start()
+            char = self._buffer[index]
+            if self._in_string:
+                if index <= self._escaped_until:
+                    continue
+                if char == "\\":
+                    self._escaped_until = index + 1
+                elif char == '"':
+                    self._in_string = False
+                continue
+            
+            if not self._stack:
+                if char == "[":
+                    self._stack.append("]")
+                continue
+            
+            if char == '"':
+                self._in_string = True
+            elif char in "[{":
+                if len(self._stack) == 1 and char == "{":
+                    self._item_start = index
+                self._stack.append(_CLOSERS[char])
+            elif char in "]}":
+                if char != self._stack[-1]:
+                    # Damaged structure: drop the current item and resync on the next one
+                    del self._stack[1:]
+                    self._item_start = -1
+                    continue
+                self._stack.pop()
+                if len(self._stack) == 1 and self._item_start >= 0:
+                    value = loads_tolerant(self._buffer[self._item_start:index + 1])
+                    if value is not None:
+                        items.append(value)
+                    self._item_start = -1
+        
+        # Completed text before the current item is no longer needed
+        keep_from = self._item_start if self._item_start >= 0 else len(self._buffer)
+        self._escaped_until -= keep_from
+        if self._item_start >= 0:
+            self._item_start = 0
+        self._buffer = self._buffer[keep_from:]
+        self._position = len(self._buffer)
+        return items
+
+
+def repair_json(fragment: str) -> str:
+    """Cheap linear fixes for common LLM JSON damage.
+
+    Handles trailing commas, Python literals, smart quotes and truncation (open strings and
+    brackets are closed). Anything else is left for the tolerant parser.
+    """
+    text = fragment.replace("“", '"').replace("”", '"')
+    out: List[str] = []
+    stack: List[str] = []
+    position = 0
+    
+    # Visit only strings, brackets and literals; the text between them is copied as-is
+    for match in _REPAIR_TOKEN_PATTERN.finditer(text):
+        out.append(text[position:match.start()])
+        position = match.end()
+        token = match.group()
+        if token[0] == '"':
+            if len(token) == 1 or token[-1] != '"':
+                # Unterminated string (truncated output): drop a dangling escape and close it
+                token = (token[:-1] if token.endswith("\\") else token) + '"'
+            # Raw newlines are invalid inside JSON strings
+            out.append(token.replace("\n", "\\n"))
+        elif token in _CLOSERS:
+            stack.append(_CLOSERS[token])
+            out.append(token)
+        elif token in "]}":
+            if stack and stack[-1] == token:
+                stack.pop()
+            out.append(token)
+        else:
+            # Python-style literals outside strings
+            out.append(_PYTHON_LITERALS[token])
+    out.append(text[position:])
+    
+    repaired = "".join(out).rstrip()
+    # A truncated value usually ends mid-pair; drop the dangling separator before closing
+    while repaired and repaired[-1] in ",:":
+        repaired = repaired[:-1].rstrip()
+    repaired += "".join(reversed(stack))
+    return _TRAILING_COMMA_PATTERN.sub(r"\1", repaired)
+
+
+def loads_tolerant(fragment: str, allow_repair: bool = True) -> Optional[Any]:
+    """Strict json first, then a bounded repair, then demjson3 for small inputs only"""
+    try:
+        return json.loads(fragment)
+    except (ValueError, TypeError):
+        pass
+    
+    if not allow_repair:
+        return None
+    
+    try:
+        return json.loads(repair_json(fragment), strict=False)
+    except (ValueError, TypeError):
+        pass
+    
+    if demjson is not None and len(fragment) <= TOLERANT_MAX_CHARS:
+        try:
+            return demjson.decode(fragment, strict=False)
+        except Exception:
+            logger.debug("json_scanner: demjson3 could not decode fragment")
+    return None
+
+
+def _salvage(fragment: str, complete: bool, openers: str, depth: int) -> Optional[Any]:
+    """Recover the intact values nested in an unparseable span (bounded recursion depth)"""
+    inner = fragment[1:-1] if complete else fragment[1:]
+    recovered = []
+    for start, end, inner_complete in iter_json_spans(inner, openers):
+        value = loads_tolerant(inner[start:end])
+        if value is None and depth > 0:
+            value = _salvage(inner[start:end], inner_complete, openers, depth - 1)
+        if value is not None:
+            recovered.append(value)
+    if not recovered:
+        return None
+    if fragment[0] == "[" or len(recovered) > 1:
+        return recovered
+    return recovered[0]
+
+
+def extract_json_values(text: str, openers: str = "[{", salvage: bool = True) -> Iterator[Any]:
+    """Yield JSON values found in ``text`` in order of appearance.
+
+    The whole (fence-stripped) text is tried strictly first. Then each top-level span is tried
+    strictly, then repaired. When a span cannot be recovered and ``salvage`` is set, the intact
+    values nested inside it are returned instead (e.g. the complete objects of a truncated array).
+    """
+    text = strip_code_fence((text or "").strip())
+    if not text:
+        return
+    
+    try:
+        yield json.loads(text)
+        return
+    except ValueError:
+        pass
+    
+    for start, end, complete in iter_json_spans(text, openers):
+        fragment = text[start:end]
+        value = loads_tolerant(fragment)
+        if value is None and salvage and end - start > 2:
+            value = _salvage(fragment, complete, openers, depth=1)
+        if value is not None:
+            yield value
+
+
+def find_json(text: str, predicate: Optional[Callable[[Any], bool]] = None, openers: str = "[{") -> Optional[Any]:
+    """First embedded JSON value accepted by ``predicate`` (any value when omitted)"""
+    for value in extract_json_values(text, openers):
+        if predicate is None or predicate(value):
+            return value
+    return None
+
+
+def first_json_span(text: str, openers: str = "{") -> Optional[str]:
+    """Raw text of the first top-level span starting with one of ``openers``"""
+    for start, end, complete in iter_json_spans(text or "", openers):
+        return text[start:end]
+    return None
@@ -0,0 +1,380 @@
+"""
+Pluggable LLM backends used by LLMClient, selected through settings.llm_provider:
+- "gemini" (default): Google Gemini via google.generativeai
+- "local" / "stub": deterministic offline stand-in for benchmarks and load tests
+"""
+
+import re
+import json
+import time
+import random
+import hashlib
+import threading
+from typing import Optional, Dict, Any, Iterator, List, Tuple
+
+from config import settings
+
+LOCAL_PROVIDERS = {"local", "stub"}
+
+
+class GeminiBackend:
+    """Single-request Gemini backend; retries and breaking live in LLMClient"""
+    
+    name = "gemini"
+    
+    def __init__(self, genai):
+        self._genai = genai
+    
+    def generate(
+        self,
+        prompt: str,
+        max_tokens: int,
+        temperature: float,
+        system_prompt: Optional[str] = None,
+        response_schema: Optional[Dict[str, Any]] = None
+    ) -> str:
+        response = self._generate_content(prompt, max_tokens, temperature, system_prompt, response_schema)
+        return response.text
+    
+    def generate_stream(
+        self,
+        prompt: str,
+        max_tokens: int,
+        temperature: float,
+        system_prompt: Optional[str] = None
+    ) -> Iterator[str]:
+        """Text chunks as Gemini produces them"""
+        response = self._generate_content(prompt, max_tokens, temperature, system_prompt, stream=True)
+        for chunk in response:
+            # Chunks without text parts (e.g. safety or finish metadata) raise on .text
+            if chunk.parts:
+                yield chunk.text
+    
+    def _generate_content(
+        self,
+        prompt: str,
+        max_tokens: int,
+        temperature: float,
+        system_prompt: Optional[str] = None,
+        response_schema: Optional[Dict[str, Any]] = None,
+        stream: bool = False
+    ):
+        # Remove conservative token limiting - use the requested max_tokens directly
+        actual_tokens = min(max_tokens, 8192)  # Use Gemini's actual limit
+        
+        # Create model with optional system instruction
+        if system_prompt:
+            model = self._genai.GenerativeModel(
+                settings.gemini_model,
+                system_instruction=system_prompt
+            )
+        else:
+            model = self._genai.GenerativeModel(settings.gemini_model)
+        
+        # Generate content
+        config_kwargs = {}
+        if response_schema:
+            # Structured output: Gemini returns JSON constrained to the schema
+            config_kwargs = {"response_mime_type": "application/json", "response_schema": response_schema}
+        generation_config = self._genai.types.GenerationConfig(
+            max_output_tokens=actual_tokens,
+            temperature=temperature,
+            **config_kwargs
+        )
+        
+        return model.generate_content(
+            prompt,
+            generation_config=generation_config,
+            stream=stream,
+            request_options={"timeout": settings.llm_request_timeout}
+        )
+
+
+class ResourceExhausted(Exception):
+    """Injected quota failure (same class name as the google.api_core error)"""
+
+
+class ServiceUnavailable(Exception):
+    """Injected transient server failure"""
+
+
+class LocalStubBackend:
+    """
+    Deterministic offline LLM stand-in.
+
+    Output depends only on the prompts and schema, so identical requests give
+    identical responses. Latency (normal distribution, ms) and injected
+    failures come from one seeded sequence, so a load-test run is reproducible.
+    JSON is shaped after the response_schema when given, otherwise after the
+    example JSON embedded in the system prompt, with document names, headings
+    and pages taken from the library context in the prompt.
+    """
+    
+    name = "local"
+    
+    _DOC_PATTERN = re.compile(r'^---\s*(.+?)\s*---\s*$', re.MULTILINE)
+    _HEADING_PATTERN = re.compile(r'^\s*-\s+(.+?)(?:\s+\(p\.(\d+)\))?\s*$')
+    _SELECTED_PATTERN = re.compile(r'(?:selected text|content)[^:\n]*:\s*"([^"]+)"', re.IGNORECASE)
+    _SELECTED_LINE_PATTERN = re.compile(r'^selected text:\s*(.+)$', re.IGNORECASE | re.MULTILINE)
+    _TOPIC_PATTERN = re.compile(r'(?:about|discuss):\s*(.+)', re.IGNORECASE)
+    _EXCLUDE_PATTERN = re.compile(r"NOT\s+'([^']+)'")
+    _COUNT_PATTERN = re.compile(r'exactly\s+(\d+)\s+(?:\w+\s+){0,2}objects', re.IGNORECASE)
+    _EXCHANGES_PATTERN = re.compile(r'TARGET EXCHANGES:\s*(\d+)', re.IGNORECASE)
+    _TYPES_PATTERN = re.compile(r'types must be:\s*([a-z_,\s]+)', re.IGNORECASE)
+    _WORD_PATTERN = re.compile(r"[A-Za-z][A-Za-z'-]{3,}")
+    
+    # Streaming: share of the latency before the first chunk, and chunk size
+    _FIRST_CHUNK_SHARE = 0.2
+    _STREAM_CHUNK_CHARS = 64
+    
+    # Example values kept verbatim: they are categorical, not free text
+    _CATEGORICAL_KEYS = {"type", "strength", "speaker", "novelty_factor"}
+    _DOCUMENT_KEYS = {"document", "pdf_name", "relevant_document"}
+    _TITLE_KEYS = {"title", "heading"}
+    _PAGE_KEYS = {"pages", "page", "page_number"}
+    
+    def __init__(self, service_type: str = "default"):
+        self.service_type = service_type
+        self._rng = random.Random(settings.llm_stub_seed)
+        self._rng_lock = threading.Lock()
+    
+    def generate(
+        self,
+        prompt: str,
+        max_tokens: int,
+        temperature: float,
+        system_prompt: Optional[str] = None,
+        response_schema: Optional[Dict[str, Any]] = None
+    ) -> str:
+        latency_ms, failure = self._draw_outcome()
+        time.sleep(latency_ms / 1000.0)
+        if failure:
+            raise failure
+        return self._respond(prompt, max_tokens, system_prompt, response_schema)
+    
+    def generate_stream(
+        self,
+        prompt: str,
+        max_tokens: int,
+        temperature: float,
+        system_prompt: Optional[str] = None
+    ) -> Iterator[str]:
+        """Same text as generate, in chunks spread over the latency after a first-chunk delay"""
+        latency_ms, failure = self._draw_outcome()
+        time.sleep(latency_ms * self._FIRST_CHUNK_SHARE / 1000.0)
+        if failure:
+            raise failure
+        
+        text = self._respond(prompt, max_tokens, system_prompt)
+        chunks = [text[i:i + self._STREAM_CHUNK_CHARS] for i in range(0, len(text), self._STREAM_CHUNK_CHARS)]
+        chunk_delay = latency_ms * (1 - self._FIRST_CHUNK_SHARE) / 1000.0 / max(1, len(chunks))
+        for chunk in chunks:
+            yield chunk
+            time.sleep(chunk_delay)
+    
+    def _draw_outcome(self) -> Tuple[float, Optional[Exception]]:
+        """Latency (ms) and injected failure for the next request, from the seeded sequence"""
+        with self._rng_lock:
+            latency_ms = max(0.0, self._rng.gauss(settings.llm_stub_latency_mean_ms,
+                                                   settings.llm_stub_latency_stddev_ms))
+            fail_roll = self._rng.random()
+            fail_kind = self._rng.randrange(3)
+        
+        if fail_roll >= settings.llm_stub_failure_rate:
+            return latency_ms, None
+        if fail_kind == 0:
+            return latency_ms, ResourceExhausted("429 Resource has been exhausted (e.g. check quota). Please retry in 1s.")
+        if fail_kind == 1:
+            return latency_ms, TimeoutError("Stub request timed out")
+        return latency_ms, ServiceUnavailable("503 The model is overloaded. Please try again later.")
+    
+    def _respond(
+        self,
+        prompt: str,
+        max_tokens: int,
+        system_prompt: Optional[str] = None,
+        response_schema: Optional[Dict[str, Any]] = None
+    ) -> str:
+        system_prompt = system_prompt or ""
+        seed = hashlib.sha256(f"{settings.llm_stub_seed}\x00{system_prompt}\x00{prompt}".encode("utf-8")).hexdigest()
+        rng = random.Random(int(seed[:16], 16))
+        library = self._parse_library(prompt)
+        topic = self._selected_text(prompt)
+        
+        if response_schema:
+            return json.dumps(self._from_schema(response_schema, rng, library, topic, key=None))
+        
+        example = self._find_json_example(system_prompt) or self._find_json_example(prompt)
+        if example is not None:
+            shaped = self._from_example(example, rng, library, topic, system_prompt + "\n" + prompt)
+            return json.dumps(shaped, ensure_ascii=False)
+        
+        return self._plain_text(topic, rng, max_tokens)
+    
+    # ---- prompt inspection -------------------------------------------------
+    
+    def _parse_library(self, prompt: str) -> List[Tuple[str, List[Tuple[str, int]]]]:
+        """Documents and (heading, page) pairs listed in the outline context"""
+        library = []
+        current = None
+        for line in prompt.splitlines():
+            if not line.strip():
+                # Outline blocks are contiguous; a blank line ends the current document
+                current = None
+                continue
+            doc_match = self._DOC_PATTERN.match(line)
+            if doc_match:
+                current = (doc_match.group(1), [])
+                library.append(current)
+                continue
+            if current is None:
+                continue
+            heading_match = self._HEADING_PATTERN.match(line)
+            if heading_match:
+                page = int(heading_match.group(2)) if heading_match.group(2) else len(current[1]) + 1
+                current[1].append((heading_match.group(1), page))
+        return library
+    
+    def _selected_text(self, prompt: str) -> str:
+        match = (self._SELECTED_PATTERN.search(prompt)
+                 or self._SELECTED_LINE_PATTERN.search(prompt)
+                 or self._TOPIC_PATTERN.search(prompt))
+        if match:
+            return match.group(1).strip()
+        return prompt[-300:].strip()
+    
+    def _find_json_example(self, text: str):
+        """First embedded JSON object / array of objects (placeholders such as [X] are tolerated)"""
+        if not text:
+            return None
+        cleaned = re.sub(r'\[\s*X\s*\]', '[1]', text)
+        decoder = json.JSONDecoder()
+        for match in re.finditer(r'[\[{]', cleaned):
+            try:
+                value, _ = decoder.raw_decode(cleaned, match.start())
+            except ValueError:
+                continue
+            # Only structured examples count; stray lists like [3] in prose are skipped
+            if isinstance(value, dict) and value:
+                return value
+            if isinstance(value, list) and any(isinstance(item, dict) for item in value):
+                return value
+        return None
+    
+    # ---- synthesis ---------------------------------------------------------
+    
+    def _sentence(self, rng: random.Random, topic: str, key: Optional[str]) -> str:
+        words = self._WORD_PATTERN.findall(topic) or ["the", "selected", "content"]
+        picked = [words[rng.randrange(len(words))] for _ in range(min(6, len(words)))]
+        label = (key or "point").replace("_", " ")
+        return f"{label.capitalize()}: {' '.join(picked)} relates to the broader document library."
+    
+    def _pick_document(self, rng: random.Random, library, index: int) -> Tuple[str, List[Tuple[str, int]]]:
+        if not library:
+            return ("Document.pdf", [("Overview", 1)])
+        return library[(index + rng.randrange(len(library))) % len(library)]
+    
+    def _from_schema(self, schema: Dict[str, Any], rng: random.Random, library, topic: str, key: Optional[str], index: int = 0):
+        schema_type = str(schema.get("type", "string")).lower()
+        if "enum" in schema:
+            return schema["enum"][rng.randrange(len(schema["enum"]))]
+        if schema_type == "object":
+            return {
+                prop: self._from_schema(sub, rng, library, topic, prop, index)
+                for prop, sub in schema.get("properties", {}).items()
+            }
+        if schema_type == "array":
+            count = max(schema.get("minItems", 3), 3)
+            return [self._from_schema(schema.get("items", {}), rng, library, topic, key, i) for i in range(count)]
+        if schema_type == "integer":
+            if key in self._PAGE_KEYS:
+                doc = self._pick_document(rng, library, index)
+                return doc[1][rng.randrange(len(doc[1]))][1] if doc[1] else 1
+            return rng.randint(1, 5)
+        if schema_type == "number":
+            return round(rng.uniform(0.6, 0.95), 2)
+        if schema_type == "boolean":
+            return rng.random() < 0.5
+        if key in self._DOCUMENT_KEYS:
+            return self._pick_document(rng, library, index)[0]
+        if key in self._TITLE_KEYS:
+            doc = self._pick_document(rng, library, index)
+            return doc[1][rng.randrange(len(doc[1]))][0] if doc[1] else doc[0]
+        return self._sentence(rng, topic, key)
+    
+    def _from_example(self, example, rng: random.Random, library, topic: str, prompt_text: str):
+        if isinstance(example, dict):
+            return self._fill_object(example, rng, library, topic, 0, None)
+        
+        items = [item for item in example if isinstance(item, dict)]
+        if not items:
+            return [self._sentence(rng, topic, None) for _ in example]
+        
+        count = len(items)
+        exchanges = self._EXCHANGES_PATTERN.search(prompt_text)
+        counted = self._COUNT_PATTERN.search(prompt_text)
+        if "speaker" in items[0] and exchanges:
+            count = int(exchanges.group(1))
+        elif counted:
+            count = int(counted.group(1))
+        
+        types = None
+        types_match = self._TYPES_PATTERN.search(prompt_text)
+        if types_match and "type" in items[0]:
+            types = [t.strip() for t in types_match.group(1).split(",") if t.strip()]
+            count = len(types)
+        
+        # Distinct documents across items, like the real model is asked to produce;
+        # documents the prompt excludes ("NOT 'x.pdf'") go last
+        excluded = set(self._EXCLUDE_PATTERN.findall(prompt_text))
+        doc_order = list(range(len(library)))
+        rng.shuffle(doc_order)
+        doc_order.sort(key=lambda idx: library[idx][0] in excluded)
+        result = []
+        for i in range(count):
+            template = items[i % len(items)]
+            doc = library[doc_order[i % len(doc_order)]] if library else None
+            filled = self._fill_object(template, rng, library, topic, i, doc)
+            if types:
+                filled["type"] = types[i]
+            result.append(filled)
+        return result
+    
+    def _fill_object(self, template: Dict[str, Any], rng: random.Random, library, topic: str,
+                     index: int, doc: Optional[Tuple[str, List[Tuple[str, int]]]]):
+        doc = doc or self._pick_document(rng, library, index)
+        heading, page = doc[1][rng.randrange(len(doc[1]))] if doc[1] else (doc[0], 1)
+        filled = {}
+        for key, value in template.items():
+            if isinstance(value, dict):
+                filled[key] = self._fill_object(value, rng, library, topic, index, doc)
+            elif isinstance(value, list):
+                if key in self._PAGE_KEYS:
+                    filled[key] = [page]
+                else:
+                    filled[key] = [self._sentence(rng, topic, key) for _ in value]
+            elif key in self._CATEGORICAL_KEYS:
+                filled[key] = value
+            elif key in self._DOCUMENT_KEYS:
+                filled[key] = value if value == "SOURCE_DOCUMENT" else doc[0]
+            elif key in self._TITLE_KEYS:
+                filled[key] = heading
+            elif key in self._PAGE_KEYS:
+                filled[key] = page
+            elif isinstance(value, bool):
+                filled[key] = rng.random() < 0.5
+            elif isinstance(value, int):
+                filled[key] = rng.randint(1, 5)
+            elif isinstance(value, float):
+                filled[key] = round(rng.uniform(0.6, 0.95), 2)
+            else:
+                filled[key] = self._sentence(rng, topic, key)
+        return filled
+    
+    def _plain_text(self, topic: str, rng: random.Random, max_tokens: int) -> str:
+        """Extractive plain-text answer for summary-style prompts"""
+        sentences = [s.strip() for s in re.split(r'(?<=[.!?])\s+', topic) if s.strip()]
+        if not sentences:
+            sentences = [self._sentence(rng, topic, "summary")]
+        text = " ".join(sentences[:3])
+        return text[:max(40, max_tokens * 4)]
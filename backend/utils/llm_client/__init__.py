@@ -10,7 +10,7 @@ from ..core_llm import chat_with_llm, get_llm_client  # noqa: F401
 from ..task_modules import summary_generator, insight_analyzer, content_generator  # noqa: F401
 
 # Re-export functions from submodules to keep the same API
-from .context import get_all_pdf_outlines, format_outlines_for_context  # noqa: F401
+from .context import get_all_pdf_outlines, format_outlines_for_context, get_library_context  # noqa: F401
 from .summaries import generate_snippet_summary, generate_executive_summary  # noqa: F401
 from .insights import (
     generate_insights_multi_call,
@@ -23,7 +23,7 @@ from .parsing import (  # noqa: F401
     _extract_insights_from_text,
     _generate_minimal_insights_from_context,
 )
-from .content import generate_podcast_script  # noqa: F401
+from .content import generate_podcast_script, stream_podcast_script  # noqa: F401
 from .analysis import (
     analyze_document_structure,
     extract_key_concepts,
@@ -44,6 +44,7 @@ def get_task_modules_info() -> Dict[str, List[str]]:
         ],
         "content_tasks": [
             "generate_podcast_script",
+            "stream_podcast_script",
         ],
         "analysis_tasks": [
             "analyze_document_structure",
@@ -4,13 +4,14 @@ Specialized analysis tasks: structure analysis, concept extraction, document com
 from typing import Dict, Any, List
 
 from ..core_llm import get_llm_client
+from ..llm_resilience import LLMError, describe_error
 from .context import format_outlines_for_context, get_all_pdf_outlines
 
 
 def analyze_document_structure(content: str) -> Dict[str, Any]:
-    """Analyze document structure and provide insights"""
+    """Analyze document structure and provide insights (the analysis is a readable message on LLM failure)"""
     pdf_context = get_all_pdf_outlines()
-    context_str = format_outlines_for_context(pdf_context)
+    context_str = format_outlines_for_context(pdf_context, content[:1000])
     
     system_prompt = """You are a document structure analyst with access to a document library. Analyze the given content and provide insights about its organization, key themes, and structural elements while considering how it fits within the broader context of available documents. Focus on how the content is organized and what patterns emerge in relation to the document library. Always respond in plain text format - no markdown, bullets, or special formatting."""
     
@@ -22,12 +23,15 @@ Analyze the structure and organization of this document content, considering how
 {content[:1000]}..."""
     
     client = get_llm_client()
-    response = client.generate(
-        prompt=user_prompt,
-        max_tokens=1000,  # Increased for complete document analysis
-        temperature=0.6,
-        system_prompt=system_prompt
-    )
+    try:
+        response = client.generate(
+            prompt=user_prompt,
+            max_tokens=1000,  # Increased for complete document analysis
+            temperature=0.6,
+            system_prompt=system_prompt
+        )
+    except LLMError as e:
+        response = describe_error(e)
     
     return {
         "analysis": response,
@@ -37,9 +41,9 @@ Analyze the structure and organization of this document content, considering how
 
 
 def extract_key_concepts(content: str) -> List[str]:
-    """Extract key concepts and terms from content"""
+    """Extract key concepts and terms from content (["Unable to extract concepts"] on LLM failure)"""
     pdf_context = get_all_pdf_outlines()
-    context_str = format_outlines_for_context(pdf_context)
+    context_str = format_outlines_for_context(pdf_context, content[:800])
     
     system_prompt = """You are a concept extraction specialist with access to a document library. Identify the most important concepts, terms, and keywords from the given content while considering the broader context of available documents. Focus on technical terms, important ideas, and key concepts that define the content in relation to the document library. Return only the concepts as a comma-separated list in plain text format."""
     
@@ -51,12 +55,15 @@ Extract key concepts from this content, considering how they relate to the avail
 {content[:800]}..."""
     
     client = get_llm_client()
-    response = client.generate(
-        prompt=user_prompt,
-        max_tokens=500,  # Increased for complete concept extraction
-        temperature=0.4,
-        system_prompt=system_prompt
-    )
+    try:
+        response = client.generate(
+            prompt=user_prompt,
+            max_tokens=500,  # Increased for complete concept extraction
+            temperature=0.4,
+            system_prompt=system_prompt
+        )
+    except LLMError:
+        return ["Unable to extract concepts"]
     
     # Parse comma-separated concepts
     try:
@@ -67,9 +74,9 @@ Extract key concepts from this content, considering how they relate to the avail
 
 
 def compare_documents(doc1_content: str, doc2_content: str) -> Dict[str, str]:
-    """Compare two documents and find similarities/differences"""
+    """Compare two documents and find similarities/differences (the comparison is a readable message on LLM failure)"""
     pdf_context = get_all_pdf_outlines()
-    context_str = format_outlines_for_context(pdf_context)
+    context_str = format_outlines_for_context(pdf_context, f"{doc1_content[:400]} {doc2_content[:400]}")
     
     system_prompt = """You are a document comparison specialist with access to a document library. Compare two documents and identify their similarities, differences, and relationships while considering the broader context of available documents. Focus on content themes, approaches, and key insights in relation to the document library. Be concise and objective. Always respond in plain text format - no markdown, bullets, or special formatting."""
     
@@ -85,12 +92,15 @@ Document 2:
 {doc2_content[:400]}..."""
     
     client = get_llm_client()
-    response = client.generate(
-        prompt=user_prompt,
-        max_tokens=1000,  # Increased for complete document comparison
-        temperature=0.6,
-        system_prompt=system_prompt
-    )
+    try:
+        response = client.generate(
+            prompt=user_prompt,
+            max_tokens=1000,  # Increased for complete document comparison
+            temperature=0.6,
+            system_prompt=system_prompt
+        )
+    except LLMError as e:
+        response = describe_error(e)
     
     return {
         "comparison": response,
@@ -1,7 +1,7 @@
 """
 Content generation tasks (podcast script)
 """
-from typing import Dict, Any, List
+from typing import Callable, Dict, Any, List, Optional
 
 from ..task_modules import content_generator
 
@@ -9,3 +9,9 @@ from ..task_modules import content_generator
 def generate_podcast_script(selected_text: str, insights: List[Dict], format: str = "podcast", max_duration_minutes: float = 4.5, language: str = "en") -> List[Dict]:
     """Generate podcast script or audio overview using insights with time constraints and language"""
     return content_generator.generate_podcast_script(selected_text, insights, format, max_duration_minutes, language)
+
+
+def stream_podcast_script(selected_text: str, insights: List[Dict], format: str = "podcast", max_duration_minutes: float = 4.5, language: str = "en",
+                          on_segment: Optional[Callable[[Dict[str, str]], None]] = None) -> List[Dict]:
+    """Generate the script with the LLM response streamed; each turn goes to on_segment as soon as it is parsed"""
+    return content_generator.stream_podcast_script(selected_text, insights, format, max_duration_minutes, language, on_segment)
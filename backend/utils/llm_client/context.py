@@ -1,7 +1,21 @@
 """
 Context helpers: outlines and formatting for LLM prompts
 """
-from typing import Dict, Any, List
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional
+
+from ..prompt_budget import build_outline_context
+from ..single_flight import SingleFlight
+
+# Per-selection library context shared by the insight endpoints fired together by the panel
+LIBRARY_CONTEXT_TTL_SECONDS = 30.0
+LIBRARY_CONTEXT_MAX_ENTRIES = 64
+_library_context_cache: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (stored_at, context)
+_library_context_lock = threading.Lock()
+_library_context_flight = SingleFlight()
 
 
 def get_all_pdf_outlines() -> List[Dict[str, Any]]:
@@ -31,39 +45,49 @@ def get_all_pdf_outlines() -> List[Dict[str, Any]]:
         return []
 
 
-def format_outlines_for_context(outlines: List[Dict[str, Any]]) -> str:
-    """Format PDF outlines for inclusion in LLM prompts"""
+def format_outlines_for_context(outlines: List[Dict[str, Any]], selected_text: str = "",
+                                token_budget: Optional[int] = None) -> str:
+    """Format PDF outlines for inclusion in LLM prompts, keeping the headings most relevant to the selection within the token budget"""
     if not outlines:
         return "No PDF documents have been uploaded yet."
     
-    context_parts = []
-    context_parts.append("AVAILABLE DOCUMENTS AND THEIR STRUCTURE:")
+    return build_outline_context(
+        outlines,
+        query=selected_text,
+        token_budget=token_budget,
+        header_lines=["AVAILABLE DOCUMENTS AND THEIR STRUCTURE:"]
+    )
+
+
+def get_library_context(selected_text: str = "") -> str:
+    """
+    Budgeted library context for a selection, built once and shared.
+    Concurrent callers for the same selection wait on a single build; the
+    result is reused for a short TTL and keyed on the current document set.
+    """
+    try:
+        from services.document_service import document_service
+        doc_ids = sorted(doc.id for doc in document_service.get_all_documents())
+    except Exception:
+        doc_ids = []
     
-    for outline in outlines:
-        context_parts.append(f"\n--- {outline['pdf_name']} ---")
-        context_parts.append(f"Summary: {outline['summary']}")
-        
-        # Add outline structure
-        outline_items = outline.get('outline', [])
-        if outline_items:
-            context_parts.append("Document Structure:")
-            for i, item in enumerate(outline_items):
-                if i >= 10:  # Limit to first 10 items to conserve tokens
-                    break
-                level = item.get('level', 'H1')
-                heading = item.get('text', item.get('heading', 'Unknown'))  # Try 'text' first, then 'heading'
-                try:
-                    # Handle both numeric and string levels
-                    if isinstance(level, str):
-                        if level.lower().startswith('h'):
-                            level_num = int(level[1:]) if level[1:].isdigit() else 1
-                        else:
-                            level_num = 1
-                    else:
-                        level_num = int(level) if level else 1
-                    indent = "  " * max(0, level_num - 1)
-                except (ValueError, TypeError):
-                    indent = ""
-                context_parts.append(f"{indent}- {heading}")
+    digest = hashlib.sha256(selected_text.strip().encode("utf-8"))
+    digest.update("|".join(doc_ids).encode("utf-8"))
+    key = digest.hexdigest()
+    
+    with _library_context_lock:
+        entry = _library_context_cache.get(key)
+        if entry and time.time() - entry[0] < LIBRARY_CONTEXT_TTL_SECONDS:
+            _library_context_cache.move_to_end(key)
+            return entry[1]
+    
+    def build() -> str:
+        context = format_outlines_for_context(get_all_pdf_outlines(), selected_text)
+        with _library_context_lock:
+            _library_context_cache[key] = (time.time(), context)
+            _library_context_cache.move_to_end(key)
+            while len(_library_context_cache) > LIBRARY_CONTEXT_MAX_ENTRIES:
+                _library_context_cache.popitem(last=False)
+        return context
     
-    return "\n".join(context_parts)
+    return _library_context_flight.do(key, build)
@@ -4,7 +4,9 @@ Insights generation: batching, parsing, validation, and fallbacks
 from typing import Dict, Any, List
 
 from ..core_llm import get_llm_client
-from .context import format_outlines_for_context, get_all_pdf_outlines
+from ..llm_resilience import LLMError
+from models import insights_output_for
+from .context import get_library_context
 from ..task_modules import insight_analyzer
 
 
@@ -41,7 +43,7 @@ def generate_insights_multi_call(selected_text: str, related_sections: List[Dict
             })
     
     all_insights = []
-    pdf_context = format_outlines_for_context(get_all_pdf_outlines())
+    pdf_context = get_library_context(selected_text)
     
     # Process each batch with focused LLM calls
     for batch_idx, batch in enumerate(filtered_batches):
@@ -158,20 +160,29 @@ REQUIREMENTS:
 - Make insights informative and evidence-based
 - Include specific details, not generic statements
 
-Return only the JSON array:"""
+Return the JSON object with the insights array:"""
     
     client = get_llm_client()
-    response = client.generate(
-        prompt=user_prompt,
-        max_tokens=2000,  # Smaller token limit for focused responses
-        temperature=0.7,
-        system_prompt=system_prompt
-    )
+    try:
+        # Schema-constrained output (type enum narrowed to this batch), validated in one load
+        output = client.generate_structured(
+            prompt=user_prompt,
+            output_model=insights_output_for(tuple(insight_types)),
+            max_tokens=2000,  # Smaller token limit for focused responses
+            temperature=0.7,
+            system_prompt=system_prompt
+        )
+    except LLMError as e:
+        print(f"⚠️ LLM unavailable for batch '{batch_description}' ({type(e).__name__}), using fallback insights")
+        return [_generate_fallback_insight(insight_type, selected_text, related_sections) for insight_type in insight_types]
     
-    # Parse the response with robust handling
-    parsed_insights = _parse_batch_response(response, insight_types, selected_text, related_sections)
+    validated = _validate_batch_insights([insight.model_dump() for insight in output.insights], insight_types, related_sections)
+    if not validated:
+        print(f"⚠️ No usable insights in batch '{batch_description}', using fallback insights")
+        return [_generate_fallback_insight(insight_type, selected_text, related_sections) for insight_type in insight_types]
     
-    return parsed_insights
+    print(f"✅ Batch '{batch_description}': {len(validated)} structured insights")
+    return validated
 
 
 def _get_focused_system_prompt(focus: str, insight_types: List[str], batch_description: str) -> str:
@@ -180,16 +191,14 @@ def _get_focused_system_prompt(focus: str, insight_types: List[str], batch_descr
     base_prompt = f"""You are a specialized document analysis expert focusing on {batch_description}. 
 
 CRITICAL RESPONSE REQUIREMENTS:
-1. Return ONLY a valid JSON array
-2. Array must contain exactly {len(insight_types)} objects  
+1. Return a JSON object with an "insights" array
+2. The array must contain exactly {len(insight_types)} objects  
 3. Each object must have: "type", "content", "relevant_document", "page_number", "relevance_score"
 4. types must be: {', '.join(insight_types)}
 5. content must be concise but informative (150-250 characters MAX)
 6. relevant_document must be a specific document name from the provided context
 7. page_number must be a specific page number where the insight is most relevant
-8. relevance_score must be between 0.0 and 1.0
-9. NO markdown, NO explanations, NO code blocks
-10. Start response with [ and end with ]"""
+8. relevance_score must be between 0.0 and 1.0"""
 
     if focus == "practical_analysis":
         focused_prompt = """
@@ -231,10 +240,10 @@ SPECIALIZED FOCUS: General Analysis
 
     example_format = f"""
 EXAMPLE FORMAT:
-[
+{{"insights": [
   {{"type": "{insight_types[0] if insight_types else 'key_takeaways'}", "content": "Doc A (p.5) shows X methodology gives Y result, contrasting Doc B's Z approach.", "relevant_document": "Document Name.pdf", "page_number": 5, "relevance_score": 0.85}},
   {{"type": "{insight_types[1] if len(insight_types) > 1 else 'examples'}", "content": "Doc B (p.12) provides ABC company case: XYZ strategy yielded 25% improvement.", "relevant_document": "Another Doc.pdf", "page_number": 12, "relevance_score": 0.78}}
-]"""
+]}}"""
 
     return base_prompt + focused_prompt + example_format
 
@@ -263,47 +272,6 @@ def _build_related_content_text(related_sections: List[Dict[str, Any]]) -> str:
     return related_text
 
 
-def _parse_batch_response(response: str, insight_types: List[str], selected_text: str, related_sections: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    """Parse batch response with robust JSON handling"""
-    import json
-    import re
-    
-    print(f"🔍 DEBUG: Batch response ({len(response)} chars): {response[:200]}...")
-    
-    # Strategy 1: Direct JSON parsing
-    try:
-        cleaned_response = response.strip()
-        parsed = json.loads(cleaned_response)
-        if isinstance(parsed, list) and len(parsed) > 0:
-            validated = _validate_batch_insights(parsed, insight_types, related_sections)
-            if validated:
-                print(f"✅ Batch parsing SUCCESS: Direct JSON")
-                return validated
-    except Exception as e:
-        print(f"❌ Batch direct parsing failed: {e}")
-    
-    # Strategy 2: Extract JSON from response
-    try:
-        # Remove markdown and find JSON
-        cleaned = re.sub(r'```(?:json)?\s*', '', response)
-        cleaned = re.sub(r'```\s*', '', cleaned)
-        json_match = re.search(r'\[[\s\S]*?\]', cleaned)
-        
-        if json_match:
-            parsed = json.loads(json_match.group())
-            if isinstance(parsed, list):
-                validated = _validate_batch_insights(parsed, insight_types, related_sections)
-                if validated:
-                    print(f"✅ Batch parsing SUCCESS: Extracted JSON")
-                    return validated
-    except Exception as e:
-        print(f"❌ Batch extraction parsing failed: {e}")
-    
-    # Strategy 3: Generate fallback insights
-    print(f"⚠️ Batch parsing failed, generating fallback insights")
-    return [_generate_fallback_insight(insight_type, selected_text, related_sections) for insight_type in insight_types]
-
-
 def _validate_batch_insights(insights: List[Dict], insight_types: List[str], related_sections: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """Validate and fix batch insights"""
     validated_insights = []
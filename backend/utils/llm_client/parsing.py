@@ -3,91 +3,37 @@ Robust parsing utilities for insights responses
 """
 from typing import Dict, Any, List
 
+from ..json_scanner import extract_json_values
+
 
 def _parse_insights_response_robust(response: str, insight_types: List[str], selected_text: str, related_sections: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """Ultra-robust JSON parsing with multiple fallback strategies"""
-    import json
-    import re
-    
     print(f"🔍 DEBUG: Raw LLM response ({len(response)} chars): {response[:200]}...")
     
-    # Strategy 1: Direct JSON parsing
+    # Strategies 1-3: Single-pass scan for JSON spans (direct JSON, fenced/mixed content,
+    # then bounded repair of common errors such as trailing commas or truncation)
     try:
-        cleaned_response = response.strip()
-        parsed = json.loads(cleaned_response)
-        if isinstance(parsed, list) and len(parsed) > 0:
-            validated = _validate_and_fix_insights(parsed, insight_types)
-            if validated:
-                print(f"✅ Strategy 1 SUCCESS: Direct JSON parsing")
-                return validated
+        for parsed in extract_json_values(response):
+            if isinstance(parsed, dict):
+                parsed = [parsed]  # Convert single object to array
+            if isinstance(parsed, list) and len(parsed) > 0:
+                validated = _validate_and_fix_insights(parsed, insight_types)
+                if validated:
+                    print(f"✅ Strategy 1 SUCCESS: Scanned JSON")
+                    return validated
     except Exception as e:
-        print(f"❌ Strategy 1 failed: {e}")
+        print(f"❌ JSON scan failed: {e}")
     
-    # Strategy 2: Extract JSON from markdown or mixed content
-    try:
-        # Remove markdown code blocks
-        cleaned = re.sub(r'```(?:json)?\s*', '', response)
-        cleaned = re.sub(r'```\s*', '', cleaned)
-        
-        # Find JSON array pattern
-        json_patterns = [
-            r'\[[\s\S]*?\]',  # Matches [ ... ]
-            r'\{[\s\S]*?\}',  # Matches single object (convert to array)
-        ]
-        
-        for pattern in json_patterns:
-            matches = re.findall(pattern, cleaned)
-            for match in matches:
-                try:
-                    parsed = json.loads(match)
-                    if isinstance(parsed, dict):
-                        parsed = [parsed]  # Convert single object to array
-                    if isinstance(parsed, list) and len(parsed) > 0:
-                        validated = _validate_and_fix_insights(parsed, insight_types)
-                        if validated:
-                            print(f"✅ Strategy 2 SUCCESS: Extracted JSON from pattern")
-                            return validated
-                except Exception:
-                    continue
-    except Exception as e:
-        print(f"❌ Strategy 2 failed: {e}")
-    
-    # Strategy 3: Fix common JSON errors and retry
-    try:
-        # Fix common JSON issues
-        fixed_response = response.strip()
-        
-        # Fix missing quotes around keys
-        fixed_response = re.sub(r'(\w+):', r'"\1":', fixed_response)
-        # Fix single quotes to double quotes
-        fixed_response = fixed_response.replace("'", '"')
-        # Fix trailing commas
-        fixed_response = re.sub(r',\s*}', '}', fixed_response)
-        fixed_response = re.sub(r',\s*]', ']', fixed_response)
-        # Remove any text before [ and after ]
-        json_match = re.search(r'\[.*\]', fixed_response, re.DOTALL)
-        if json_match:
-            fixed_response = json_match.group()
-        
-        parsed = json.loads(fixed_response)
-        if isinstance(parsed, list) and len(parsed) > 0:
-            validated = _validate_and_fix_insights(parsed, insight_types)
-            if validated:
-                print(f"✅ Strategy 3 SUCCESS: Fixed JSON errors")
-                return validated
-    except Exception as e:
-        print(f"❌ Strategy 3 failed: {e}")
-    
-    # Strategy 4: Parse structured text and convert to JSON
+    # Strategy 2: Parse structured text and convert to JSON
     try:
         insights = _extract_insights_from_text(response, insight_types, selected_text, related_sections)
         if insights:
-            print(f"✅ Strategy 4 SUCCESS: Parsed structured text")
+            print(f"✅ Strategy 2 SUCCESS: Parsed structured text")
             return insights
     except Exception as e:
-        print(f"❌ Strategy 4 failed: {e}")
+        print(f"❌ Strategy 2 failed: {e}")
     
-    # Strategy 5: Generate minimal insights from available context
+    # Strategy 3: Generate minimal insights from available context
     print(f"⚠️ All parsing strategies failed, generating minimal insights from context")
     return _generate_minimal_insights_from_context(insight_types, selected_text, related_sections)
 
@@ -0,0 +1,238 @@
+"""
+Resilience primitives for LLM calls: typed errors, retry backoff and circuit breaking
+"""
+
+import re
+import time
+import random
+import threading
+from email.utils import parsedate_to_datetime
+from typing import Optional, Dict
+
+
+class LLMError(Exception):
+    """Base class for every failure raised by LLMClient.generate"""
+
+    # Whether the same request may succeed if sent again after a pause
+    retryable = False
+    # Whether the failure says something about the health of the service key
+    trips_circuit = True
+
+    def __init__(self, message: str, service_type: str = "default", retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.service_type = service_type
+        self.retry_after = retry_after
+
+
+class LLMNotConfiguredError(LLMError):
+    """No API key or credentials are available for the service"""
+
+
+class LLMAuthError(LLMError):
+    """The API key was rejected"""
+
+
+class LLMRateLimitError(LLMError):
+    """Quota exhausted or HTTP 429"""
+    retryable = True
+
+
+class LLMTimeoutError(LLMError):
+    """The request did not complete within the configured timeout"""
+    retryable = True
+
+
+class LLMUnavailableError(LLMError):
+    """Transient server-side failure (5xx, connection reset)"""
+    retryable = True
+
+
+class LLMResponseError(LLMError):
+    """The model answered but the response is unusable (blocked, or not matching the response schema)"""
+    trips_circuit = False
+
+
+class LLMCircuitOpenError(LLMError):
+    """The circuit for the service key is open; the call was not attempted"""
+    trips_circuit = False
+
+
+_RATE_LIMIT_NAMES = {"ResourceExhausted", "TooManyRequests"}
+_TIMEOUT_NAMES = {"DeadlineExceeded", "Timeout", "ReadTimeout", "ConnectTimeout", "TimeoutError"}
+_UNAVAILABLE_NAMES = {"ServiceUnavailable", "InternalServerError", "BadGateway", "GatewayTimeout",
+                      "ConnectionError", "ConnectionResetError", "ServerError"}
+_AUTH_NAMES = {"Unauthenticated", "PermissionDenied", "Unauthorized"}
+
+_RETRY_IN_PATTERN = re.compile(r'retry in\s+([\d.]+)\s*s', re.IGNORECASE)
+_RETRY_DELAY_PATTERN = re.compile(r'retry_delay\s*\{\s*seconds:\s*(\d+)', re.IGNORECASE)
+
+
+def parse_retry_after(error: Exception) -> Optional[float]:
+    """Extract a server-provided retry delay (seconds) from an exception, if any"""
+    explicit = getattr(error, "retry_after", None)
+    if isinstance(explicit, (int, float)):
+        return float(explicit)
+
+    # HTTP-style errors expose the response headers
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if headers:
+        value = headers.get("Retry-After") or headers.get("retry-after")
+        if value:
+            try:
+                return max(0.0, float(value))
+            except ValueError:
+                try:
+                    return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+                except Exception:
+                    pass
+
+    # Gemini embeds the delay in the error text ("Please retry in 23.4s" / "retry_delay { seconds: 23 }")
+    message = str(error)
+    for pattern in (_RETRY_IN_PATTERN, _RETRY_DELAY_PATTERN):
+        match = pattern.search(message)
+        if match:
+            try:
+                return float(match.group(1))
+            except ValueError:
+                continue
+    return None
+
+
+def classify_error(error: Exception, service_type: str = "default") -> LLMError:
+    """Map an arbitrary SDK/transport exception onto the LLMError hierarchy"""
+    if isinstance(error, LLMError):
+        return error
+
+    name = type(error).__name__
+    message = str(error)
+    lowered = message.lower()
+    retry_after = parse_retry_after(error)
+
+    if name in _RATE_LIMIT_NAMES or "429" in message or "quota" in lowered or "resource exhausted" in lowered:
+        return LLMRateLimitError(f"API quota exceeded for {service_type}: {message}", service_type, retry_after)
+    if name in _AUTH_NAMES or "401" in message or "403" in message or "authentication" in lowered or "api key not valid" in lowered:
+        return LLMAuthError(f"Authentication error for {service_type}: {message}", service_type)
+    if name in _TIMEOUT_NAMES or isinstance(error, TimeoutError) or "timeout" in lowered or "timed out" in lowered or "deadline" in lowered:
+        return LLMTimeoutError(f"Request timeout for {service_type}: {message}", service_type, retry_after)
+    if name in _UNAVAILABLE_NAMES or isinstance(error, ConnectionError) or any(code in message for code in ("500", "502", "503", "504")) or "unavailable" in lowered:
+        return LLMUnavailableError(f"Service unavailable for {service_type}: {message}", service_type, retry_after)
+    if isinstance(error, ValueError):
+        # google.generativeai raises ValueError from response.text when the candidate was blocked
+        return LLMResponseError(f"Empty or blocked response for {service_type}: {message}", service_type)
+    return LLMUnavailableError(f"Unexpected LLM failure for {service_type}: {message}", service_type, retry_after)
+
+
+def describe_error(error: LLMError) -> str:
+    """Human-readable message for legacy callers that expect a string"""
+    if isinstance(error, LLMRateLimitError):
+        return f"API quota exceeded for {error.service_type}. Please try again later or upgrade to a paid plan."
+    if isinstance(error, LLMAuthError):
+        return f"Authentication error for {error.service_type}. Please check your API key."
+    if isinstance(error, LLMTimeoutError):
+        return "Request timeout. Please try again."
+    if isinstance(error, LLMNotConfiguredError):
+        return f"LLM client not configured properly for service: {error.service_type}."
+    return f"Unable to generate response at this time for {error.service_type}."
+
+
+def compute_backoff(attempt: int, base: float, cap: float) -> float:
+    """Exponential backoff with full jitter: uniform(0, min(cap, base * 2**attempt))"""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker (closed -> open -> half-open -> closed)"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_seconds = reset_seconds
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_until = 0.0
+        self._trial: Optional[object] = None  # Permit of the half-open trial call in flight
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._refresh()
+            return self._state
+
+    def _refresh(self):
+        if self._state == self.OPEN and time.time() >= self._opened_until:
+            self._state = self.HALF_OPEN
+            self._trial = None
+
+    def allows_requests(self) -> bool:
+        """Non-mutating check used for fast-path decisions"""
+        with self._lock:
+            self._refresh()
+            return self._state != self.OPEN
+
+    def allow_request(self) -> Optional[object]:
+        """Reserve a request slot: a truthy permit, or None when refused.
+
+        In half-open state only one trial call is let through; its permit is the only one
+        that release_trial accepts.
+        """
+        with self._lock:
+            self._refresh()
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.HALF_OPEN and self._trial is None:
+                self._trial = object()
+                return self._trial
+            return None
+
+    def remaining_open_time(self) -> float:
+        with self._lock:
+            return max(0.0, self._opened_until - time.time())
+
+    def record_success(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._trial = None
+
+    def release_trial(self, permit: Optional[object]):
+        """Free the half-open trial slot when the call holding ``permit`` ended without a verdict.
+
+        Permits of calls admitted while closed, or of an earlier trial, never free a newer trial.
+        """
+        with self._lock:
+            if permit is not None and permit is self._trial:
+                self._trial = None
+
+    def record_failure(self, open_for: Optional[float] = None):
+        """Count a failure; open the circuit on threshold, on a failed trial, or when forced"""
+        with self._lock:
+            self._failures += 1
+            should_open = (
+                open_for is not None
+                or self._state == self.HALF_OPEN
+                or self._failures >= self.failure_threshold
+            )
+            if should_open:
+                duration = max(self.reset_seconds, open_for or 0.0)
+                self._state = self.OPEN
+                self._opened_until = time.time() + duration
+                self._trial = None
+
+
+_circuit_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(key: str, failure_threshold: int, reset_seconds: float) -> CircuitBreaker:
+    """Get the shared breaker for a service key (services sharing an API key share quota)"""
+    with _breakers_lock:
+        breaker = _circuit_breakers.get(key)
+        if breaker is None:
+            breaker = CircuitBreaker(failure_threshold, reset_seconds)
+            _circuit_breakers[key] = breaker
+        return breaker
@@ -0,0 +1,142 @@
+"""
+Token-budget-aware assembly of library outlines for LLM prompts
+"""
+
+import math
+from typing import List, Dict, Any, Optional, Tuple
+
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import linear_kernel
+
+from config import settings
+
+# Rough Gemini/GPT-style ratio; good enough to keep prompts bounded without a tokenizer
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the token count of a prompt fragment"""
+    if not text:
+        return 0
+    return int(math.ceil(len(text) / CHARS_PER_TOKEN))
+
+
+def heading_level(level: Any) -> int:
+    """Normalize 'H2' / 2 / None outline levels to an int (1 = top level)"""
+    try:
+        if isinstance(level, str):
+            if level.lower().startswith('h'):
+                return int(level[1:]) if level[1:].isdigit() else 1
+            return 1
+        return int(level) if level else 1
+    except (ValueError, TypeError):
+        return 1
+
+
+def _heading_text(item: Dict[str, Any]) -> str:
+    return item.get('text', item.get('heading', 'Unknown'))  # Try 'text' first, then 'heading'
+
+
+def _format_item(item: Dict[str, Any], include_pages: bool) -> str:
+    indent = "  " * max(0, heading_level(item.get('level', 'H1')) - 1)
+    line = f"{indent}- {_heading_text(item)}"
+    if include_pages:
+        line += f" (p.{item.get('page', 'N/A')})"
+    return line
+
+
+def rank_outline_items(outlines: List[Dict[str, Any]], query: str) -> List[Tuple[float, int, int]]:
+    """
+    Score every outline heading against the query.
+    Returns (score, doc_index, item_index) sorted best first; ties favour
+    higher-level headings and earlier positions so structure is preserved.
+    """
+    entries = []
+    for doc_idx, outline in enumerate(outlines):
+        for item_idx, item in enumerate(outline.get('outline', []) or []):
+            entries.append((doc_idx, item_idx, item))
+
+    if not entries:
+        return []
+
+    scores = [0.0] * len(entries)
+    if query and query.strip():
+        corpus = [_heading_text(item) for _, _, item in entries]
+        try:
+            vectorizer = TfidfVectorizer(stop_words='english', ngram_range=(1, 2), sublinear_tf=True)
+            matrix = vectorizer.fit_transform(corpus + [query])
+            scores = linear_kernel(matrix[-1], matrix[:-1]).ravel().tolist()
+        except ValueError:
+            # Empty vocabulary (only stop words / symbols) - fall back to positional order
+            pass
+
+    ranked = [
+        (scores[i], doc_idx, item_idx, heading_level(item.get('level', 'H1')))
+        for i, (doc_idx, item_idx, item) in enumerate(entries)
+    ]
+    ranked.sort(key=lambda r: (-r[0], r[3], r[2], r[1]))
+    return [(score, doc_idx, item_idx) for score, doc_idx, item_idx, _ in ranked]
+
+
+def build_outline_context(
+    outlines: List[Dict[str, Any]],
+    query: str = "",
+    token_budget: Optional[int] = None,
+    header_lines: Optional[List[str]] = None,
+    structure_label: str = "Document Structure:",
+    include_pages: bool = False
+) -> str:
+    """
+    Assemble outline context that fits the token budget.
+
+    Headings are ranked across the whole library by TF-IDF similarity to the
+    query and added best-first; a document's header is only paid for once one
+    of its headings is selected. Output keeps library and outline order.
+    """
+    budget = token_budget if token_budget is not None else settings.llm_context_token_budget
+    header_lines = header_lines or []
+    used = estimate_tokens("\n".join(header_lines))
+
+    doc_headers = [
+        f"\n--- {outline['pdf_name']} ---\nSummary: {outline['summary']}\n{structure_label}"
+        for outline in outlines
+    ]
+    selected: Dict[int, List[int]] = {}
+
+    for _, doc_idx, item_idx in rank_outline_items(outlines, query):
+        outline = outlines[doc_idx]
+        line = _format_item(outline['outline'][item_idx], include_pages)
+        cost = estimate_tokens(line) + 1
+        if doc_idx not in selected:
+            cost += estimate_tokens(doc_headers[doc_idx])
+        if used + cost > budget and selected:
+            continue
+        selected.setdefault(doc_idx, []).append(item_idx)
+        used += cost
+
+    # Documents without outline items still get listed when there is room
+    for doc_idx, outline in enumerate(outlines):
+        if doc_idx in selected or outline.get('outline'):
+            continue
+        cost = estimate_tokens(doc_headers[doc_idx])
+        if used + cost <= budget:
+            selected[doc_idx] = []
+            used += cost
+
+    context_parts = list(header_lines)
+    for doc_idx, outline in enumerate(outlines):
+        if doc_idx not in selected:
+            continue
+        context_parts.append(f"\n--- {outline['pdf_name']} ---")
+        context_parts.append(f"Summary: {outline['summary']}")
+        item_indices = sorted(selected[doc_idx])
+        if item_indices:
+            context_parts.append(structure_label)
+            for item_idx in item_indices:
+                context_parts.append(_format_item(outline['outline'][item_idx], include_pages))
+
+    omitted = len(outlines) - len(selected)
+    if omitted > 0:
+        context_parts.append(f"\n({omitted} less relevant documents omitted to fit the context budget)")
+
+    return "\n".join(context_parts)
@@ -0,0 +1,53 @@
+"""
+Pydantic models as Gemini response schemas for schema-constrained generation
+"""
+
+from typing import Any, Dict, Type
+from pydantic import BaseModel
+
+# Keys the Gemini Schema (OpenAPI subset) accepts; anything else is rejected by the SDK
+_SCHEMA_KEYS = {"type", "format", "description", "nullable", "enum", "items", "properties", "required"}
+_SCHEMA_CACHE: Dict[Type[BaseModel], Dict[str, Any]] = {}
+
+
+def to_response_schema(model: Type[BaseModel]) -> Dict[str, Any]:
+    """Gemini response_schema for ``model``: $refs inlined, titles/defaults dropped, Optional -> nullable"""
+    schema = _SCHEMA_CACHE.get(model)
+    if schema is None:
+        raw = model.model_json_schema()
+        schema = _convert(raw, raw.get("$defs", {}))
+        _SCHEMA_CACHE[model] = schema
+    return schema
+
+
+def _convert(node: Dict[str, Any], defs: Dict[str, Any]) -> Dict[str, Any]:
+    if "$ref" in node:
+        return _convert(defs[node["$ref"].rsplit("/", 1)[-1]], defs)
+    
+    variants = node.get("anyOf")
+    if variants:
+        # Optional[X] is anyOf [X, null]; other unions are not expressible, keep the first branch
+        concrete = [variant for variant in variants if variant.get("type") != "null"]
+        converted = _convert(concrete[0], defs) if concrete else {"type": "string"}
+        if len(concrete) < len(variants):
+            converted["nullable"] = True
+        return converted
+    
+    if "const" in node and "enum" not in node:
+        node = {**node, "enum": [node["const"]]}
+    
+    converted: Dict[str, Any] = {}
+    for key, value in node.items():
+        if key not in _SCHEMA_KEYS:
+            continue
+        if key == "properties":
+            converted[key] = {name: _convert(sub, defs) for name, sub in value.items()}
+        elif key == "items":
+            converted[key] = _convert(value, defs)
+        else:
+            converted[key] = value
+    
+    if "enum" in converted and "type" not in converted:
+        converted["type"] = "string"
+    return converted
+
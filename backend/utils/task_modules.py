@@ -2,12 +2,15 @@
 Task-specific LLM modules for different document analysis tasks
 """
 
-from typing import List, Dict, Any
+from typing import Callable, List, Dict, Any, Optional, Tuple
 from .core_llm import get_llm_client
+from .llm_resilience import LLMError, describe_error
+from .prompt_budget import build_outline_context
+from .json_scanner import JsonArrayStream
 
 
-def get_pdf_context() -> str:
-    """Get PDF outlines context for all LLM requests"""
+def get_pdf_context(query: str = "") -> str:
+    """Get PDF outlines context for all LLM requests, ranked by relevance to the query"""
     try:
         # Import here to avoid circular imports
         from services.document_service import document_service
@@ -31,37 +34,11 @@ def get_pdf_context() -> str:
         if not outlines:
             return "No PDF documents have been uploaded yet."
         
-        context_parts = []
-        context_parts.append("AVAILABLE DOCUMENTS AND THEIR STRUCTURE:")
-        
-        for outline in outlines:
-            context_parts.append(f"\n--- {outline['pdf_name']} ---")
-            context_parts.append(f"Summary: {outline['summary']}")
-            
-            # Add outline structure
-            outline_items = outline.get('outline', [])
-            if outline_items:
-                context_parts.append("Document Structure:")
-                for i, item in enumerate(outline_items):
-                    if i >= 8:  # Limit to first 8 items to conserve tokens
-                        break
-                    level = item.get('level', 'H1')
-                    heading = item.get('text', item.get('heading', 'Unknown'))  # Try 'text' first, then 'heading'
-                    try:
-                        # Handle both numeric and string levels
-                        if isinstance(level, str):
-                            if level.lower().startswith('h'):
-                                level_num = int(level[1:]) if level[1:].isdigit() else 1
-                            else:
-                                level_num = 1
-                        else:
-                            level_num = int(level) if level else 1
-                        indent = "  " * max(0, level_num - 1)
-                    except (ValueError, TypeError):
-                        indent = ""
-                    context_parts.append(f"{indent}- {heading}")
-        
-        return "\n".join(context_parts)
+        return build_outline_context(
+            outlines,
+            query=query,
+            header_lines=["AVAILABLE DOCUMENTS AND THEIR STRUCTURE:"]
+        )
         
     except Exception as e:
         print(f"Error getting PDF context: {e}")
@@ -75,8 +52,8 @@ class SummaryGenerator:
         self.client = get_llm_client("default")  
     
     def generate_snippet_summary(self, text: str, limit: int = 2) -> str:
-        """Generate a concise summary of the given text"""
-        pdf_context = get_pdf_context()
+        """Generate a concise summary of the given text (a readable message on LLM failure)"""
+        pdf_context = get_pdf_context(text)
         
         system_prompt = f"""You are a professional content summarizer with access to a document library. Your task is to create concise, informative summaries that capture the essential points of any text while considering the broader context of available documents. Always write exactly {limit} sentences - no more, no less. Focus on the most important information and make it accessible to readers. Always respond in plain text format - no markdown, bullets, or special formatting. Consider how this content relates to the available documents when creating your summary."""
         
@@ -86,16 +63,19 @@ class SummaryGenerator:
 Summarize the following text in exactly {limit} sentences, considering how it relates to the available documents:
 {text}"""
         
-        return self.client.generate(
-            prompt=user_prompt,
-            max_tokens=150,
-            temperature=0.3,
-            system_prompt=system_prompt
-        )
+        try:
+            return self.client.generate(
+                prompt=user_prompt,
+                max_tokens=150,
+                temperature=0.3,
+                system_prompt=system_prompt
+            )
+        except LLMError as e:
+            return describe_error(e)
     
     def generate_executive_summary(self, content: List[str], max_length: int = 5) -> str:
-        """Generate an executive summary from multiple content pieces"""
-        pdf_context = get_pdf_context()
+        """Generate an executive summary from multiple content pieces (a readable message on LLM failure)"""
+        pdf_context = get_pdf_context(" ".join(content))
         
         system_prompt = f"""You are an executive summary specialist with access to a document library. Create a comprehensive overview that captures the key points from multiple sources while considering the broader context of available documents. Write exactly {max_length} sentences that provide a high-level understanding of the content. Focus on strategic insights and main conclusions. Always respond in plain text format - no markdown, bullets, or special formatting."""
         
@@ -107,12 +87,15 @@ Create an executive summary of the following content in {max_length} sentences,
 
 {combined_content}"""
         
-        return self.client.generate(
-            prompt=user_prompt,
-            max_tokens=200,
-            temperature=0.4,
-            system_prompt=system_prompt
-        )
+        try:
+            return self.client.generate(
+                prompt=user_prompt,
+                max_tokens=200,
+                temperature=0.4,
+                system_prompt=system_prompt
+            )
+        except LLMError as e:
+            return describe_error(e)
 
 
 class InsightAnalyzer:
@@ -188,7 +171,7 @@ Specialize in finding surprising connections that only become apparent when anal
     
     def generate_insight(self, selected_text: str, related_sections: List[Dict[str, Any]], insight_type: str) -> str:
         """Generate a specific type of insight"""
-        pdf_context = get_pdf_context()
+        pdf_context = get_pdf_context(selected_text)
         
         # Get the appropriate system prompt
         system_prompt = self.system_prompts.get(insight_type, self.system_prompts["key_takeaways"])
@@ -274,7 +257,169 @@ class ContentGenerator:
     
     def generate_podcast_script(self, selected_text: str, insights: List[Dict], format: str = "podcast", max_duration_minutes: float = 4.5, language: str = "en") -> List[Dict]:
         """Generate natural, informative podcast script with human-like expressions and strict time limits"""
-        pdf_context = get_pdf_context()
+        system_prompt, user_prompt = self._podcast_prompts(selected_text, insights, format, max_duration_minutes, language)
+        max_words = int(max_duration_minutes * 160)
+        
+        try:
+            response = self.client.generate(
+                prompt=user_prompt,
+                max_tokens=1200,  # Increased significantly for longer content
+                temperature=0.8,  # Increased for more natural variation
+                system_prompt=system_prompt
+            )
+        except LLMError as e:
+            print(f"⚠️ LLM unavailable for podcast script ({type(e).__name__}), using extended fallback")
+            return self._get_extended_fallback_script(format, selected_text, insights, max_duration_minutes, language)
+        
+        # Clean response and parse JSON more robustly
+        response = response.strip()
+        
+        # Remove markdown code blocks
+        if response.startswith('```json'):
+            response = response[7:]
+        elif response.startswith('```'):
+            response = response[3:]
+        
+        if response.endswith('```'):
+            response = response[:-3]
+        
+        response = response.strip()
+        
+        # Try to fix common JSON issues
+        response = self._fix_json_response(response)
+        
+        try:
+            import json
+            script = json.loads(response)
+            if not isinstance(script, list):
+                script = [script] if isinstance(script, dict) else []
+            
+            # Validate structure and apply time constraints
+            valid_script = []
+            total_words = 0
+            
+            for item in script:
+                segment = self._script_segment(item)
+                if segment:
+                    word_count = len(segment["text"].split())
+                    
+                    # Check if adding this segment would exceed time limit
+                    if total_words + word_count <= max_words:
+                        valid_script.append(segment)
+                        total_words += word_count
+                    else:
+                        print(f"⏰ Stopping at segment {len(valid_script)+1} to stay within {max_duration_minutes} minute limit")
+                        break
+            
+            return self._finalize_script(valid_script, total_words, selected_text, insights, format, max_duration_minutes, language)
+            
+        except Exception as e:
+            print(f"JSON parsing error: {e}")
+            print(f"Raw response: {response[:200]}...")
+            return self._get_extended_fallback_script(format, selected_text, insights, max_duration_minutes, language)
+    
+    def stream_podcast_script(self, selected_text: str, insights: List[Dict], format: str = "podcast",
+                              max_duration_minutes: float = 4.5, language: str = "en",
+                              on_segment: Optional[Callable[[Dict[str, str]], None]] = None) -> List[Dict]:
+        """
+        generate_podcast_script with the LLM response streamed: each speaker turn is passed to
+        on_segment as soon as it is parsed, so callers can start TTS while the rest is written.
+        The returned script is final and may differ from the turns seen (fallback script when the
+        output is too short); callers reconcile against it.
+        """
+        if not (language or "en").lower().startswith("en"):
+            # Non-English scripts are translated after generation, so turns are only final at the end
+            script = self.generate_podcast_script(selected_text, insights, format, max_duration_minutes, language)
+            if on_segment:
+                for segment in script:
+                    on_segment(segment)
+            return script
+        
+        system_prompt, user_prompt = self._podcast_prompts(selected_text, insights, format, max_duration_minutes, language)
+        max_words = int(max_duration_minutes * 160)
+        parser = JsonArrayStream()
+        valid_script = []
+        total_words = 0
+        
+        stream = self.client.generate_stream(
+            prompt=user_prompt,
+            max_tokens=1200,
+            temperature=0.8,
+            system_prompt=system_prompt
+        )
+        try:
+            budget_reached = False
+            for chunk in stream:
+                for item in parser.feed(chunk):
+                    segment = self._script_segment(item)
+                    if not segment:
+                        continue
+                    word_count = len(segment["text"].split())
+                    if total_words + word_count > max_words:
+                        print(f"⏰ Stopping at segment {len(valid_script)+1} to stay within {max_duration_minutes} minute limit")
+                        budget_reached = True
+                        break
+                    valid_script.append(segment)
+                    total_words += word_count
+                    if on_segment:
+                        on_segment(segment)
+                if budget_reached:
+                    break
+        except LLMError as e:
+            if not valid_script:
+                print(f"⚠️ LLM unavailable for podcast script ({type(e).__name__}), using extended fallback")
+                return self._get_extended_fallback_script(format, selected_text, insights, max_duration_minutes, language)
+            print(f"⚠️ Podcast script stream interrupted ({type(e).__name__}) after {len(valid_script)} segments")
+        finally:
+            # Stop generating once the word budget is used up
+            stream.close()
+        
+        return self._finalize_script(valid_script, total_words, selected_text, insights, format, max_duration_minutes, language)
+    
+    def _script_segment(self, item: Any) -> Optional[Dict[str, str]]:
+        """Cleaned {"speaker", "text"} turn, or None when the item is not a usable turn"""
+        if isinstance(item, dict) and 'speaker' in item and 'text' in item:
+            # Clean up text content
+            text = str(item['text']).strip()
+            if text:
+                return {"speaker": item['speaker'], "text": text}
+        return None
+    
+    def _finalize_script(self, valid_script: List[Dict], total_words: int, selected_text: str, insights: List[Dict],
+                         format: str, max_duration_minutes: float, language: str) -> List[Dict]:
+        """Length checks, time limit and language enforcement for a parsed script"""
+        # Calculate estimated duration
+        estimated_duration = total_words / 160  # 160 WPM average
+        
+        print(f"📊 Generated script: {len(valid_script)} segments, {total_words} words, ~{estimated_duration:.1f} minutes")
+        
+        # Validate minimum and maximum length
+        if len(valid_script) < 8 and format == "podcast":
+            print("⚠️ Generated script too short, using extended fallback with time limits")
+            return self._get_extended_fallback_script(format, selected_text, insights, max_duration_minutes, language)
+        
+        if estimated_duration > max_duration_minutes:
+            print(f"⚠️ Script exceeds time limit, truncating to {max_duration_minutes} minutes")
+            valid_script = self._truncate_script_to_time_limit(valid_script, max_duration_minutes)
+        
+        # Enforce language by translating if needed (LLM might ignore language directive)
+        if valid_script:
+            try:
+                target = (language or "en").lower()
+                if not target.startswith("en"):
+                    texts = [seg["text"] for seg in valid_script]
+                    translated = self._translate_texts(texts, language)
+                    for i, t in enumerate(translated):
+                        valid_script[i]["text"] = t
+            except Exception:
+                pass
+        
+        return valid_script if valid_script else self._get_extended_fallback_script(format, selected_text, insights, max_duration_minutes, language)
+    
+    def _podcast_prompts(self, selected_text: str, insights: List[Dict], format: str,
+                         max_duration_minutes: float, language: str) -> Tuple[str, str]:
+        """(system prompt, user prompt) for a podcast script or audio overview"""
+        pdf_context = get_pdf_context(selected_text)
         
         # Calculate maximum words based on duration limit
         # Assuming average 160 WPM speech rate
@@ -399,90 +544,7 @@ Create a flowing, detailed narrative that incorporates all key insights with spe
 
 Remember: Respond with ONLY the JSON array, no other text."""
         
-        response = self.client.generate(
-            prompt=user_prompt,
-            max_tokens=1200,  # Increased significantly for longer content
-            temperature=0.8,  # Increased for more natural variation
-            system_prompt=system_prompt
-        )
-        
-        # Clean response and parse JSON more robustly
-        response = response.strip()
-        
-        # Remove markdown code blocks
-        if response.startswith('```json'):
-            response = response[7:]
-        elif response.startswith('```'):
-            response = response[3:]
-        
-        if response.endswith('```'):
-            response = response[:-3]
-        
-        response = response.strip()
-        
-        # Try to fix common JSON issues
-        response = self._fix_json_response(response)
-        
-        try:
-            import json
-            script = json.loads(response)
-            if not isinstance(script, list):
-                script = [script] if isinstance(script, dict) else []
-            
-            # Validate structure and apply time constraints
-            valid_script = []
-            total_words = 0
-            
-            for segment in script:
-                if isinstance(segment, dict) and 'speaker' in segment and 'text' in segment:
-                    # Clean up text content
-                    text = segment['text'].strip()
-                    if text:
-                        word_count = len(text.split())
-                        
-                        # Check if adding this segment would exceed time limit
-                        if total_words + word_count <= max_words:
-                            valid_script.append({
-                                "speaker": segment['speaker'],
-                                "text": text
-                            })
-                            total_words += word_count
-                        else:
-                            print(f"⏰ Stopping at segment {len(valid_script)+1} to stay within {max_duration_minutes} minute limit")
-                            break
-            
-            # Calculate estimated duration
-            estimated_duration = total_words / 160  # 160 WPM average
-            
-            print(f"📊 Generated script: {len(valid_script)} segments, {total_words} words, ~{estimated_duration:.1f} minutes")
-            
-            # Validate minimum and maximum length
-            if len(valid_script) < 8 and format == "podcast":
-                print("⚠️ Generated script too short, using extended fallback with time limits")
-                return self._get_extended_fallback_script(format, selected_text, insights, max_duration_minutes, language)
-            
-            if estimated_duration > max_duration_minutes:
-                print(f"⚠️ Script exceeds time limit, truncating to {max_duration_minutes} minutes")
-                valid_script = self._truncate_script_to_time_limit(valid_script, max_duration_minutes)
-            
-            # Enforce language by translating if needed (LLM might ignore language directive)
-            if valid_script:
-                try:
-                    target = (language or "en").lower()
-                    if not target.startswith("en"):
-                        texts = [seg["text"] for seg in valid_script]
-                        translated = self._translate_texts(texts, language)
-                        for i, t in enumerate(translated):
-                            valid_script[i]["text"] = t
-                except Exception:
-                    pass
-
-            return valid_script if valid_script else self._get_extended_fallback_script(format, selected_text, insights, max_duration_minutes, language)
-            
-        except Exception as e:
-            print(f"JSON parsing error: {e}")
-            print(f"Raw response: {response[:200]}...")
-            return self._get_extended_fallback_script(format, selected_text, insights, max_duration_minutes, language)
+        return system_prompt, user_prompt
     
     def _truncate_script_to_time_limit(self, script: List[Dict], max_duration_minutes: float) -> List[Dict]:
         """Truncate script to fit within time limit"""
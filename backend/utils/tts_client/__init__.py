@@ -1,10 +1,25 @@
 # Re-export public API from modularized files
-from .generate_audio import generate_audio
-from .create_podcast_audio import create_podcast_audio
-from .combine_text_transcripts import combine_text_transcripts
+from .generate_audio import generate_audio, synthesize_pcm, resolve_azure_voice
+from .create_podcast_audio import create_podcast_audio, stream_podcast_audio, PodcastAudioPipeline
+from .combine_text_transcripts import combine_text_transcripts, write_script_transcript
+from .pcm import PcmAudio, stitch_pcm
+from .segment_cache import TtsSegmentCache, get_segment_cache
+from .transcode import AUDIO_FORMATS, negotiate_audio_format, transcode_audio
 
 __all__ = [
     "generate_audio",
+    "synthesize_pcm",
+    "resolve_azure_voice",
     "create_podcast_audio",
+    "stream_podcast_audio",
+    "PodcastAudioPipeline",
     "combine_text_transcripts",
+    "write_script_transcript",
+    "PcmAudio",
+    "stitch_pcm",
+    "TtsSegmentCache",
+    "get_segment_cache",
+    "AUDIO_FORMATS",
+    "negotiate_audio_format",
+    "transcode_audio",
 ]
@@ -1,7 +1,8 @@
 import os
+import time
 import uuid
 import logging
-from typing import List
+from typing import Dict, List
 
 # Set up logging
 logger = logging.getLogger(__name__)
@@ -45,3 +46,33 @@ def combine_text_transcripts(transcript_files: List[str]) -> str:
     except Exception as e:
         logger.error(f"❌ Error combining transcripts: {str(e)}")
         return transcript_files[0] if transcript_files else None
+
+
+def write_script_transcript(script: List[Dict[str, str]]) -> str:
+    """
+    Write a podcast script as one transcript (same layout as combine_text_transcripts)
+    """
+    from config import settings
+    
+    output_filename = f"podcast_transcript_{uuid.uuid4()}.txt"
+    output_path = os.path.join(settings.audio_folder, output_filename)
+    generated_at = time.strftime('%Y-%m-%d %H:%M:%S')
+    
+    try:
+        with open(output_path, "w", encoding="utf-8") as output_file:
+            output_file.write("PODCAST TRANSCRIPT\n")
+            output_file.write("==================\n\n")
+            
+            for i, entry in enumerate(script):
+                output_file.write(f"--- Segment {i+1} ---\n")
+                output_file.write(f"Speaker: {entry.get('speaker', '')}\n")
+                output_file.write(f"Text: {entry.get('text', '')}\n")
+                output_file.write(f"Generated at: {generated_at}\n")
+                output_file.write("\n\n")
+        
+        logger.info(f"✅ Transcript saved: {output_filename}")
+        return output_filename
+        
+    except Exception as e:
+        logger.error(f"❌ Error writing transcript: {str(e)}")
+        return None
@@ -1,13 +1,200 @@
 import os
 import uuid
 import logging
-from typing import List, Dict
+import threading
+from concurrent.futures import Executor, Future, ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Iterator, List, Dict, NamedTuple, Optional, Tuple
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
-from .generate_audio import generate_audio
-from .combine_text_transcripts import combine_text_transcripts
+from .generate_audio import synthesize_pcm, resolve_azure_voice, AZURE_SAMPLE_RATE
+from .segment_cache import get_segment_cache
+from .combine_text_transcripts import write_script_transcript
+from .pcm import PcmAudio, stitch_pcm, to_mono16, wav_stream_header, with_leading_silence, write_wav
+
+# Silence after a segment (ms)
+SPEAKER_CHANGE_PAUSE_MS = 850
+SAME_SPEAKER_PAUSE_MS = 400
+# Streamed audio is converted to this rate when the engine output differs (pyttsx3, synthetic)
+LOCAL_STREAM_SAMPLE_RATE = 22050
+
+
+# Shared TTS worker pools: threads for network-bound Azure calls, processes for local
+# engines (pyttsx3 runAndWait blocks and is not thread-safe; the synthetic fallback is CPU-bound)
+_thread_pool: Optional[ThreadPoolExecutor] = None
+_process_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _uses_azure() -> bool:
+    from config import settings
+    return settings.tts_provider == "azure" and bool(settings.azure_tts_key and settings.azure_tts_endpoint)
+
+
+def _get_tts_executor() -> Executor:
+    """Lazily created pool matching the configured TTS provider"""
+    global _thread_pool, _process_pool
+    from config import settings
+    with _pool_lock:
+        if _uses_azure():
+            if _thread_pool is None:
+                _thread_pool = ThreadPoolExecutor(
+                    max_workers=max(1, settings.tts_max_workers), thread_name_prefix="tts"
+                )
+            return _thread_pool
+        if _process_pool is None:
+            _process_pool = ProcessPoolExecutor(max_workers=max(1, settings.tts_local_max_workers))
+        return _process_pool
+
+
+def _reset_process_pool(broken: Executor) -> None:
+    """Drop a broken process pool; a pool another request already replaced it with is kept"""
+    global _process_pool
+    with _pool_lock:
+        if _process_pool is broken:
+            _process_pool = None
+    # Its queued jobs already failed with BrokenProcessPool; nothing is left to cancel
+    broken.shutdown(wait=False)
+
+
+class _SegmentJob(NamedTuple):
+    future: Future
+    cache_key: Optional[str]  # Set for cache misses: store the result under this key
+    engine: str  # Only audio from this engine is cached (not degraded fallbacks)
+    executor: Optional[Executor] = None  # Pool the job was queued on (None when already done)
+
+
+def _segment_identity(speaker: str, language: str) -> Tuple[str, str, str]:
+    """(engine, voice, locale) that the configured provider uses for a speaker"""
+    if _uses_azure():
+        locale, voice = resolve_azure_voice(speaker, language)
+        return "azure", voice, locale
+    # pyttsx3 picks its voice and rate from the speaker and language
+    return "pyttsx3", speaker, (language or "en").lower()
+
+
+def _submit_segment(entry: Dict[str, str], language: str, cache) -> _SegmentJob:
+    """Cached audio as a completed future, otherwise a job queued on the TTS pool"""
+    engine, voice, locale = _segment_identity(entry["speaker"], language)
+    cache_key = cache.make_key(entry["text"], voice, locale, engine) if cache else None
+    cached = cache.get(cache_key) if cache else None
+    if cached is not None:
+        future = Future()
+        future.set_result(cached)
+        return _SegmentJob(future, None, engine)
+    for attempt in range(2):
+        executor = _get_tts_executor()
+        try:
+            future = executor.submit(synthesize_pcm, entry["text"], entry["speaker"], language)
+            return _SegmentJob(future, cache_key, engine, executor)
+        except BrokenProcessPool:
+            # Broke before a waiting request noticed; retry once on a fresh pool
+            logger.error("❌ TTS worker pool is broken, starting a new one")
+            _reset_process_pool(executor)
+    
+    # The fresh pool broke too: synthesize in-process
+    future = Future()
+    try:
+        future.set_result(synthesize_pcm(entry["text"], entry["speaker"], language))
+    except Exception as e:
+        future.set_exception(e)
+    return _SegmentJob(future, cache_key, engine)
+
+
+def _submit_segments(script: List[Dict[str, str]], language: str) -> List[_SegmentJob]:
+    """Queue the uncached script entries on the TTS pool; jobs are in script order"""
+    cache = get_segment_cache()
+    jobs = [_submit_segment(entry, language, cache) for entry in script]
+    cached_count = sum(1 for job in jobs if cache and job.cache_key is None)
+    logger.info(f"🎤 Synthesizing {len(script) - cached_count}/{len(script)} segments "
+                f"({cached_count} from TTS cache)")
+    return jobs
+
+
+def _segment_result(index: int, entry: Dict[str, str], job: _SegmentJob, language: str) -> Optional[PcmAudio]:
+    """Wait for one segment and cache it; a broken worker pool falls back to in-process synthesis"""
+    try:
+        pcm = job.future.result()
+    except BrokenProcessPool:
+        # A worker died (e.g. native TTS crash); finish this segment in-process
+        logger.error(f"❌ TTS worker pool broke at segment {index+1}, synthesizing serially")
+        _reset_process_pool(job.executor)
+        pcm = synthesize_pcm(entry["text"], entry["speaker"], language)
+    except Exception as e:
+        logger.error(f"❌ TTS failed for segment {index+1}: {e}")
+        return None
+    
+    if job.cache_key and pcm is not None and pcm.engine == job.engine:
+        get_segment_cache().put(job.cache_key, pcm)
+    return pcm
+
+
+def _synthesize_segments(script: List[Dict[str, str]], language: str) -> List[Optional[PcmAudio]]:
+    """Synthesize PCM for every script entry concurrently; the result list is in script order"""
+    jobs = _submit_segments(script, language)
+    return [
+        _segment_result(i, entry, job, language)
+        for i, (entry, job) in enumerate(zip(script, jobs))
+    ]
+
+
+def _pause_ms(previous_speaker: str, speaker: str) -> int:
+    return SPEAKER_CHANGE_PAUSE_MS if previous_speaker != speaker else SAME_SPEAKER_PAUSE_MS
+
+
+def stream_podcast_audio(script: List[Dict[str, str]], language: str = "en",
+                         on_complete: Optional[Callable[[Optional[str]], None]] = None) -> Iterator[bytes]:
+    """
+    Progressive WAV for a script: the header, then each segment as soon as it (and every
+    earlier one) is synthesized, while later segments are still in the TTS pool.
+    When the stream finishes, the audio is also saved once and on_complete gets its filename.
+    """
+    from config import settings
+    sample_rate = AZURE_SAMPLE_RATE if _uses_azure() else LOCAL_STREAM_SAMPLE_RATE
+    jobs = _submit_segments(script, language)
+    chunks: List[bytes] = []
+    previous_speaker = None
+    completed = False
+    
+    try:
+        yield wav_stream_header(sample_rate)
+        for i, (entry, job) in enumerate(zip(script, jobs)):
+            pcm = _segment_result(i, entry, job, language)
+            if pcm is None or not pcm.data:
+                logger.error(f"❌ Failed to generate audio for segment {i+1}, skipping it in the stream")
+                continue
+            
+            samples = to_mono16(pcm, sample_rate)
+            if previous_speaker is not None:
+                # Silence before every segment but the first
+                pause = int(sample_rate * _pause_ms(previous_speaker, entry["speaker"]) / 1000)
+                samples = with_leading_silence(samples, pause)
+            previous_speaker = entry["speaker"]
+            
+            chunk = samples.tobytes()
+            chunks.append(chunk)
+            yield chunk
+        completed = True
+    finally:
+        if not completed:
+            # Client went away: drop queued segments
+            for job in jobs:
+                job.future.cancel()
+    
+    output_filename = None
+    if chunks:
+        try:
+            output_filename = f"podcast_combined_{uuid.uuid4()}.wav"
+            write_wav(os.path.join(settings.audio_folder, output_filename),
+                      PcmAudio(data=b"".join(chunks), sample_rate=sample_rate))
+            logger.info(f"✅ Streamed podcast saved: {output_filename}")
+        except Exception as e:
+            logger.error(f"❌ Could not save streamed podcast: {e}")
+            output_filename = None
+    if on_complete is not None:
+        on_complete(output_filename)
 
 
 def create_podcast_audio(script: List[Dict[str, str]], language: str = "en") -> str:
@@ -17,98 +204,82 @@ def create_podcast_audio(script: List[Dict[str, str]], language: str = "en") ->
     """
     logger.info(f"🎵 Creating podcast audio from {len(script)} script segments...")
     
-    audio_files_created = []
-    
-    # Generate individual audio files
-    for i, entry in enumerate(script):
-        logger.info(f"🎤 Generating audio for segment {i+1}/{len(script)}: {entry['speaker']}")
-        audio_file = generate_audio(entry["text"], entry["speaker"], language=language)
-        if audio_file and (audio_file.endswith('.wav') or audio_file.endswith('.txt')):
-            from config import settings
-            audio_path = os.path.join(settings.audio_folder, audio_file)
-            if os.path.exists(audio_path):
-                audio_files_created.append(audio_file)
-                logger.info(f"✅ Created: {audio_file}")
-            else:
-                logger.error(f"❌ File not found: {audio_path}")
+    # Synthesize all segments concurrently as in-memory PCM (no per-segment files)
+    return _combine_segments(script, _synthesize_segments(script, language))
+
+
+def _combine_segments(script: List[Dict[str, str]], audio_results: List[Optional[PcmAudio]]) -> str:
+    """Stitch synthesized segments into one WAV; falls back to a text transcript"""
+    from config import settings
+    segments: List[PcmAudio] = []
+    speakers: List[str] = []
+    for i, (entry, pcm) in enumerate(zip(script, audio_results)):
+        if pcm is not None and pcm.data:
+            segments.append(pcm)
+            speakers.append(entry["speaker"])
         else:
             logger.error(f"❌ Failed to generate audio for segment {i+1}")
     
-    if not audio_files_created:
-        logger.error("❌ No audio files were created")
-        return None
+    if not segments:
+        logger.error("❌ No audio was synthesized, writing a text transcript instead")
+        return write_script_transcript(script)
     
-    # Check if all files are text transcripts
-    if all(f.endswith('.txt') for f in audio_files_created):
-        logger.info("📝 All files are text transcripts, combining them...")
-        return combine_text_transcripts(audio_files_created)
+    # Natural pauses between segments: longer when the next line has a different speaker
+    pauses = [_pause_ms(speakers[i], speakers[i + 1]) for i in range(len(speakers) - 1)]
     
-    # Try to combine using pydub for audio files
-    wav_files = [f for f in audio_files_created if f.endswith('.wav')]
-    if wav_files:
-        try:
-            from pydub import AudioSegment
-            from config import settings
-            logger.info("🎵 Attempting to combine WAV audio using pydub...")
-            
-            audio_segments = []
-            previous_speaker = None
-            
-            for i, audio_file in enumerate(wav_files):
-                audio_path = os.path.join(settings.audio_folder, audio_file)
-                try:
-                    segment = AudioSegment.from_wav(audio_path)
-                    audio_segments.append(segment)
-                    
-                    # Add natural pauses between segments
-                    if i < len(wav_files) - 1:
-                        current_speaker = script[i]['speaker'] if i < len(script) else 'unknown'
-                        
-                        if previous_speaker != current_speaker:
-                            pause_duration = 850  # ms for speaker change
-                        else:
-                            pause_duration = 400  # ms for same speaker
-                        
-                        audio_segments.append(AudioSegment.silent(duration=pause_duration))
-                        previous_speaker = current_speaker
-                    
-                    logger.info(f"✅ Loaded: {audio_file}")
-                    
-                except Exception as e:
-                    logger.error(f"❌ Could not load {audio_file}: {e}")
-                    continue
-            
-            if audio_segments:
-                # Combine all segments
-                combined = audio_segments[0]
-                for segment in audio_segments[1:]:
-                    combined += segment
-                
-                # Save combined audio
-                output_filename = f"podcast_combined_{uuid.uuid4()}.wav"
-                output_path = os.path.join(settings.audio_folder, output_filename)
-                
-                combined.export(output_path, format="wav")
-                logger.info(f"✅ Combined WAV audio saved: {output_filename}")
-                
-                # Clean up individual files
-                for audio_file in wav_files:
-                    try:
-                        os.remove(os.path.join(settings.audio_folder, audio_file))
-                        logger.info(f"🗑️ Cleaned up: {audio_file}")
-                    except:
-                        pass
-                
-                return output_filename
-                
-        except ImportError:
-            logger.warning("⚠️ pydub not available, using custom combining method...")
-        except Exception as e:
-            logger.warning(f"⚠️ pydub combining failed: {e}")
+    try:
+        # One preallocated buffer, written once
+        combined = stitch_pcm(segments, pauses)
+        output_filename = f"podcast_combined_{uuid.uuid4()}.wav"
+        write_wav(os.path.join(settings.audio_folder, output_filename), combined)
+        logger.info(f"✅ Combined WAV audio saved: {output_filename}")
+        return output_filename
+    except Exception as e:
+        logger.error(f"❌ Combining audio failed: {e}")
+        return write_script_transcript(script)
+
+
+class PodcastAudioPipeline:
+    """
+    Synthesis that starts before the script is complete: submit() queues each turn on the
+    TTS pool as soon as it exists (e.g. parsed from a streaming LLM response), and finish()
+    builds the podcast for the final script, reusing every matching turn already started.
+    """
+    
+    def __init__(self, language: str = "en"):
+        self.language = language
+        self._cache = get_segment_cache()
+        # (speaker, text) -> jobs started for that turn, in submission order
+        self._jobs: Dict[Tuple[str, str], List[_SegmentJob]] = {}
+        self.submitted = 0
     
-    # Return the first available file as fallback
-    if audio_files_created:
-        logger.info(f"⚠️ Returning first audio file as fallback: {audio_files_created[0]}")
-        return audio_files_created[0]
+    def submit(self, entry: Dict[str, str]) -> None:
+        key = (entry["speaker"], entry["text"])
+        self._jobs.setdefault(key, []).append(_submit_segment(entry, self.language, self._cache))
+        self.submitted += 1
     
-    return None
+    def finish(self, script: List[Dict[str, str]]) -> str:
+        """Combined audio filename for ``script`` (same result as create_podcast_audio)"""
+        jobs: List[_SegmentJob] = []
+        reused = 0
+        for entry in script:
+            started = self._jobs.get((entry["speaker"], entry["text"]))
+            if started:
+                jobs.append(started.pop(0))
+                reused += 1
+            else:
+                jobs.append(_submit_segment(entry, self.language, self._cache))
+        
+        # Turns the final script dropped (e.g. replaced by a fallback script)
+        for started in self._jobs.values():
+            for job in started:
+                job.future.cancel()
+        self._jobs.clear()
+        
+        logger.info(f"🎵 Finishing podcast audio: {reused}/{len(script)} segments started while "
+                    f"the script was generated ({self.submitted - reused} discarded)")
+        audio_results = [
+            _segment_result(i, entry, job, self.language)
+            for i, (entry, job) in enumerate(zip(script, jobs))
+        ]
+        return _combine_segments(script, audio_results)
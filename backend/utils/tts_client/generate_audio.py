@@ -2,12 +2,107 @@ import os
 import uuid
 import time
 import logging
-from typing import List, Dict
+import tempfile
+from typing import List, Dict, Optional, Tuple
+
+from .pcm import PcmAudio, read_wav_pcm, write_wav
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
 
+# Azure is asked for raw PCM in this format (no file round trip)
+AZURE_SAMPLE_RATE = 24000
+
+
+def resolve_azure_voice(speaker: str, language: str = "en") -> Tuple[str, str]:
+    """
+    Azure locale and neural voice for a speaker and language
+    Returns (locale, voice name)
+    """
+    lang_raw = (language or "en").strip()
+    lang = lang_raw.lower()
+    # Normalize to locale codes Azure expects
+    # Accept human-readable names and short codes
+    name_to_locale = {
+        "english": "en-US",
+        "spanish": "es-ES",
+        "castilian": "es-ES",
+        "hindi": "hi-IN",
+        "french": "fr-FR",
+        "german": "de-DE",
+        "japanese": "ja-JP",
+        "chinese": "zh-CN",
+        "mandarin": "zh-CN",
+        "arabic": "ar-SA",
+        "italian": "it-IT",
+        "portuguese": "pt-BR",
+        "brazilian portuguese": "pt-BR",
+        "korean": "ko-KR",
+        "russian": "ru-RU",
+    }
+    code_to_locale = {
+        "en": "en-US",
+        "es": "es-ES",
+        "fr": "fr-FR",
+        "de": "de-DE",
+        "hi": "hi-IN",
+        "ja": "ja-JP",
+        "zh": "zh-CN",
+        "pt": "pt-BR",
+        "it": "it-IT",
+        "ru": "ru-RU",
+        "ar": "ar-SA",
+        "ko": "ko-KR",
+    }
+    if '-' in lang and len(lang.split('-')[0]) == 2:
+        # Already looks like a locale
+        locale = lang_raw
+    elif lang in name_to_locale:
+        locale = name_to_locale[lang]
+    else:
+        locale = code_to_locale.get(lang, "en-US")
+
+    female_default = {
+        "en-US": "en-US-JennyNeural",
+        "es-ES": "es-ES-ElviraNeural",
+        "fr-FR": "fr-FR-DeniseNeural",
+        "de-DE": "de-DE-KatjaNeural",
+        "hi-IN": "hi-IN-SwaraNeural",
+        "ja-JP": "ja-JP-NanamiNeural",
+        "zh-CN": "zh-CN-XiaoxiaoNeural",
+        "pt-BR": "pt-BR-FranciscaNeural",
+        "it-IT": "it-IT-ElsaNeural",
+        "ru-RU": "ru-RU-DariyaNeural",
+        "ar-SA": "ar-SA-ZariyahNeural",
+        "ko-KR": "ko-KR-SunHiNeural",
+    }.get(locale, "en-US-JennyNeural")
+
+    male_default = {
+        "en-US": "en-US-GuyNeural",
+        "es-ES": "es-ES-AlvaroNeural",
+        "fr-FR": "fr-FR-HenriNeural",
+        "de-DE": "de-DE-ConradNeural",
+        "hi-IN": "hi-IN-MadhurNeural",
+        "ja-JP": "ja-JP-KeitaNeural",
+        "zh-CN": "zh-CN-YunxiNeural",
+        "pt-BR": "pt-BR-AntonioNeural",
+        "it-IT": "it-IT-DiegoNeural",
+        "ru-RU": "ru-RU-DmitryNeural",
+        "ar-SA": "ar-SA-HamedNeural",
+        "ko-KR": "ko-KR-InJoonNeural",
+    }.get(locale, "en-US-GuyNeural")
+
+    # Map specific speakers to gendered defaults
+    if speaker in ["Host", "Alex", "Narrator"]:
+        selected_voice = female_default
+    elif speaker in ["Expert", "Jamie"]:
+        selected_voice = male_default
+    else:
+        selected_voice = female_default
+    return locale, selected_voice
+
+
 def generate_audio(text: str, speaker: str = "default", language: str = "en") -> str:
     """
     Generate audio from text using configured TTS provider
@@ -15,12 +110,43 @@ def generate_audio(text: str, speaker: str = "default", language: str = "en") ->
     """
     from config import settings
     
+    pcm = synthesize_pcm(text, speaker, language)
+    if pcm is not None:
+        output_filename = f"{uuid.uuid4()}.wav"
+        try:
+            write_wav(os.path.join(settings.audio_folder, output_filename), pcm)
+            logger.info(f"🎤 Output file: {output_filename}")
+            return output_filename
+        except Exception as e:
+            logger.error(f"❌ Could not write audio file: {str(e)}")
+    
+    # Create a text transcript as ultimate fallback
+    try:
+        transcript_filename = f"transcript_{uuid.uuid4()}.txt"
+        transcript_path = os.path.join(settings.audio_folder, transcript_filename)
+        
+        with open(transcript_path, "w", encoding="utf-8") as f:
+            f.write(f"Speaker: {speaker}\n")
+            f.write(f"Text: {text}\n")
+            f.write(f"Generated at: {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
+        
+        logger.info(f"📝 Created transcript fallback: {transcript_filename}")
+        return transcript_filename
+    except Exception as fallback_error:
+        logger.error(f"❌ Even transcript fallback failed: {str(fallback_error)}")
+        return None
+
+
+def synthesize_pcm(text: str, speaker: str = "default", language: str = "en") -> Optional[PcmAudio]:
+    """
+    Synthesize speech for text with the configured TTS provider
+    Returns raw PCM (nothing is left on disk), or None if every engine failed
+    """
+    from config import settings
+    
     provider = settings.tts_provider
-    output_filename = f"{uuid.uuid4()}.wav"
-    output_path = os.path.join(settings.audio_folder, output_filename)
     
     logger.info(f"🎤 Starting TTS generation for speaker '{speaker}' using provider '{provider}'")
-    logger.info(f"🎤 Output file: {output_filename}")
     logger.info(f"🎤 Text length: {len(text)} characters")
     
     try:
@@ -30,7 +156,7 @@ def generate_audio(text: str, speaker: str = "default", language: str = "en") ->
             
             try:
                 from azure.cognitiveservices.speech import (
-                    SpeechConfig, SpeechSynthesizer, AudioConfig
+                    SpeechConfig, SpeechSynthesizer, SpeechSynthesisOutputFormat
                 )
                 
                 # Use region from settings directly if available
@@ -56,86 +182,7 @@ def generate_audio(text: str, speaker: str = "default", language: str = "en") ->
                 )
                 
                 # Set voice based on speaker with language-aware mapping (common locales)
-                lang_raw = (language or "en").strip()
-                lang = lang_raw.lower()
-                # Normalize to locale codes Azure expects
-                # Accept human-readable names and short codes
-                name_to_locale = {
-                    "english": "en-US",
-                    "spanish": "es-ES",
-                    "castilian": "es-ES",
-                    "hindi": "hi-IN",
-                    "french": "fr-FR",
-                    "german": "de-DE",
-                    "japanese": "ja-JP",
-                    "chinese": "zh-CN",
-                    "mandarin": "zh-CN",
-                    "arabic": "ar-SA",
-                    "italian": "it-IT",
-                    "portuguese": "pt-BR",
-                    "brazilian portuguese": "pt-BR",
-                    "korean": "ko-KR",
-                    "russian": "ru-RU",
-                }
-                code_to_locale = {
-                    "en": "en-US",
-                    "es": "es-ES",
-                    "fr": "fr-FR",
-                    "de": "de-DE",
-                    "hi": "hi-IN",
-                    "ja": "ja-JP",
-                    "zh": "zh-CN",
-                    "pt": "pt-BR",
-                    "it": "it-IT",
-                    "ru": "ru-RU",
-                    "ar": "ar-SA",
-                    "ko": "ko-KR",
-                }
-                if '-' in lang and len(lang.split('-')[0]) == 2:
-                    # Already looks like a locale
-                    locale = lang_raw
-                elif lang in name_to_locale:
-                    locale = name_to_locale[lang]
-                else:
-                    locale = code_to_locale.get(lang, "en-US")
-
-                female_default = {
-                    "en-US": "en-US-JennyNeural",
-                    "es-ES": "es-ES-ElviraNeural",
-                    "fr-FR": "fr-FR-DeniseNeural",
-                    "de-DE": "de-DE-KatjaNeural",
-                    "hi-IN": "hi-IN-SwaraNeural",
-                    "ja-JP": "ja-JP-NanamiNeural",
-                    "zh-CN": "zh-CN-XiaoxiaoNeural",
-                    "pt-BR": "pt-BR-FranciscaNeural",
-                    "it-IT": "it-IT-ElsaNeural",
-                    "ru-RU": "ru-RU-DariyaNeural",
-                    "ar-SA": "ar-SA-ZariyahNeural",
-                    "ko-KR": "ko-KR-SunHiNeural",
-                }.get(locale, "en-US-JennyNeural")
-
-                male_default = {
-                    "en-US": "en-US-GuyNeural",
-                    "es-ES": "es-ES-AlvaroNeural",
-                    "fr-FR": "fr-FR-HenriNeural",
-                    "de-DE": "de-DE-ConradNeural",
-                    "hi-IN": "hi-IN-MadhurNeural",
-                    "ja-JP": "ja-JP-KeitaNeural",
-                    "zh-CN": "zh-CN-YunxiNeural",
-                    "pt-BR": "pt-BR-AntonioNeural",
-                    "it-IT": "it-IT-DiegoNeural",
-                    "ru-RU": "ru-RU-DmitryNeural",
-                    "ar-SA": "ar-SA-HamedNeural",
-                    "ko-KR": "ko-KR-InJoonNeural",
-                }.get(locale, "en-US-GuyNeural")
-
-                # Map specific speakers to gendered defaults
-                if speaker in ["Host", "Alex", "Narrator"]:
-                    selected_voice = female_default
-                elif speaker in ["Expert", "Jamie"]:
-                    selected_voice = male_default
-                else:
-                    selected_voice = female_default
+                locale, selected_voice = resolve_azure_voice(speaker, language)
                 # Be explicit: set both language and voice to reduce mis-detections
                 try:
                     # Some SDK versions allow setting synthesis language directly
@@ -147,11 +194,13 @@ def generate_audio(text: str, speaker: str = "default", language: str = "en") ->
                 
                 logger.info(f"🎤 Selected Azure voice: {selected_voice} for speaker: {speaker}")
                 
-                # Configure audio output
-                audio_config = AudioConfig(filename=output_path)
+                # Keep audio in memory as headerless PCM (audio_config=None: no file, no playback)
+                speech_config.set_speech_synthesis_output_format(
+                    SpeechSynthesisOutputFormat.Raw24Khz16BitMonoPcm
+                )
                 synthesizer = SpeechSynthesizer(
                     speech_config=speech_config,
-                    audio_config=audio_config
+                    audio_config=None
                 )
                 
                 logger.info("🎤 Starting Azure TTS synthesis...")
@@ -161,12 +210,12 @@ def generate_audio(text: str, speaker: str = "default", language: str = "en") ->
                 from azure.cognitiveservices.speech import ResultReason
                 if result.reason == ResultReason.SynthesizingAudioCompleted:
                     logger.info(f"✅ Azure TTS synthesis completed successfully")
-                    if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
-                        logger.info(f"✅ Audio file size: {os.path.getsize(output_path)} bytes")
-                        return output_filename
+                    if result.audio_data:
+                        logger.info(f"✅ Audio size: {len(result.audio_data)} bytes")
+                        return PcmAudio(data=bytes(result.audio_data), sample_rate=AZURE_SAMPLE_RATE, engine="azure")
                     else:
-                        logger.error(f"❌ Azure TTS completed but file is empty or missing")
-                        raise Exception("Azure TTS completed but output file is empty")
+                        logger.error(f"❌ Azure TTS completed but returned no audio")
+                        raise Exception("Azure TTS completed but audio is empty")
                 elif result.reason == ResultReason.Canceled:
                     cancellation_details = result.cancellation_details
                     logger.error(f"❌ Azure TTS synthesis was canceled")
@@ -239,19 +288,28 @@ def generate_audio(text: str, speaker: str = "default", language: str = "en") ->
                     engine.setProperty('volume', 0.9)
                     logger.info(f"🎤 Set default settings for {speaker}")
                 
-                # Generate audio
+                # Generate audio (pyttsx3 can only render to a file; read it back and remove it)
                 logger.info("🎤 Starting pyttsx3 synthesis...")
-                engine.save_to_file(text, output_path)
-                engine.runAndWait()
-                
-                # Verify file was created
-                if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
-                    logger.info(f"✅ pyttsx3 TTS synthesis completed")
-                    logger.info(f"✅ Audio file size: {os.path.getsize(output_path)} bytes")
-                    return output_filename
-                else:
-                    logger.error(f"❌ pyttsx3 failed to create audio file")
-                    raise Exception("pyttsx3 failed to create audio file")
+                fd, temp_path = tempfile.mkstemp(suffix=".wav")
+                os.close(fd)
+                try:
+                    engine.save_to_file(text, temp_path)
+                    engine.runAndWait()
+                    
+                    # Verify file was created
+                    if os.path.getsize(temp_path) > 0:
+                        pcm = read_wav_pcm(temp_path)._replace(engine="pyttsx3")
+                        logger.info(f"✅ pyttsx3 TTS synthesis completed")
+                        logger.info(f"✅ Audio size: {len(pcm.data)} bytes")
+                        return pcm
+                    else:
+                        logger.error(f"❌ pyttsx3 failed to create audio file")
+                        raise Exception("pyttsx3 failed to create audio file")
+                finally:
+                    try:
+                        os.remove(temp_path)
+                    except OSError:
+                        pass
                     
             except ImportError as e:
                 logger.warning(f"⚠️ pyttsx3 not available: {e}")
@@ -264,7 +322,6 @@ def generate_audio(text: str, speaker: str = "default", language: str = "en") ->
     # Create a synthetic audio as ultimate fallback if all TTS methods fail
     try:
         import numpy as np
-        import wave
         
         logger.info("🎤 Creating synthetic audio as ultimate fallback")
         
@@ -312,20 +369,9 @@ def generate_audio(text: str, speaker: str = "default", language: str = "en") ->
         # Convert to 16-bit integer
         audio_signal = (audio_signal * 32767).astype(np.int16)
         
-        # Write WAV file
-        with wave.open(output_path, 'w') as wav_file:
-            wav_file.setnchannels(1)  # Mono
-            wav_file.setsampwidth(2)  # 2 bytes per sample (16-bit)
-            wav_file.setframerate(sample_rate)
-            wav_file.writeframes(audio_signal.tobytes())
-        
-        if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
-            logger.info(f"✅ Synthetic audio created successfully")
-            logger.info(f"✅ Audio file size: {os.path.getsize(output_path)} bytes")
-            logger.info(f"✅ Duration: {duration_seconds:.1f} seconds")
-            return output_filename
-        else:
-            logger.error(f"❌ Synthetic audio creation failed")
+        logger.info(f"✅ Synthetic audio created successfully")
+        logger.info(f"✅ Duration: {duration_seconds:.1f} seconds")
+        return PcmAudio(data=audio_signal.tobytes(), sample_rate=sample_rate, engine="synthetic")
             
     except ImportError as e:
         logger.warning(f"⚠️ NumPy not available for synthetic audio: {e}")
@@ -333,18 +379,4 @@ def generate_audio(text: str, speaker: str = "default", language: str = "en") ->
     except Exception as e:
         logger.error(f"❌ Synthetic audio generation failed: {str(e)}")
     
-    # Create a text transcript as ultimate fallback
-    try:
-        transcript_filename = f"transcript_{uuid.uuid4()}.txt"
-        transcript_path = os.path.join(settings.audio_folder, transcript_filename)
-        
-        with open(transcript_path, "w", encoding="utf-8") as f:
-            f.write(f"Speaker: {speaker}\n")
-            f.write(f"Text: {text}\n")
-            f.write(f"Generated at: {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
-        
-        logger.info(f"📝 Created transcript fallback: {transcript_filename}")
-        return transcript_filename
-    except Exception as fallback_error:
-        logger.error(f"❌ Even transcript fallback failed: {str(fallback_error)}")
-        return None
+    return None
@@ -0,0 +1,102 @@
+import wave
+import struct
+import logging
+from typing import List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+
+class PcmAudio(NamedTuple):
+    """Raw little-endian PCM samples plus their format (picklable, so it crosses process pools)"""
+    data: bytes
+    sample_rate: int
+    channels: int = 1
+    sample_width: int = 2
+    engine: str = ""  # TTS engine that produced the audio (azure, pyttsx3, synthetic)
+
+
+def read_wav_pcm(path: str) -> PcmAudio:
+    """Load a WAV file's frames without decoding through pydub"""
+    with wave.open(path, "rb") as wav_file:
+        return PcmAudio(
+            data=wav_file.readframes(wav_file.getnframes()),
+            sample_rate=wav_file.getframerate(),
+            channels=wav_file.getnchannels(),
+            sample_width=wav_file.getsampwidth()
+        )
+
+
+def write_wav(path: str, pcm: PcmAudio) -> None:
+    with wave.open(path, "wb") as wav_file:
+        wav_file.setnchannels(pcm.channels)
+        wav_file.setsampwidth(pcm.sample_width)
+        wav_file.setframerate(pcm.sample_rate)
+        wav_file.writeframes(pcm.data)
+
+
+def wav_stream_header(sample_rate: int, channels: int = 1, sample_width: int = 2) -> bytes:
+    """RIFF/WAVE header for a stream of unknown length (sizes set to 0xFFFFFFFF, as players expect)"""
+    block_align = channels * sample_width
+    return (
+        b"RIFF" + struct.pack("<I", 0xFFFFFFFF) + b"WAVE"
+        + b"fmt " + struct.pack("<IHHIIHH", 16, 1, channels, sample_rate,
+                                sample_rate * block_align, block_align, sample_width * 8)
+        + b"data" + struct.pack("<I", 0xFFFFFFFF)
+    )
+
+
+def to_mono16(pcm: PcmAudio, sample_rate: int) -> np.ndarray:
+    """Samples as mono int16 at ``sample_rate`` (no-op view when the format already matches)"""
+    if pcm.sample_width == 2:
+        samples = np.frombuffer(pcm.data, dtype="<i2")
+    elif pcm.sample_width == 1:
+        # 8-bit WAV is unsigned
+        samples = ((np.frombuffer(pcm.data, dtype=np.uint8).astype(np.int16) - 128) << 8)
+    elif pcm.sample_width == 4:
+        samples = (np.frombuffer(pcm.data, dtype="<i4") >> 16).astype(np.int16)
+    else:
+        raise ValueError(f"Unsupported sample width: {pcm.sample_width}")
+    
+    if pcm.channels > 1:
+        usable = len(samples) - len(samples) % pcm.channels
+        samples = samples[:usable].reshape(-1, pcm.channels).mean(axis=1).astype(np.int16)
+    
+    if pcm.sample_rate != sample_rate and len(samples):
+        target_length = int(round(len(samples) * sample_rate / pcm.sample_rate))
+        positions = np.linspace(0, len(samples) - 1, target_length)
+        samples = np.interp(positions, np.arange(len(samples)), samples).astype(np.int16)
+    return samples
+
+
+def with_leading_silence(samples: np.ndarray, pause_samples: int) -> np.ndarray:
+    padded = np.zeros(pause_samples + len(samples), dtype=samples.dtype)
+    padded[pause_samples:] = samples
+    return padded
+
+
+def stitch_pcm(segments: Sequence[PcmAudio], pauses_ms: Sequence[int]) -> Optional[PcmAudio]:
+    """Concatenate segments into one preallocated buffer with silence after each.
+
+    ``pauses_ms[i]`` is the silence following ``segments[i]``. Everything is converted to mono
+    16-bit at the first segment's sample rate, so the output is written exactly once.
+    """
+    if not segments:
+        return None
+    
+    sample_rate = segments[0].sample_rate
+    parts: List[np.ndarray] = [to_mono16(segment, sample_rate) for segment in segments]
+    gaps = [int(sample_rate * max(0, pause) / 1000) for pause in pauses_ms]
+    
+    buffer = np.zeros(sum(len(part) for part in parts) + sum(gaps), dtype="<i2")
+    position = 0
+    for index, part in enumerate(parts):
+        buffer[position:position + len(part)] = part
+        position += len(part)
+        if index < len(gaps):
+            position += gaps[index]  # Already zero: silence
+    
+    logger.info(f"🎵 Stitched {len(parts)} segments: {len(buffer) / sample_rate:.1f}s at {sample_rate} Hz")
+    return PcmAudio(data=buffer.tobytes(), sample_rate=sample_rate)
@@ -0,0 +1,151 @@
+import os
+import time
+import hashlib
+import logging
+import threading
+from typing import Dict, Optional, Tuple
+
+from .pcm import PcmAudio, read_wav_pcm, write_wav
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+
+class TtsSegmentCache:
+    """
+    Content-addressed cache of synthesized segments on disk
+    One WAV per sha256(provider, voice, locale, text); least recently used files are evicted
+    once the directory grows past max_bytes
+    """
+    
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max(0, max_bytes)
+        self._lock = threading.Lock()
+        # key -> (size in bytes, last use); built from the directory on first use
+        self._index: Optional[Dict[str, Tuple[int, float]]] = None
+        self._total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def make_key(text: str, voice: str, locale: str, provider: str) -> str:
+        raw = f"{provider}\x00{voice}\x00{locale}\x00{' '.join(text.split())}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+    
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.wav")
+    
+    def _load_index(self) -> Dict[str, Tuple[int, float]]:
+        if self._index is None:
+            os.makedirs(self.directory, exist_ok=True)
+            index = {}
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    if entry.is_file() and entry.name.endswith(".wav"):
+                        stat = entry.stat()
+                        index[entry.name[:-4]] = (stat.st_size, stat.st_mtime)
+            self._index = index
+            self._total_bytes = sum(size for size, _ in index.values())
+        return self._index
+    
+    def get(self, key: str) -> Optional[PcmAudio]:
+        with self._lock:
+            index = self._load_index()
+            if key not in index:
+                self.misses += 1
+                return None
+            size, _ = index[key]
+            now = time.time()
+            index[key] = (size, now)
+        
+        try:
+            pcm = read_wav_pcm(self._path(key))
+            # Last use is kept in the mtime so LRU order survives restarts
+            os.utime(self._path(key), (now, now))
+        except (OSError, EOFError) as e:
+            logger.warning(f"⚠️ Dropping unreadable TTS cache entry {key[:12]}: {e}")
+            self._forget(key)
+            with self._lock:
+                self.misses += 1
+            return None
+        
+        with self._lock:
+            self.hits += 1
+        return pcm
+    
+    def put(self, key: str, pcm: PcmAudio) -> None:
+        if not pcm.data or len(pcm.data) > self.max_bytes:
+            return
+        path = self._path(key)
+        temp_path = f"{path}.{threading.get_ident()}.part"
+        try:
+            with self._lock:
+                self._load_index()
+            write_wav(temp_path, pcm)
+            os.replace(temp_path, path)
+            size = os.path.getsize(path)
+        except OSError as e:
+            logger.warning(f"⚠️ Could not cache TTS segment: {e}")
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            return
+        
+        with self._lock:
+            previous = self._index.get(key)
+            self._total_bytes += size - (previous[0] if previous else 0)
+            self._index[key] = (size, time.time())
+            self._evict()
+    
+    def _evict(self) -> None:
+        """Remove least recently used entries until under max_bytes (lock held)"""
+        if self._total_bytes <= self.max_bytes:
+            return
+        for key, (size, _) in sorted(self._index.items(), key=lambda item: item[1][1]):
+            if self._total_bytes <= self.max_bytes:
+                break
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+            del self._index[key]
+            self._total_bytes -= size
+    
+    def _forget(self, key: str) -> None:
+        with self._lock:
+            entry = self._index.pop(key, None) if self._index is not None else None
+            if entry:
+                self._total_bytes -= entry[0]
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+    
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            index = self._load_index()
+            return {
+                'entries': len(index),
+                'bytes': self._total_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+
+_segment_cache: Optional[TtsSegmentCache] = None
+_segment_cache_lock = threading.Lock()
+
+
+def get_segment_cache() -> Optional[TtsSegmentCache]:
+    """Shared cache instance, or None when disabled"""
+    global _segment_cache
+    from config import settings
+    if settings.tts_cache_max_mb <= 0:
+        return None
+    with _segment_cache_lock:
+        if _segment_cache is None:
+            _segment_cache = TtsSegmentCache(settings.tts_cache_dir, settings.tts_cache_max_mb * 1024 * 1024)
+        return _segment_cache
@@ -0,0 +1,129 @@
+import os
+import shutil
+import logging
+import threading
+import subprocess
+from functools import lru_cache
+from typing import Dict, Optional
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Output format -> (media type, file extension)
+AUDIO_FORMATS: Dict[str, tuple] = {
+    "wav": ("audio/wav", ".wav"),
+    "mp3": ("audio/mpeg", ".mp3"),
+    "opus": ("audio/ogg", ".opus"),  # Opus in an Ogg container
+}
+
+# Accept media types -> output format (first match in client preference order wins; others are skipped)
+_ACCEPT_TO_FORMAT = {
+    "audio/ogg": "opus",
+    "audio/opus": "opus",
+    "audio/mpeg": "mp3",
+    "audio/mp3": "mp3",
+    "audio/wav": "wav",
+    "audio/x-wav": "wav",
+    "audio/wave": "wav",
+}
+
+# One encode per output file at a time; concurrent requests wait and reuse it.
+# A fixed set of locks striped by path hash, so the set does not grow with the audio folder
+_ENCODE_LOCK_STRIPES = 64
+_encode_locks = tuple(threading.Lock() for _ in range(_ENCODE_LOCK_STRIPES))
+
+
+@lru_cache(maxsize=1)
+def ffmpeg_path() -> Optional[str]:
+    """ffmpeg binary on PATH (installed in the Docker image), or None"""
+    return shutil.which("ffmpeg")
+
+
+def negotiate_audio_format(requested: Optional[str], accept_header: Optional[str]) -> str:
+    """Explicit output_format wins; otherwise the best audio type in Accept; WAV by default"""
+    if requested in AUDIO_FORMATS:
+        return requested
+    
+    preferences = []
+    for position, part in enumerate((accept_header or "").split(",")):
+        fields = [field.strip() for field in part.split(";")]
+        media_type = fields[0].lower()
+        quality = 1.0
+        for parameter in fields[1:]:
+            if parameter.startswith("q="):
+                try:
+                    quality = float(parameter[2:])
+                except ValueError:
+                    quality = 0.0
+        if media_type and quality > 0:
+            preferences.append((-quality, position, media_type))
+    
+    for _, _, media_type in sorted(preferences):
+        output_format = _ACCEPT_TO_FORMAT.get(media_type)
+        if output_format:
+            return output_format
+        if media_type in ("audio/*", "*/*"):
+            break
+    return "wav"
+
+
+def _encoder_args(output_format: str) -> list:
+    from config import settings
+    if output_format == "mp3":
+        return ["-c:a", "libmp3lame", "-b:a", settings.podcast_mp3_bitrate]
+    # Speech-tuned Opus
+    return ["-c:a", "libopus", "-b:a", settings.podcast_opus_bitrate, "-application", "voip"]
+
+
+def _lock_for(path: str) -> threading.Lock:
+    return _encode_locks[hash(path) % _ENCODE_LOCK_STRIPES]
+
+
+def transcode_audio(wav_filename: str, output_format: str) -> Optional[str]:
+    """
+    Encode a WAV from the audio folder to MP3/Opus with ffmpeg, cached next to the WAV
+    Returns the encoded filename, the WAV itself for "wav", or None if encoding is unavailable
+    """
+    from config import settings
+    
+    if output_format == "wav" or output_format not in AUDIO_FORMATS:
+        return wav_filename
+    
+    executable = ffmpeg_path()
+    if not executable:
+        logger.warning("⚠️ ffmpeg not found, serving WAV")
+        return None
+    
+    wav_path = os.path.join(settings.audio_folder, wav_filename)
+    encoded_filename = os.path.splitext(wav_filename)[0] + AUDIO_FORMATS[output_format][1]
+    encoded_path = os.path.join(settings.audio_folder, encoded_filename)
+    
+    with _lock_for(encoded_path):
+        # Cached encode is valid while it is newer than its source
+        if os.path.exists(encoded_path) and os.path.getmtime(encoded_path) >= os.path.getmtime(wav_path):
+            logger.info(f"🎵 Using cached {output_format}: {encoded_filename}")
+            return encoded_filename
+        
+        temp_path = f"{encoded_path}.part"
+        command = [
+            executable, "-y", "-loglevel", "error", "-i", wav_path,
+            "-ac", "1", *_encoder_args(output_format),
+            "-f", "ogg" if output_format == "opus" else output_format, temp_path
+        ]
+        try:
+            subprocess.run(command, check=True, capture_output=True, timeout=settings.podcast_transcode_timeout)
+            os.replace(temp_path, encoded_path)
+        except (subprocess.SubprocessError, OSError) as e:
+            stderr = getattr(e, "stderr", b"") or b""
+            logger.error(f"❌ ffmpeg {output_format} encode failed: {e} {stderr.decode(errors='ignore')[:200]}")
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            return None
+    
+    logger.info(
+        f"✅ Encoded {output_format}: {encoded_filename} "
+        f"({os.path.getsize(wav_path):,} -> {os.path.getsize(encoded_path):,} bytes)"
+    )
+    return encoded_filename